@@ -136,3 +136,193 @@ STATIC_URL = "static/"
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+
+# Vector indexes
+# Root directory holding the per-source FAISS artifacts (index, id map, texts, vectorizer)
+
+FAISS_ROOT = Path(os.getenv("FAISS_ROOT", BASE_DIR / "aetheris_core" / "faiss"))
+
+# Synthetic log exports (<log type>.json) vectorized into the log indexes
+SYNTHETIC_DATA_DIR = BASE_DIR / "aetheris_core" / "synthetic_data"
+
+# `python manage.py vectorize <source|all>`: worker processes for independent sources
+# (None = one per CPU) and rows fetched per database round trip while streaming records.
+VECTORIZE = {
+    "WORKERS": None,
+    "CHUNK_SIZE": 2000,
+}
+
+# Retrieval engine per source: "faiss" (dense IndexFlatL2) or "sparse" (inverted CSR cosine index).
+# The sparse engine never densifies the corpus, which suits the large, low-vocabulary log sources.
+VECTOR_BACKENDS = {
+    "default": "faiss",
+}
+
+# How record text is encoded per source: "tfidf" (fitted per build) or "sentence" (pretrained
+# sentence embeddings, faiss backend only). Re-vectorize a source after changing its encoder.
+VECTOR_ENCODERS = {
+    "default": "tfidf",
+}
+
+# Sentence-embedding encoder, loaded once per process and run on CPU in batches of BATCH_SIZE.
+# QUANTIZE: None (fp32), "int8" (dynamic torch quantization) or "onnx" (needs optimum[onnxruntime];
+# ONNX_FILE selects a pre-quantized export). Document embeddings are cached in CACHE keyed by
+# content hash and model version; query embeddings in a per-process LRU of QUERY_CACHE_SIZE.
+EMBEDDINGS = {
+    "MODEL": "all-MiniLM-L6-v2",
+    "QUANTIZE": None,
+    "ONNX_FILE": None,
+    "BATCH_SIZE": 256,
+    "CACHE": BASE_DIR / "aetheris_core" / "cache" / "embeddings.sqlite3",
+    "QUERY_CACHE_SIZE": 1024,
+}
+
+# FAISS index structure per source ("default" covers the rest); applies to the "faiss" backend.
+#   {"TYPE": "flat"}                                             exact brute-force search
+#   {"TYPE": "ivf_flat", "NLIST": None, "NPROBE": 8}             inverted lists, NLIST None = 4 * sqrt(rows)
+#   {"TYPE": "ivf_pq", "NLIST": None, "NPROBE": 8, "M": 16, "NBITS": 8}   plus product-quantized vectors
+#   {"TYPE": "hnsw", "M": 32, "EF_CONSTRUCTION": 80, "EF_SEARCH": 64}     graph search, no vector removal
+# IVF structures are trained on at most TRAIN_SAMPLE (default 50000) rows. NPROBE and EF_SEARCH are
+# applied when an index is loaded, so they can be tuned without rebuilding; compare the options with
+# `python manage.py benchmark_indexes --sweep`.
+FAISS_INDEXES = {
+    "default": {"TYPE": "flat"},
+}
+
+# Seconds between checks of a source's CURRENT version pointer for an already loaded index
+INDEX_RELOAD_INTERVAL = 5
+
+# Every vectorization run publishes a new index version directory; KEEP versions per source are
+# retained (the current one always is) so a running process can finish with the build it loaded
+# and `python manage.py index_versions <source> --activate <version>` can roll back.
+INDEX_VERSIONS = {
+    "KEEP": 3,
+}
+
+# Precomputed anomaly scores (`python manage.py score_anomalies`, or `vectorize --score-anomalies`):
+# neighbours averaged into the k-NN distance, records scored per batched search, rows sampled to fit
+# the outlier detector, and the default nearest-neighbour similarity below which the anomaly dashboard
+# lists a record. DETECTORS per source: "iforest" (scikit-learn isolation forest), "knn" (the k-NN
+# distance itself) or the pyod models "ecod", "copod" and "hbos".
+ANOMALY_SCORING = {
+    "K": 5,
+    "CHUNK_SIZE": 2000,
+    "DETECTOR_SAMPLE": 10000,
+    "THRESHOLD": 0.3,
+    "DETECTORS": {
+        "default": "iforest",
+        "siem_logs": "ecod",
+        "xdr_logs": "ecod",
+        "ids_logs": "ecod",
+        "firewall_logs": "ecod",
+        "edr_logs": "ecod",
+        "hids_logs": "ecod",
+        "application_logs": "ecod",
+    },
+}
+
+# Federated search over several sources (api/search/): threads searching sources concurrently,
+# seconds after which slow sources are left out of the answer, and per-source score multipliers
+# applied after distances are converted to cosine similarity.
+FEDERATED_SEARCH = {
+    "WORKERS": 8,
+    "TIMEOUT": 5.0,
+    "WEIGHTS": {},
+}
+
+
+# Chat pipeline
+
+# Seconds between checks that the in-memory CMDB asset index still matches the table
+ASSET_INDEX_REFRESH_INTERVAL = 30
+
+# Thread pool size for the concurrent ORM/FAISS stages of the async chat pipeline
+CHAT_PIPELINE_WORKERS = 8
+
+# Gemini response cache. BACKEND is "memory" (per process LRU) or "sqlite" (shared file);
+# entries expire after TTL seconds and the least recently used go past MAX_ENTRIES.
+RESPONSE_CACHES = {
+    "llm": {
+        "BACKEND": "sqlite",
+        "LOCATION": BASE_DIR / "aetheris_core" / "cache" / "llm_responses.sqlite3",
+        "TTL": 6 * 60 * 60,
+        "MAX_ENTRIES": 5000,
+    },
+    # Similarity search rankings (api/similarity/); keys include the index version, so TTL only bounds memory
+    "similarity": {
+        "BACKEND": "memory",
+        "TTL": 60 * 60,
+        "MAX_ENTRIES": 10000,
+    },
+}
+
+# Precomputed "more like this" lists (manage.py related_articles, api/articles/<id>/related/):
+# neighbours kept per article, articles searched per batch, and how many of a new article's nearest
+# articles it is merged into on incremental runs. ON_VECTORIZE refreshes them after each
+# `vectorize articles`.
+RELATED_ARTICLES = {
+    "K": 10,
+    "CHUNK_SIZE": 2000,
+    "REVERSE_DEPTH": 50,
+    "ON_VECTORIZE": True,
+}
+
+# Threat stories: k-means clusters over the article vectors (manage.py cluster_stories). CLUSTERS None
+# means one story per ARTICLES_PER_STORY indexed articles; centroids are fitted on at most
+# TRAIN_SAMPLE articles in NITER iterations. New articles join the nearest existing story until more
+# than REFIT_FRACTION of the corpus arrived since the last fit. The chat prompt drops an article when
+# one already kept from its story has a cosine similarity of at least DUPLICATE_SIMILARITY to it.
+# ON_VECTORIZE refreshes the stories after each `vectorize articles`.
+STORY_CLUSTERING = {
+    "CLUSTERS": None,
+    "ARTICLES_PER_STORY": 3,
+    "TRAIN_SAMPLE": 50000,
+    "NITER": 20,
+    "REFIT_FRACTION": 0.2,
+    "DUPLICATE_SIMILARITY": 0.9,
+    "CHUNK_SIZE": 2000,
+    "ON_VECTORIZE": True,
+}
+
+# Similarity search API (api/similarity/): largest page size and deepest offset served
+SIMILARITY_SEARCH = {
+    "MAX_K": 100,
+    "MAX_OFFSET": 1000,
+}
+
+# Token budget per chat prompt, and each section's share of what remains after the fixed
+# instructions. Lower-ranked content is compressed, then dropped, to stay inside the budget.
+PROMPT_BUDGETS = {
+    "threat": {
+        "TOKENS": 4000,
+        "SECTIONS": {"articles": 0.5, "assets": 0.2, "labels": 0.15, "history": 0.15},
+    },
+    "inventory": {
+        "TOKENS": 1500,
+        "SECTIONS": {"history": 0.4, "breakdown": 0.35, "locations": 0.25},
+    },
+    "user_inventory": {
+        "TOKENS": 1500,
+        "SECTIONS": {"history": 0.4, "departments": 0.35, "locations": 0.25},
+    },
+}
+
+# Reciprocal rank fusion constant for combining vector and BM25 article rankings;
+# larger values flatten the advantage of the very top ranks.
+ARTICLE_RRF_K = 60
+
+# Crawled articles whose MinHash-estimated word-shingle Jaccard similarity to an earlier article
+# reaches THRESHOLD are stored as near-duplicates of it and skipped by vectorization, ML
+# classification and LLM labeling. Backfill existing articles with `manage.py dedupe_articles`.
+NEAR_DUPLICATES = {
+    "THRESHOLD": 0.8,
+}
+
+# Incremental article indexing (manage.py vectorize articles --incremental) refits from scratch once the
+# out-of-vocabulary token share of articles added since the last fit exceeds the fitted corpus' own
+# share by DRIFT_THRESHOLD, or once those articles outnumber MAX_GROWTH x the fitted corpus.
+INCREMENTAL_INDEX = {
+    "DRIFT_THRESHOLD": 0.10,
+    "MAX_GROWTH": 0.5,
+}
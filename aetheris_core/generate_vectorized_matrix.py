@@ -1,35 +1,18 @@
+# generate_vectorized_matrix.py
+#
+# Thin wrapper kept for existing callers; `python manage.py vectorize classifier` now writes
+# faiss_vectorized_articles.npz together with the vectorizer it was computed with.
+
 import os
-import pickle
-import numpy as np
+import sys
 import django
-from scipy.sparse import save_npz
-from sklearn.feature_extraction.text import TfidfVectorizer
 
 # --- Django setup ---
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "aetheris_core.settings")
-import sys
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 django.setup()
 
-from vtagent.models import RawArticle
-from django.conf import settings
-
-# --- Load vectorizer ---
-vectorizer_path = os.path.join(settings.BASE_DIR, "aetheris_core", "faiss_vectorizer.pkl")
-with open(vectorizer_path, "rb") as f:
-    vectorizer: TfidfVectorizer = pickle.load(f)
-
-# --- Load article contents ---
-raw_articles = RawArticle.objects.all()
-contents = [article.content for article in raw_articles]
-
-if not contents:
-    print("[!] No content found in RawArticle.")
-    exit()
-
-# --- Vectorize and Save ---
-X = vectorizer.transform(contents)
-output_path = os.path.join(settings.BASE_DIR, "aetheris_core", "faiss_vectorized_articles.npz")
-save_npz(output_path, X)
+from django.core.management import call_command
 
-print(f"[✓] Vectorized matrix saved to {output_path}")
+if __name__ == "__main__":
+    call_command("vectorize", "classifier")
@@ -0,0 +1,247 @@
+# anomaly_scores.py
+
+import importlib
+import io
+import pickle
+
+import numpy as np
+from django.conf import settings
+from django.db import connection, transaction
+from sklearn.ensemble import IsolationForest
+
+from llmintegration.federated_search import to_similarity
+from llmintegration.index_registry import build_key, load_index, vector_space
+from llmintegration.models import AnomalyScore, AnomalyScoringState
+from vtagent.index_artifacts import as_dense, row_norms, search_index
+
+
+# Outlier detectors: "iforest" (scikit-learn isolation forest, fits sparse TF-IDF as is),
+# "knn" (the mean k-NN distance itself) or a pyod model fitted on dense vectors.
+PYOD_DETECTORS = {
+    "ecod": ("pyod.models.ecod", "ECOD"),
+    "copod": ("pyod.models.copod", "COPOD"),
+    "hbos": ("pyod.models.hbos", "HBOS"),
+}
+DETECTORS = ("iforest", "knn") + tuple(PYOD_DETECTORS)
+
+# Characters of record text kept with each score for display
+EXCERPT_CHARS = 300
+
+
+def detector_name(source):
+    """Outlier detector configured for `source` in ANOMALY_SCORING["DETECTORS"]."""
+    detectors = settings.ANOMALY_SCORING.get("DETECTORS", {})
+    name = detectors.get(source, detectors.get("default", "iforest"))
+    if name not in DETECTORS:
+        raise ValueError(f"Unknown anomaly detector {name!r} for {source}")
+    return name
+
+
+def fit_detector(name, loaded, positions, sample_size, k, seed=0):
+    """
+    Detector fitted on a random sample of at most `sample_size` records
+    (None for "knn"), and the sorted outlier scores of that sample, which
+    every record's score is ranked against.
+    """
+    if not positions:
+        return None, np.zeros(0)
+    sample = np.sort(np.random.default_rng(seed).choice(positions, min(sample_size, len(positions)), replace=False))
+    if name == "knn":
+        _, results = neighbour_scores(loaded, sample, k)
+        return None, np.sort([knn_distance for _, _, knn_distance in results])
+    vectors = loaded.record_vectors(sample)
+    if name == "iforest":
+        detector = IsolationForest(n_estimators=100, max_samples=min(256, len(sample)), random_state=seed)
+        detector.fit(vectors)
+    else:
+        module, class_name = PYOD_DETECTORS[name]
+        detector = getattr(importlib.import_module(module), class_name)()
+        detector.fit(as_dense(vectors))
+    return detector, np.sort(outlier_scores(detector, vectors, None))
+
+
+def outlier_scores(detector, vectors, knn_distances):
+    """Higher is more anomalous, whichever detector produced it."""
+    if detector is None:
+        return np.asarray(knn_distances)
+    if isinstance(detector, IsolationForest):
+        return -detector.score_samples(vectors)
+    return detector.decision_function(as_dense(vectors))
+
+
+def outlier_ranks(reference, scores):
+    """
+    Share of the `reference` scores at or below each score: a percentile in [0, 1]
+    that puts sources scored by separately fitted detectors on one scale.
+    """
+    if not len(reference):
+        return np.zeros(len(scores))
+    return np.searchsorted(reference, scores, side="right") / len(reference)
+
+
+def _dump(array):
+    buffer = io.BytesIO()
+    np.save(buffer, array)
+    return buffer.getvalue()
+
+
+def _load(blob):
+    return np.load(io.BytesIO(bytes(blob)))
+
+
+def neighbour_scores(loaded, positions, k):
+    """
+    For each position: (nearest other position, its cosine similarity, mean
+    cosine distance to the k nearest other records), from one batched
+    search of the stored vectors against the index.
+    """
+    vectors = loaded.record_vectors(positions)
+    norms = row_norms(vectors)
+    raw_scores, neighbours = search_index(loaded.index, vectors, k + 1, loaded.backend)
+    results = []
+    for row, position in enumerate(positions):
+        similarities, nearest = [], None
+        for neighbour, raw in zip(neighbours[row], raw_scores[row]):
+            # Skip padding, free slots and the record itself
+            if neighbour < 0 or neighbour == position or loaded.id_map[int(neighbour)] is None:
+                continue
+            if nearest is None:
+                nearest = int(neighbour)
+            similarities.append(to_similarity(loaded.backend, raw, norms[row]))
+            if len(similarities) == k:
+                break
+        if nearest is None:
+            results.append((None, 0.0, 1.0))
+        else:
+            results.append((nearest, similarities[0], float(np.mean([1.0 - s for s in similarities]))))
+    return vectors, results
+
+
+def score_source(source, k=None, full=False, chunk_size=None):
+    """
+    Bring the AnomalyScore rows of `source` up to date with its published
+    index. Nothing is done while the version is unchanged. When only records
+    were added, changed or removed (an incremental article update), just the
+    new and changed records are scored, plus the existing records that were
+    their neighbours or lost their own nearest neighbour; a refitted vectorizer, a different k
+    or detector, or `full` rescores everything and refits the detector.
+    """
+    config = settings.ANOMALY_SCORING
+    k = k or config["K"]
+    chunk_size = chunk_size or config["CHUNK_SIZE"]
+    detector_type = detector_name(source)
+    loaded = load_index(source)
+    version, space = build_key(loaded), vector_space(loaded)
+
+    state = AnomalyScoringState.objects.filter(source=source).first()
+    # Scores stored before outlier ranks existed are redone in full
+    settings_match = state is not None and state.k == k and state.detector == detector_type and bool(state.reference_scores)
+    if settings_match and state.index_version == version and not full:
+        return {"source": source, "mode": "unchanged", "version": version, "scored": 0, "removed": 0}
+    full = full or not settings_match or state.vector_space != space
+
+    live = {int(position): str(record_id) for position, record_id in enumerate(loaded.id_map) if record_id is not None}
+    position_of = {record_id: position for position, record_id in live.items()}
+    stored = {
+        record_id: (neighbour_id, position)
+        for record_id, neighbour_id, position in AnomalyScore.objects.filter(source=source).values_list("record_id", "neighbour_id", "position").iterator(chunk_size=5000)
+    }
+    removed = [record_id for record_id in stored if record_id not in position_of]
+
+    def score(positions):
+        """Score `positions` chunk by chunk; returns the nearest neighbour of each."""
+        nearest_positions = []
+        for start in range(0, len(positions), chunk_size):
+            chunk = positions[start:start + chunk_size]
+            vectors, results = neighbour_scores(loaded, chunk, k)
+            outliers = outlier_scores(detector, vectors, [knn_distance for _, _, knn_distance in results])
+            ranks = outlier_ranks(reference, outliers)
+            AnomalyScore.objects.bulk_create(
+                [
+                    AnomalyScore(
+                        source=source,
+                        record_id=live[position],
+                        position=position,
+                        index_version=version,
+                        neighbour_id=live[nearest] if nearest is not None else "",
+                        similarity=similarity,
+                        knn_distance=knn_distance,
+                        outlier_score=float(outliers[row]),
+                        outlier_rank=float(ranks[row]),
+                        excerpt=(loaded.texts[position] or "")[:EXCERPT_CHARS].strip(),
+                    )
+                    for row, (position, (nearest, similarity, knn_distance)) in enumerate(zip(chunk, results))
+                ],
+                update_conflicts=True,
+                unique_fields=["source", "record_id"],
+                update_fields=["position", "index_version", "neighbour_id", "similarity", "knn_distance", "outlier_score", "outlier_rank", "excerpt", "scored_at"],
+            )
+            nearest_positions.extend(nearest for nearest, _, _ in results if nearest is not None)
+        return nearest_positions
+
+    if full:
+        targets = sorted(live)
+        detector, reference = fit_detector(detector_type, loaded, targets, config["DETECTOR_SAMPLE"], k)
+        score(targets)
+    else:
+        detector = pickle.loads(bytes(state.model)) if state.model else None
+        reference = _load(state.reference_scores)
+        # Changed records are re-added in a new slot, so a moved position means new content
+        fresh = sorted(position for position, record_id in live.items() if stored.get(record_id, (None, None))[1] != position)
+        # A new record may now be the nearest neighbour of the existing records near it,
+        # and records whose nearest neighbour changed or disappeared need a new one
+        affected = set(score(fresh))
+        moved = {live[position] for position in fresh}
+        affected.update(
+            position_of[record_id] for record_id, (neighbour, _) in stored.items()
+            if record_id in position_of and (neighbour not in position_of or neighbour in moved)
+        )
+        affected -= set(fresh)
+        score(sorted(affected))
+        targets = fresh + sorted(affected)
+
+    with transaction.atomic():
+        for start in range(0, len(removed), 500):
+            AnomalyScore.objects.filter(source=source, record_id__in=removed[start:start + 500]).delete()
+        AnomalyScoringState.objects.update_or_create(
+            source=source,
+            defaults={
+                "index_version": version,
+                "vector_space": space,
+                "k": k,
+                "detector": detector_type,
+                "model": pickle.dumps(detector) if detector is not None else b"",
+                "reference_scores": _dump(reference),
+            },
+        )
+    if full:
+        # Fresh planner statistics, so ranking several sources scans anomaly_score_rank_all in order instead of sorting
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {connection.ops.quote_name(AnomalyScore._meta.db_table)}")
+    return {
+        "source": source,
+        "mode": "full" if full else "incremental",
+        "version": version,
+        "scored": len(targets),
+        "removed": len(removed),
+    }
+
+
+def ranked_anomalies(sources):
+    """
+    AnomalyScore rows of `sources`, most anomalous first. Raw detector scores
+    of separately fitted sources are not comparable, so rows are ordered by
+    their per-source outlier rank (indexed per source and across sources).
+    """
+    return AnomalyScore.objects.filter(source__in=sources).order_by("-outlier_rank", "-outlier_score", "id")
+
+
+def low_similarity_records(source, threshold=None, limit=None, offset=0):
+    """
+    AnomalyScore rows of `source` whose nearest neighbour is less similar
+    than `threshold`, most isolated first; an index range scan on
+    (source, similarity).
+    """
+    threshold = settings.ANOMALY_SCORING["THRESHOLD"] if threshold is None else threshold
+    rows = AnomalyScore.objects.filter(source=source, similarity__lt=threshold).order_by("similarity", "id")
+    return rows[offset:offset + limit] if limit else rows[offset:]
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class LlmintegrationConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "llmintegration"
+
+    def ready(self):
+        from llmintegration import signals  # noqa: F401
@@ -0,0 +1,70 @@
+# article_filters.py
+
+from collections import defaultdict
+
+import numpy as np
+
+from vtagent.models import RawArticle
+
+
+class ArticleMetadata:
+    """
+    Metadata of every article in one build of the articles index, laid out
+    by index position and pre-partitioned for filter pushdown: positions
+    sorted by scrape time (a time window is one binary search) and position
+    sets per news source and per source category.
+    """
+
+    def __init__(self, loaded_index):
+        position_of = {record_id: position for position, record_id in enumerate(loaded_index.id_map) if record_id is not None}
+        times, timed_positions = [], []
+        by_source, by_category = defaultdict(list), defaultdict(list)
+
+        rows = RawArticle.objects.values_list("id", "scraped_at", "source__name", "source__category")
+        for article_id, scraped_at, source_name, category in rows.iterator(chunk_size=2000):
+            position = position_of.get(article_id)
+            if position is None:
+                continue  # Scraped after this build was vectorized
+            if scraped_at is not None:
+                times.append(scraped_at.timestamp())
+                timed_positions.append(position)
+            by_source[(source_name or "").lower()].append(position)
+            by_category[(category or "").lower()].append(position)
+
+        order = np.argsort(times, kind="stable")
+        self.times = np.asarray(times, dtype=np.float64)[order]
+        self.positions_by_time = np.asarray(timed_positions, dtype=np.int64)[order]
+        self.by_source = {name: np.unique(p) for name, p in by_source.items()}
+        self.by_category = {name: np.unique(p) for name, p in by_category.items()}
+
+    def _union(self, partitions, names):
+        parts = [partitions.get(name.lower()) for name in names]
+        parts = [p for p in parts if p is not None]
+        return np.unique(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+
+    def positions(self, since=None, sources=None, categories=None):
+        """Sorted positions of the articles matching every given predicate."""
+        selected = []
+        if since is not None:
+            start = np.searchsorted(self.times, since.timestamp(), side="left")
+            selected.append(np.sort(self.positions_by_time[start:]))
+        if sources:
+            selected.append(self._union(self.by_source, sources))
+        if categories:
+            selected.append(self._union(self.by_category, categories))
+
+        result = selected[0]
+        for positions in selected[1:]:
+            result = np.intersect1d(result, positions, assume_unique=True)
+        return result
+
+
+def article_positions(loaded_index, since=None, sources=None, categories=None):
+    """
+    Index positions allowed by the metadata predicates, for
+    LoadedIndex.search(allowed=...); None when nothing is filtered.
+    """
+    if since is None and not sources and not categories:
+        return None
+    metadata = loaded_index.derived("article_metadata", ArticleMetadata)
+    return metadata.positions(since=since, sources=sources, categories=categories)
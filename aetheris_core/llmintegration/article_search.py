@@ -0,0 +1,94 @@
+# article_search.py
+
+import re
+
+from django.db import connection
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+
+from vtagent.models import RawArticle
+
+
+# External-content FTS5 table over RawArticle.title/content; migration 0008_article_fts creates it
+# and the triggers that keep it in sync
+FTS_TABLE = "vtagent_rawarticle_fts"
+
+# bm25() column weights: a term in the title counts five times as much as one in the body
+BM25_WEIGHTS = (5.0, 1.0)
+
+TERM_RE = re.compile(r"[\w][\w.-]*")
+
+
+def fts_available():
+    return connection.vendor == "sqlite"
+
+
+def rebuild_article_fts():
+    """Re-read every article into the full-text table, e.g. after rows were written with the triggers bypassed."""
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def search_terms(text):
+    """Distinct lowercase terms of `text` worth matching on (stop words dropped)."""
+    terms = []
+    for term in TERM_RE.findall(text.lower()):
+        term = term.strip(".-")
+        if len(term) > 1 and term not in ENGLISH_STOP_WORDS and term not in terms:
+            terms.append(term)
+    return terms
+
+
+def match_expression(terms):
+    # Every term is quoted so user text cannot inject FTS5 operators; hyphenated terms become phrases
+    return " OR ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def lexical_search(text, limit=20, since=None, source=None):
+    """
+    BM25-ranked ids of the canonical articles matching any term of `text`,
+    best first, restricted to articles scraped after `since` and/or from
+    `source`.
+    """
+    terms = search_terms(text)
+    if not terms:
+        return []
+    if not fts_available():
+        # No FTS engine on this database; bounded substring search on the rarest-looking term
+        articles = RawArticle.canonical.filter(content__icontains=max(terms, key=len))
+        if since is not None:
+            articles = articles.filter(scraped_at__gte=since)
+        if source:
+            articles = articles.filter(source__name__iexact=source)
+        return list(articles.order_by("-scraped_at").values_list("id", flat=True)[:limit])
+
+    sql = [
+        f"SELECT a.id FROM {FTS_TABLE} f JOIN vtagent_rawarticle a ON a.id = f.rowid",
+        "JOIN vtagent_newssource s ON s.id = a.source_id" if source else "",
+        f"WHERE {FTS_TABLE} MATCH %s AND a.duplicate_of_id IS NULL",
+    ]
+    params = [match_expression(terms)]
+    if since is not None:
+        sql.append("AND a.scraped_at >= %s")
+        params.append(connection.ops.adapt_datetimefield_value(since))
+    if source:
+        sql.append("AND lower(s.name) = lower(%s)")
+        params.append(source)
+    sql.append(f"ORDER BY bm25({FTS_TABLE}, {BM25_WEIGHTS[0]}, {BM25_WEIGHTS[1]}) LIMIT %s")
+    params.append(limit)
+
+    with connection.cursor() as cursor:
+        cursor.execute(" ".join(sql), params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def reciprocal_rank_fusion(rankings, k=60):
+    """
+    Fuse ranked id lists: each list contributes 1 / (k + rank) for every id
+    it contains. Scores from different retrievers are not comparable, ranks
+    are, so BM25 and vector distances need no calibration.
+    """
+    scores = {}
+    for ranking in rankings:
+        for rank, record_id in enumerate(ranking, start=1):
+            scores[record_id] = scores.get(record_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores, key=lambda record_id: -scores[record_id])
@@ -0,0 +1,179 @@
+# asset_index.py
+
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db.models import Count, Max
+
+from syntheticcmdb.models import ConfigurationItem
+
+
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:[-.][a-z0-9]+)*")
+
+# OS name token -> family / vendor tokens added to the asset's postings
+OS_FAMILIES = {
+    "windows": ["windows", "microsoft"],
+    "macos": ["macos", "apple"],
+    "ubuntu": ["linux", "ubuntu", "canonical"],
+    "centos": ["linux", "centos", "redhat"],
+    "redhat": ["linux", "redhat"],
+    "alpine": ["linux", "alpine"],
+    "linux": ["linux"],
+    "pan-os": ["pan-os", "palo", "alto"],
+    "fortios": ["fortios", "fortinet", "fortigate"],
+    "ontap": ["ontap", "netapp"],
+}
+
+ASSET_FIELDS = ("id", "asset_type", "os", "software", "security_software", "hardware_vendor", "city", "department")
+
+
+def tokenize(text):
+    """Lowercase `text` and split it into tokens; hyphenated/dotted words also yield their parts."""
+    tokens = set()
+    for token in TOKEN_RE.findall(str(text or "").lower()):
+        tokens.add(token)
+        if "-" in token or "." in token:
+            tokens.update(part for part in re.split(r"[-.]", token) if part)
+    return tokens
+
+
+def asset_tokens(asset):
+    """Normalised product, vendor, software and OS-family tokens for one asset row."""
+    tokens = set()
+    for field in ("asset_type", "os", "security_software", "hardware_vendor"):
+        tokens |= tokenize(asset[field])
+    software = asset["software"] or []
+    for name in software if isinstance(software, list) else [software]:
+        tokens |= tokenize(name)
+    for token in list(tokens):
+        tokens.update(OS_FAMILIES.get(token, ()))
+    return tokens
+
+
+def _key(value):
+    return str(value or "").strip().lower()
+
+
+class AssetIndex:
+    """
+    Inverted index from normalised asset tokens, cities and departments to
+    ConfigurationItem ids.
+
+    Threat-to-asset correlation becomes a handful of set intersections
+    instead of a substring scan over every asset. The index is kept current
+    through model signals (see llmintegration.signals) and, for bulk writes
+    that bypass signals, by comparing a cheap table watermark at most every
+    ASSET_INDEX_REFRESH_INTERVAL seconds.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._tokens = defaultdict(set)
+        self._cities = defaultdict(set)
+        self._departments = defaultdict(set)
+        self._assets = {}
+        self._watermark = None
+        self._checked_at = 0
+
+    # --- Maintenance ---
+
+    def _watermark_now(self):
+        stats = ConfigurationItem.objects.aggregate(count=Count("id"), max_id=Max("id"), updated=Max("last_updated"))
+        return stats["count"], stats["max_id"], stats["updated"]
+
+    def rebuild(self):
+        tokens, cities, departments, assets = defaultdict(set), defaultdict(set), defaultdict(set), {}
+        watermark = self._watermark_now()
+        for asset in ConfigurationItem.objects.values(*ASSET_FIELDS).iterator(chunk_size=2000):
+            entry = (asset_tokens(asset), _key(asset["city"]), _key(asset["department"]))
+            assets[asset["id"]] = entry
+            for token in entry[0]:
+                tokens[token].add(asset["id"])
+            cities[entry[1]].add(asset["id"])
+            departments[entry[2]].add(asset["id"])
+        with self._lock:
+            self._tokens, self._cities, self._departments, self._assets = tokens, cities, departments, assets
+            self._watermark = watermark
+            self._checked_at = time.monotonic()
+
+    def _ensure_current(self):
+        now = time.monotonic()
+        if self._watermark is not None and now - self._checked_at < settings.ASSET_INDEX_REFRESH_INTERVAL:
+            return
+        with self._lock:
+            self._checked_at = now
+            if self._watermark is None or self._watermark_now() != self._watermark:
+                self.rebuild()
+
+    def discard(self, asset_id):
+        with self._lock:
+            entry = self._assets.pop(asset_id, None)
+            if entry is None:
+                return
+            tokens, city, department = entry
+            for token in tokens:
+                self._tokens[token].discard(asset_id)
+            self._cities[city].discard(asset_id)
+            self._departments[department].discard(asset_id)
+
+    def update(self, item):
+        """Re-index a single ConfigurationItem after it was saved."""
+        asset = {field: getattr(item, field) for field in ASSET_FIELDS}
+        with self._lock:
+            if self._watermark is None:
+                return  # Not built yet; the first query builds from the DB
+            self.discard(item.id)
+            entry = (asset_tokens(asset), _key(asset["city"]), _key(asset["department"]))
+            self._assets[item.id] = entry
+            for token in entry[0]:
+                self._tokens[token].add(item.id)
+            self._cities[entry[1]].add(item.id)
+            self._departments[entry[2]].add(item.id)
+            self._watermark = self._watermark_now()
+
+    def remove(self, asset_id):
+        with self._lock:
+            self.discard(asset_id)
+            if self._watermark is not None:
+                self._watermark = self._watermark_now()
+
+    # --- Queries ---
+
+    def scope(self, city=None, department=None):
+        """Ids of assets in `city` and `department` (None = no restriction)."""
+        self._ensure_current()
+        with self._lock:
+            ids = set(self._assets)
+            if city:
+                ids &= self._cities.get(_key(city), set())
+            if department:
+                ids &= self._departments.get(_key(department), set())
+            return ids
+
+    def match(self, keywords, city=None, department=None, limit=20):
+        """
+        Rank assets in scope by how many of `keywords` they match and return
+        the top `limit` ids. A multi-word keyword matches when the asset has
+        every one of its tokens.
+        """
+        scope = self.scope(city, department)
+        hits = Counter()
+        with self._lock:
+            for keyword in set(keywords):
+                postings = [self._tokens.get(token, set()) for token in tokenize(keyword)]
+                if not postings:
+                    continue
+                for asset_id in set.intersection(*postings) & scope:
+                    hits[asset_id] += 1
+        ranked = sorted(hits.items(), key=lambda hit: (-hit[1], hit[0]))
+        return [asset_id for asset_id, _ in ranked[:limit]], len(hits)
+
+
+asset_index = AssetIndex()
+
+
+def get_asset_index():
+    return asset_index
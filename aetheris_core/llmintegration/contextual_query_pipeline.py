@@ -1,30 +1,27 @@
 # contextual_query_pipeline.py
 
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
 from django.db.models import Q
-from vtagent.models import RawArticle, GeneratedTaxonomyLabel
+from django.utils import timezone
+from vtagent.models import RawArticle, NewsSource
 from syntheticcmdb.models import ConfigurationItem
-from llmintegration.llm_utils import call_gemini
-import faiss
-import pickle
-import os
-import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from collections import Counter, defaultdict
-
-# Paths
-INDEX_PATH = os.path.join("faiss", "articles", "index.index")
-ID_MAP_PATH = os.path.join("faiss", "articles", "id_map.pkl")
-TEXTS_PATH = os.path.join("faiss", "articles", "texts.pkl")
-VECTORIZER_PATH = os.path.join("faiss", "articles", "vectorizer.pkl")
-
-# Load FAISS index and associated mappings
-faiss_index = faiss.read_index(INDEX_PATH)
-with open(ID_MAP_PATH, "rb") as f:
-    id_map = pickle.load(f)
-with open(TEXTS_PATH, "rb") as f:
-    texts = pickle.load(f)
-with open(VECTORIZER_PATH, "rb") as f:
-    vectorizer: TfidfVectorizer = pickle.load(f)
+from llmintegration.llm_utils import acall_gemini, call_gemini, stream_gemini
+from llmintegration.index_registry import get_index
+from llmintegration.asset_index import get_asset_index
+from llmintegration.response_cache import evidence_key
+from llmintegration.prompt_budget import PromptSection, format_usage, get_assembler
+from llmintegration.label_facets import article_facets, global_facets
+from llmintegration.article_filters import article_positions
+from llmintegration.article_search import lexical_search, reciprocal_rank_fusion
+from llmintegration.story_clusters import one_per_story
+
+logger = logging.getLogger(__name__)
 
 
 def classify_prompt_type(query: str) -> str:
@@ -44,45 +41,25 @@ def extract_filter_entities(query):
     query = query.lower()
     cities = ["berlin", "london", "frankfurt", "osaka", "edinburgh", "manchester"]
     departments = ["finance", "hr", "engineering", "it", "devops", "security"]
-    found = {"city": None, "department": None}
+    found = {"city": None, "department": None, "source": None}
     for city in cities:
         if city in query:
             found["city"] = city.title()
     for dept in departments:
         if dept in query:
             found["department"] = dept.title()
+    # Restrict article retrieval to a news source named in the query
+    for name in NewsSource.objects.values_list("name", flat=True):
+        if name and name.lower() in query:
+            found["source"] = name
     return found
 
 
-def summarize_labels(labels):
-    groups = defaultdict(Counter)
-    for l in labels:
-        if isinstance(l.platform, list):
-            groups["platform"].update(l.platform)
-        if isinstance(l.os, str):
-            groups["os"].update([l.os])
-        if isinstance(l.department, str):
-            groups["department"].update([l.department])
-        if isinstance(l.country, str):
-            groups["country"].update([l.country])
-        if isinstance(l.city, str):
-            groups["city"].update([l.city])
-        if isinstance(l.severity, list):
-            groups["severity"].update(l.severity)
-        if isinstance(l.impact, list):
-            groups["impact"].update(l.impact)
-        if isinstance(l.actor, list):
-            groups["actor"].update(l.actor)
-        if isinstance(l.mitre_tactics, list):
-            groups["mitre_tactics"].update(l.mitre_tactics)
-    return groups
-
-
 def extract_time_filter(query):
     """Extract time-based filters from query"""
     query = query.lower()
-    from datetime import datetime, timedelta
-    now = datetime.now()
+    from datetime import timedelta
+    now = timezone.now()  # scraped_at is timezone-aware (USE_TZ)
     
     if any(x in query for x in ["last 24 hours", "past 24 hours", "today"]):
         return now - timedelta(hours=24)
@@ -92,8 +69,56 @@ def extract_time_filter(query):
         return now - timedelta(days=30)
     return None
 
-def handle_inventory_query(user_query, filters, conversation_history=None):
-    """Handle asset inventory and counting queries"""
+def history_section(user_query, conversation_history, max_messages, reply_chars):
+    """Conversation context as a budgeted section; the most recent turns are kept first"""
+    items = []
+    for msg in (conversation_history or [])[-max_messages:]:
+        if msg["role"] == "chat-user":
+            items.append((f"**Previous User:** {msg['text']}", f"**Previous User:** {msg['text'][:100]}..."))
+        elif msg["role"] == "chat-bot":
+            # Use raw text if available, otherwise clean the HTML/markdown
+            if 'text' in msg:
+                clean_text = msg['text'][:reply_chars]
+            else:
+                clean_text = msg.get('text_html', '').replace('<p>', '').replace('</p>', '').replace('**', '').replace('#', '')[:reply_chars]
+            items.append((f"**Previous Response:** {clean_text}...", f"**Previous Response:** {clean_text[:60]}..."))
+    return PromptSection(
+        "history", items, keep="tail",
+        header="\n### Conversation Context:\n",
+        footer=f"\n\n**Current User Query:** {user_query}\n",
+        empty=f"\n### User Query:\n{user_query}\n",
+    )
+
+def assemble_prompt(prompt_name, template, sections, **values):
+    prompt = get_assembler(prompt_name).assemble(template, sections, **values)
+    logger.debug("%s prompt: %s", prompt_name, format_usage(prompt.usage))
+    return prompt
+
+INVENTORY_PROMPT = """
+You are Aetheris Asset Intelligence Assistant. The user is asking about organizational asset inventory.
+
+{history}
+
+### Asset Inventory Summary:
+- **Total Assets**: {total_assets}
+- **Servers**: {server_count}
+- **Other Infrastructure**: {other_count}
+
+### Asset Breakdown by Type:
+{breakdown}
+
+### Geographic Distribution:
+{locations}
+
+IMPORTANT: If this is a follow-up question, refer to the conversation context above and provide relevant comparisons or additional details based on the previous discussion.
+
+Provide a clear, concise response about the organization's IT infrastructure. Focus on answering the specific question while providing relevant context about the asset landscape.
+
+Format response in clean Markdown.
+"""
+
+def build_inventory_prompt(user_query, filters, conversation_history=None):
+    """Build the prompt for asset inventory and counting queries"""
     from collections import Counter
     from syntheticad.models import ADUser, ADGroup, ServiceAccount
     from syntheticemployees.models import Employee
@@ -102,7 +127,7 @@ def handle_inventory_query(user_query, filters, conversation_history=None):
     
     # Detect if asking about users/people
     if any(x in query_lower for x in ["user", "users", "people", "employee", "employees", "account", "accounts"]):
-        return handle_user_inventory_query(user_query, filters, conversation_history)
+        return build_user_inventory_prompt(user_query, filters, conversation_history)
     
     # Otherwise handle asset inventory
     assets = ConfigurationItem.objects.all()
@@ -118,65 +143,54 @@ def handle_inventory_query(user_query, filters, conversation_history=None):
     total_assets = assets.count()
     server_count = assets.filter(asset_type__icontains="server").count()
     
-    asset_breakdown = "| Asset Type | Count |\n|------------|-------|\n"
-    for asset_type, count in asset_counts.most_common(10):
-        asset_breakdown += f"| {asset_type} | {count} |\n"
-    
     # Location breakdown
     location_counts = Counter()
     for asset in assets.values('city', 'country'):
         location_counts[f"{asset['city']}, {asset['country']}"] += 1
     
-    location_breakdown = "| Location | Assets |\n|----------|--------|\n"
-    for location, count in location_counts.most_common(5):
-        location_breakdown += f"| {location} | {count} |\n"
-    
     # Build conversation context if available
-    context_section = ""
-    if conversation_history and len(conversation_history) > 0:
-        recent_history = conversation_history[-4:]  # Last 2 exchanges
-        context_section = "\n### Conversation Context:\n"
-        for msg in recent_history:
-            if msg["role"] == "chat-user":
-                context_section += f"**Previous User:** {msg['text']}\n"
-            elif msg["role"] == "chat-bot":
-                # Use raw text if available, otherwise clean the HTML/markdown
-                if 'text' in msg:
-                    clean_text = msg['text'][:150]
-                else:
-                    clean_text = msg.get('text_html', '').replace('<p>', '').replace('</p>', '').replace('**', '').replace('#', '')[:150]
-                context_section += f"**Previous Response:** {clean_text}...\n"
-        context_section += f"\n**Current User Query:** {user_query}\n"
-    else:
-        context_section = f"\n### User Query:\n{user_query}\n"
+    sections = [
+        history_section(user_query, conversation_history, max_messages=4, reply_chars=150),
+        PromptSection("breakdown", [f"| {asset_type} | {count} |" for asset_type, count in asset_counts.most_common(10)],
+                      header="| Asset Type | Count |\n|------------|-------|\n"),
+        PromptSection("locations", [f"| {location} | {count} |" for location, count in location_counts.most_common(5)],
+                      header="| Location | Assets |\n|----------|--------|\n"),
+    ]
+    return assemble_prompt(
+        "inventory", INVENTORY_PROMPT, sections,
+        total_assets=total_assets, server_count=server_count, other_count=total_assets - server_count,
+    )
 
-    prompt = f"""
-You are Aetheris Asset Intelligence Assistant. The user is asking about organizational asset inventory.
+def handle_inventory_query(user_query, filters, conversation_history=None):
+    """Handle asset inventory and counting queries"""
+    return call_gemini(build_inventory_prompt(user_query, filters, conversation_history))
 
-{context_section}
+USER_INVENTORY_PROMPT = """
+You are Aetheris Identity & Access Management Assistant. The user is asking about organizational user accounts and identity management.
 
-### Asset Inventory Summary:
-- **Total Assets**: {total_assets}
-- **Servers**: {server_count}
-- **Other Infrastructure**: {total_assets - server_count}
+{history}
 
-### Asset Breakdown by Type:
-{asset_breakdown}
+### User Account Summary:
+- **Total AD Users**: {ad_user_count}
+- **Total Employees**: {employee_count}
+- **AD Groups**: {group_count}
+- **Service Accounts**: {service_account_count}
 
-### Geographic Distribution:
-{location_breakdown}
+### Users by Department:
+{departments}
+
+### Users by Location:
+{locations}
 
 IMPORTANT: If this is a follow-up question, refer to the conversation context above and provide relevant comparisons or additional details based on the previous discussion.
 
-Provide a clear, concise response about the organization's IT infrastructure. Focus on answering the specific question while providing relevant context about the asset landscape.
+Provide a clear, direct answer to the user's question about user accounts. Include relevant organizational context and identity management insights.
 
 Format response in clean Markdown.
 """
-    
-    return call_gemini(prompt)
 
-def handle_user_inventory_query(user_query, filters, conversation_history=None):
-    """Handle user/employee inventory queries"""
+def build_user_inventory_prompt(user_query, filters, conversation_history=None):
+    """Build the prompt for user/employee inventory queries"""
     from collections import Counter
     from syntheticad.models import ADUser, ADGroup, ServiceAccount
     from syntheticemployees.models import Employee
@@ -199,70 +213,25 @@ def handle_user_inventory_query(user_query, filters, conversation_history=None):
     dept_counts = Counter(ad_users.values_list('department', flat=True))
     location_counts = Counter(ad_users.values_list('country', flat=True))
     
-    # Build tables
-    dept_breakdown = "| Department | Users |\n|------------|-------|\n"
-    for dept, count in dept_counts.most_common(10):
-        dept_breakdown += f"| {dept} | {count} |\n"
-    
-    location_breakdown = "| Location | Users |\n|----------|-------|\n"
-    for location, count in location_counts.most_common(5):
-        location_breakdown += f"| {location} | {count} |\n"
-    
-    # Build conversation context if available
-    context_section = ""
-    if conversation_history and len(conversation_history) > 0:
-        recent_history = conversation_history[-4:]  # Last 2 exchanges
-        context_section = "\n### Conversation Context:\n"
-        for msg in recent_history:
-            if msg["role"] == "chat-user":
-                context_section += f"**Previous User:** {msg['text']}\n"
-            elif msg["role"] == "chat-bot":
-                # Use raw text if available, otherwise clean the HTML/markdown
-                if 'text' in msg:
-                    clean_text = msg['text'][:150]
-                else:
-                    clean_text = msg.get('text_html', '').replace('<p>', '').replace('</p>', '').replace('**', '').replace('#', '')[:150]
-                context_section += f"**Previous Response:** {clean_text}...\n"
-        context_section += f"\n**Current User Query:** {user_query}\n"
-    else:
-        context_section = f"\n### User Query:\n{user_query}\n"
-
-    prompt = f"""
-You are Aetheris Identity & Access Management Assistant. The user is asking about organizational user accounts and identity management.
-
-{context_section}
-
-### User Account Summary:
-- **Total AD Users**: {ad_users.count()}
-- **Total Employees**: {employees.count()}
-- **AD Groups**: {ad_groups.count()}
-- **Service Accounts**: {service_accounts.count()}
-
-### Users by Department:
-{dept_breakdown}
-
-### Users by Location:
-{location_breakdown}
-
-IMPORTANT: If this is a follow-up question, refer to the conversation context above and provide relevant comparisons or additional details based on the previous discussion.
-
-Provide a clear, direct answer to the user's question about user accounts. Include relevant organizational context and identity management insights.
+    sections = [
+        history_section(user_query, conversation_history, max_messages=4, reply_chars=150),
+        PromptSection("departments", [f"| {dept} | {count} |" for dept, count in dept_counts.most_common(10)],
+                      header="| Department | Users |\n|------------|-------|\n"),
+        PromptSection("locations", [f"| {location} | {count} |" for location, count in location_counts.most_common(5)],
+                      header="| Location | Users |\n|----------|-------|\n"),
+    ]
+    return assemble_prompt(
+        "user_inventory", USER_INVENTORY_PROMPT, sections,
+        ad_user_count=ad_users.count(), employee_count=employees.count(),
+        group_count=ad_groups.count(), service_account_count=service_accounts.count(),
+    )
 
-Format response in clean Markdown.
-"""
-    
-    return call_gemini(prompt)
+def handle_user_inventory_query(user_query, filters, conversation_history=None):
+    """Handle user/employee inventory queries"""
+    return call_gemini(build_user_inventory_prompt(user_query, filters, conversation_history))
 
-def build_gemini_prompt_and_response(user_query, conversation_history=None):
-    filters = extract_filter_entities(user_query)
-    time_filter = extract_time_filter(user_query)
-    prompt_type = classify_prompt_type(user_query)
-    
-    # For inventory queries, focus on assets rather than articles
-    if prompt_type == "inventory":
-        return handle_inventory_query(user_query, filters, conversation_history)
-    
-    # Enhance query with conversation context for better vector search
+def extract_context_keywords(user_query, conversation_history=None):
+    """Derive threat keywords from recent conversation turns and fold them into the search query"""
     enhanced_query = user_query
     context_keywords = []
     
@@ -285,66 +254,31 @@ def build_gemini_prompt_and_response(user_query, conversation_history=None):
         if context_keywords:
             enhanced_query = user_query + " " + " ".join(set(context_keywords))
     
-    # Optional: Add debug logging when needed
-    # print(f"[DEBUG PIPELINE] Enhanced query: {enhanced_query}")
-    # print(f"[DEBUG PIPELINE] Context keywords: {context_keywords}")
-    
-    # Try multiple search strategies
-    query_vec = vectorizer.transform([enhanced_query]).astype(np.float32).toarray()
-    scores, indices = faiss_index.search(query_vec, 20)  # Get more results for better filtering
-    matched_ids = [id_map[i] for i in indices[0] if i < len(id_map)]
-    
-    # If we have context keywords, also try a direct keyword search
-    if context_keywords:
-        keyword_query = " ".join(context_keywords)
-        keyword_vec = vectorizer.transform([keyword_query]).astype(np.float32).toarray()
-        keyword_scores, keyword_indices = faiss_index.search(keyword_vec, 10)
-        keyword_matched_ids = [id_map[i] for i in keyword_indices[0] if i < len(id_map)]
-        
-        # Combine results, prioritizing keyword matches
-        all_matched_ids = list(dict.fromkeys(keyword_matched_ids + matched_ids))  # Remove duplicates, keep order
-        matched_ids = all_matched_ids[:15]  # Limit to reasonable number
-    
-    # Get articles but preserve FAISS ordering (most relevant first)
-    articles_dict = {a.id: a for a in RawArticle.objects.filter(id__in=matched_ids)}
-    articles = [articles_dict[aid] for aid in matched_ids if aid in articles_dict]
-    
-    # Apply time filter while preserving order
-    if time_filter:
-        articles = [a for a in articles if a.scraped_at >= time_filter]
-    
-    # Boost articles that contain context keywords in title or content
-    if context_keywords:
-        # First, try to find articles from our search that match context
-        boosted_articles = []
-        other_articles = []
-        
-        for article in articles:
-            article_text = (article.title + " " + article.content).lower()
-            matches_context = any(keyword in article_text for keyword in context_keywords)
-            if matches_context:
-                boosted_articles.append(article)
-            else:
-                other_articles.append(article)
-        
-        # If we didn't find enough context-relevant articles, do a direct database search
-        if len(boosted_articles) < 2:
-            for keyword in context_keywords:
-                if keyword in ['webdav', 'zero-day', 'microsoft']:
-                    # Direct database search for this specific keyword
-                    direct_matches = RawArticle.objects.filter(
-                        content__icontains=keyword
-                    ).order_by('-scraped_at')[:3]
-                    
-                    for article in direct_matches:
-                        if article not in boosted_articles:
-                            boosted_articles.append(article)
-        
-        # Prioritize context-relevant articles
-        articles = (boosted_articles + other_articles)[:5]
-    else:
-        articles = articles[:5]  # Limit to top 5 after filtering
+    return enhanced_query, context_keywords
+
+def search_article_ids(query, top_k, time_filter=None, filters=None):
+    """Top-k article ids among the articles matching the time and source filters"""
+    index = get_index("articles")
+    source = filters.get("source") if filters else None
+    allowed = article_positions(index, since=time_filter, sources=[source] if source else None)
+    return [record_id for record_id, _, _ in index.search(query, top_k, allowed=allowed)]
+
+def lexical_article_ids(text, top_k, time_filter=None, filters=None):
+    """BM25 full-text matches under the same time and source filters as the vector search"""
+    return lexical_search(text, top_k, since=time_filter, source=filters.get("source") if filters else None)
 
+def fuse_article_ids(*rankings):
+    # Reciprocal rank fusion of the vector and full-text rankings
+    return reciprocal_rank_fusion(rankings, k=settings.ARTICLE_RRF_K)
+
+def hydrate_articles(matched_ids, limit=5):
+    # Several write-ups of the same incident would repeat one story: keep its best-ranked article
+    matched_ids = one_per_story(matched_ids[:limit * 4])
+    # Get the top articles but preserve the fused ordering (most relevant first)
+    articles_dict = RawArticle.objects.select_related("source").in_bulk(matched_ids[:limit * 2])
+    return [articles_dict[aid] for aid in matched_ids if aid in articles_dict][:limit]
+
+def extract_threat_keywords(articles):
     # Extract threat indicators from articles to correlate with assets
     threat_keywords = []
     for article in articles:
@@ -357,113 +291,67 @@ def build_gemini_prompt_and_response(user_query, conversation_history=None):
             threat_keywords.extend(["linux"])
         if any(x in content_lower for x in ["vpn", "gateway", "firewall"]):
             threat_keywords.extend(["vpn", "firewall"])
-    
-    # Generate article text for LLM prompt
-    article_text = "\n\n".join([f"### {a.title}\n**Source:** {a.source.name}\n**Published:** {a.published}\n**URL:** {a.url}\n{a.content[:800]}..." for a in articles])
-
-    # Get taxonomy labels for the matched articles specifically
-    article_ids = [a.id for a in articles]
-    labels = GeneratedTaxonomyLabel.objects.filter(raw_article_id__in=article_ids)
-    if filters["city"]:
-        labels = labels.filter(city__icontains=filters["city"])
-    if filters["department"]:
-        labels = labels.filter(department__icontains=filters["department"])
-    
-    # Also get general organizational labels for context
-    general_labels = GeneratedTaxonomyLabel.objects.exclude(raw_article_id__in=article_ids)[:20]
-    all_labels = list(labels) + list(general_labels)
-    grouped = summarize_labels(all_labels)
-
-    label_summary = ""
-    for key, counter in grouped.items():
-        label_summary += f"\n**{key.title()}**:\n"
-        for val, count in counter.most_common(10):
-            label_summary += f"- {val}: {count}\n"
-
-    # Correlate assets based on threat indicators
-    assets = ConfigurationItem.objects.all()
-    if filters["city"]:
-        assets = assets.filter(city__iexact=filters["city"])
-    if filters["department"]:
-        assets = assets.filter(department__iexact=filters["department"])
-    
-    # Filter assets based on threat relevance
-    relevant_assets = []
-    for asset in assets:
-        is_relevant = False
-        for keyword in threat_keywords:
-            if (keyword in asset.asset_type.lower() or 
-                keyword in asset.os.lower() or 
-                keyword in str(asset.software).lower() or
-                keyword in asset.security_software.lower()):
-                is_relevant = True
-                break
-        if is_relevant:
-            relevant_assets.append(asset)
-    
-    # If no specific correlation, show sample of all assets
-    if not relevant_assets:
-        relevant_assets = list(assets[:20])
+    return threat_keywords
+
+def fetch_article_labels(article_ids, filters):
+    # Precomputed facet counts of the taxonomy labels of the matched articles
+    return article_facets(article_ids, filters)
+
+def fetch_general_labels(article_ids):
+    # Organization-wide facet counts for context
+    return global_facets(top=10)
+
+def label_section(article_labels, general_labels):
+    """
+    Label facets as a budgeted section: the matched articles' facets rank above
+    the organization-wide ones, and each facet shrinks to its top values before
+    it is dropped.
+    """
+    items = []
+    for suffix, grouped in (("", article_labels), (" (all labels)", general_labels)):
+        for key, counter in grouped.items():
+            variants = []
+            for top in (10, 5, 3):
+                variants.append(f"\n**{key.title()}{suffix}**:\n" + "".join(f"- {val}: {count}\n" for val, count in counter.most_common(top)))
+            items.append(tuple(dict.fromkeys(variants)))
+    return PromptSection("labels", items, separator="")
+
+def correlate_assets(threat_keywords, filters):
+    """Return (relevant_assets, total_assets) for the threat keywords within the city/department filters"""
+    # Correlate assets based on threat indicators using the inverted asset index
+    asset_index = get_asset_index()
+    total_assets = len(asset_index.scope(filters["city"], filters["department"]))
+    top_asset_ids, _ = asset_index.match(threat_keywords, filters["city"], filters["department"], limit=20)
+
+    asset_columns = ("id", "asset_type", "os", "employee_email", "city", "country", "software")
+    if top_asset_ids:
+        # Hydrate only the top-N matches, keeping the index ranking
+        assets_by_id = ConfigurationItem.objects.only(*asset_columns).in_bulk(top_asset_ids)
+        relevant_assets = [assets_by_id[aid] for aid in top_asset_ids if aid in assets_by_id]
     else:
-        relevant_assets = relevant_assets[:20]
-
-    asset_header = "| Type | OS | Email | Location | Software |\n|------|----|---------|-----------|---------| "
-    asset_table = "\n".join([
-        f"| {a.asset_type} | {a.os} | {a.employee_email} | {a.city}, {a.country} | {', '.join(a.software[:2]) if a.software else 'N/A'} |" 
-        for a in relevant_assets
-    ])
-
-    # Count relevant vs total assets for context
-    total_assets = assets.count()
-    relevant_count = len(relevant_assets)
-    
-    # Generate source attribution
-    sources_info = []
-    for article in articles:
-        sources_info.append(f"- **{article.source.name}**: {article.title} ({article.published})")
-    source_attribution = "\n".join(sources_info) if sources_info else "No recent sources found"
-
-    # Build conversation context if available
-    context_section = ""
-    if conversation_history and len(conversation_history) > 0:
-        # Get last few exchanges for context
-        recent_history = conversation_history[-6:]  # Last 3 exchanges (user + bot pairs)
-        context_section = "\n### Conversation Context:\n"
-        
-        # Build context section from conversation history
-        for i, msg in enumerate(recent_history):
-            if msg["role"] == "chat-user":
-                context_section += f"**Previous User:** {msg['text']}\n"
-            elif msg["role"] == "chat-bot":
-                # Use raw text if available, otherwise clean the HTML/markdown
-                if 'text' in msg:
-                    clean_text = msg['text'][:200]
-                else:
-                    # Fallback to cleaning HTML/markdown
-                    clean_text = msg.get('text_html', '').replace('<p>', '').replace('</p>', '').replace('**', '').replace('#', '')[:200]
-                context_section += f"**Previous Response:** {clean_text}...\n"
-        
-        context_section += "\n**Current User Query:** " + user_query + "\n"
-    else:
-        context_section = f"\n### User Query:\n{user_query}\n"
+        # If no specific correlation, show sample of all assets
+        assets = ConfigurationItem.objects.only(*asset_columns)
+        if filters["city"]:
+            assets = assets.filter(city__iexact=filters["city"])
+        if filters["department"]:
+            assets = assets.filter(department__iexact=filters["department"])
+        relevant_assets = list(assets[:20])
+    return relevant_assets, total_assets
 
-    prompt = f"""
+THREAT_PROMPT = """
 You are Aetheris Threat Intelligence Assistant, an advanced cybersecurity analyst with access to external threat intelligence and internal organizational data.
 
-{context_section}
-
-### Recent Threat Intelligence Sources:
-{source_attribution}
+{history}
 
 ### Threat Articles Analysis:
-{article_text}
+{articles}
 
 ### Organizational Context:
-{label_summary}
+{labels}
 
-### Potentially Affected Internal Assets ({relevant_count}/{total_assets} assets shown):
+### Potentially Affected Internal Assets ({assets_count}/{total_assets} assets shown):
 {asset_header}
-{asset_table}
+{assets}
 
 Please provide a comprehensive threat analysis including:
 - **## Summary** - Key threat overview and potential organizational impact
@@ -478,8 +366,143 @@ Focus on high-severity threats and provide actionable intelligence.
 Format response in clean Markdown.
 """
 
+def render_threat_prompt(user_query, conversation_history, articles, article_labels, general_labels, relevant_assets, total_assets):
+    # Articles are ranked best first; lower-ranked ones lose body text, then are dropped, when over budget.
+    # Each keeps its source in the heading, so a dropped article takes its source line with it.
+    article_items = []
+    for a in articles:
+        heading = f"### {a.title}\n**Source:** {a.source.name}\n**Published:** {a.published}\n**URL:** {a.url}"
+        article_items.append((f"{heading}\n{a.content[:800]}...", f"{heading}\n{a.content[:300]}...", heading))
+
+    sections = [
+        history_section(user_query, conversation_history, max_messages=6, reply_chars=200),
+        PromptSection("articles", article_items, separator="\n\n", empty="No recent threat articles found"),
+        label_section(article_labels, general_labels),
+        PromptSection("assets", [
+            f"| {a.asset_type} | {a.os} | {a.employee_email} | {a.city}, {a.country} | {', '.join(a.software[:2]) if a.software else 'N/A'} |"
+            for a in relevant_assets
+        ]),
+    ]
+    return assemble_prompt(
+        "threat", THREAT_PROMPT, sections,
+        total_assets=total_assets,
+        asset_header="| Type | OS | Email | Location | Software |\n|------|----|---------|-----------|---------| ",
+    )
+
+def threat_evidence_key(user_query, conversation_history, articles, relevant_assets):
+    # Answers are reused only while the same articles and assets are retrieved for the question
+    record_ids = [f"Article:{a.id}" for a in articles] + [f"CMDB:{a.id}" for a in relevant_assets]
+    return evidence_key(user_query, record_ids, conversation_history)
+
+def build_gemini_request(user_query, conversation_history=None):
+    """
+    Run retrieval and correlation for `user_query` and return (prompt, cache_key).
+    cache_key is None when the prompt itself should key the response cache.
+    """
+    filters = extract_filter_entities(user_query)
+    time_filter = extract_time_filter(user_query)
+    prompt_type = classify_prompt_type(user_query)
+    
+    # For inventory queries, focus on assets rather than articles
+    if prompt_type == "inventory":
+        return build_inventory_prompt(user_query, filters, conversation_history), None
+    
+    # Enhance query with conversation context for better vector search
+    enhanced_query, context_keywords = extract_context_keywords(user_query, conversation_history)
+    
+    # Vector and full-text retrieval, fused by rank. Time and source filters are evaluated
+    # inside both indexes, so every hit already qualifies. Context keywords from the
+    # conversation get a ranking of their own, which lifts articles that mention them.
+    rankings = [
+        search_article_ids(enhanced_query, 20, time_filter, filters),
+        lexical_article_ids(enhanced_query, 20, time_filter, filters),
+    ]
+    if context_keywords:
+        rankings.append(lexical_article_ids(" ".join(context_keywords), 10, time_filter, filters))
+    articles = hydrate_articles(fuse_article_ids(*rankings))
+    threat_keywords = extract_threat_keywords(articles)
+
+    article_ids = [a.id for a in articles]
+    article_labels = fetch_article_labels(article_ids, filters)
+    general_labels = fetch_general_labels(article_ids)
+    relevant_assets, total_assets = correlate_assets(threat_keywords, filters)
+
     # Optional: Add debug logging when needed for troubleshooting
-    # print(f"[DEBUG PIPELINE] Final prompt length: {len(prompt)}")
+    # print(f"[DEBUG PIPELINE] Enhanced query: {enhanced_query}")
     # print(f"[DEBUG PIPELINE] Articles included: {len(articles)}")
 
-    return call_gemini(prompt)
\ No newline at end of file
+    prompt = render_threat_prompt(user_query, conversation_history, articles, article_labels, general_labels, relevant_assets, total_assets)
+    return prompt, threat_evidence_key(user_query, conversation_history, articles, relevant_assets)
+
+def build_gemini_prompt(user_query, conversation_history=None):
+    """Run retrieval and correlation for `user_query` and return the Gemini prompt"""
+    return build_gemini_request(user_query, conversation_history)[0]
+
+def build_gemini_prompt_and_response(user_query, conversation_history=None):
+    prompt, cache_key = build_gemini_request(user_query, conversation_history)
+    return call_gemini(prompt, cache_key=cache_key)
+
+def stream_gemini_prompt_and_response(user_query, conversation_history=None):
+    """Same as build_gemini_prompt_and_response, but yields response text chunks as Gemini produces them"""
+    prompt, cache_key = build_gemini_request(user_query, conversation_history)
+    return stream_gemini(prompt, cache_key=cache_key)
+
+
+# --- Async pipeline ---
+# Independent retrieval and ORM stages run concurrently on a bounded thread pool, and the
+# Gemini call is awaited, so an ASGI worker keeps serving other analysts while one waits.
+# Pool threads outlive requests, so each stage releases its thread's database connections
+# when it finishes (as request_finished does for a request thread, honouring CONN_MAX_AGE).
+
+_stage_executor = ThreadPoolExecutor(max_workers=settings.CHAT_PIPELINE_WORKERS, thread_name_prefix="chat-pipeline")
+
+def _stage(func, *args):
+    try:
+        return func(*args)
+    finally:
+        close_old_connections()
+
+async def _run_stage(func, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_stage_executor, functools.partial(_stage, func, *args))
+
+async def _resolved(value):
+    return value
+
+async def abuild_gemini_request(user_query, conversation_history=None):
+    """Async counterpart of build_gemini_request; produces the same prompt and cache key"""
+    filters = await _run_stage(extract_filter_entities, user_query)  # Looks up news source names
+    time_filter = extract_time_filter(user_query)
+    prompt_type = classify_prompt_type(user_query)
+
+    if prompt_type == "inventory":
+        return await _run_stage(build_inventory_prompt, user_query, filters, conversation_history), None
+
+    enhanced_query, context_keywords = extract_context_keywords(user_query, conversation_history)
+
+    # The vector and full-text searches only depend on the query
+    rankings = await asyncio.gather(
+        _run_stage(search_article_ids, enhanced_query, 20, time_filter, filters),
+        _run_stage(lexical_article_ids, enhanced_query, 20, time_filter, filters),
+        _run_stage(lexical_article_ids, " ".join(context_keywords), 10, time_filter, filters) if context_keywords else _resolved([]),
+    )
+    articles = await _run_stage(hydrate_articles, fuse_article_ids(*rankings))
+    threat_keywords = extract_threat_keywords(articles)
+
+    # Label lookups and asset correlation are independent of each other
+    article_ids = [a.id for a in articles]
+    article_labels, general_labels, (relevant_assets, total_assets) = await asyncio.gather(
+        _run_stage(fetch_article_labels, article_ids, filters),
+        _run_stage(fetch_general_labels, article_ids),
+        _run_stage(correlate_assets, threat_keywords, filters),
+    )
+
+    prompt = render_threat_prompt(user_query, conversation_history, articles, article_labels, general_labels, relevant_assets, total_assets)
+    return prompt, threat_evidence_key(user_query, conversation_history, articles, relevant_assets)
+
+async def abuild_gemini_prompt(user_query, conversation_history=None):
+    return (await abuild_gemini_request(user_query, conversation_history))[0]
+
+async def abuild_gemini_prompt_and_response(user_query, conversation_history=None):
+    prompt, cache_key = await abuild_gemini_request(user_query, conversation_history)
+    return await acall_gemini(prompt, cache_key=cache_key)
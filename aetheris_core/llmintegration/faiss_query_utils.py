@@ -1,56 +1,25 @@
 # faiss_query_utils.py
 
-import os
-import pickle
-import faiss
-import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sentence_transformers import SentenceTransformer
+from llmintegration.index_registry import get_index
+from vtagent.embeddings import is_embedder
 
 
-# --- CONFIG ---
-FAISS_BASE = os.path.join("faiss")
-
-# Can switch between TF-IDF and Transformer
-VECTORIZERS = {
-    "articles": "articles/vectorizer.pkl",
-    "siem_logs": "logs/siem.vectorizer.pkl",
-    "employees": "employees/vectorizer.pkl"
-}
-
-
-# Load vectorizer (TF-IDF or SentenceTransformer) dynamically
-def load_vectorizer(path):
-    full_path = os.path.join(FAISS_BASE, path)
-    with open(full_path, "rb") as f:
-        return pickle.load(f)
-
-
-# Load index and ID map
+# Load index and ID map from the shared registry (kept resident between calls)
 def load_faiss_index(index_path):
-    index = faiss.read_index(os.path.join(FAISS_BASE, index_path, "index.index"))
-    with open(os.path.join(FAISS_BASE, index_path, "id_map.pkl"), "rb") as f:
-        id_map = pickle.load(f)
-    with open(os.path.join(FAISS_BASE, index_path, "texts.pkl"), "rb") as f:
-        texts = pickle.load(f)
-    return index, id_map, texts
+    loaded = get_index(index_path)
+    return loaded.index, loaded.id_map, loaded.texts
 
 
 # Core function to perform similarity search
 def search_similar(query_text, index_key, top_k=5, use_transformer=False):
     index_path = index_key.replace(".vectorizer.pkl", "") if index_key.endswith(".pkl") else index_key
-    index, id_map, texts = load_faiss_index(index_path)
+    loaded = get_index(index_path)
 
-    if use_transformer:
-        model = SentenceTransformer("all-MiniLM-L6-v2")
-        query_vec = model.encode([query_text]).astype(np.float32)
-    else:
-        vectorizer_path = VECTORIZERS.get(index_path)
-        if not vectorizer_path:
-            raise ValueError(f"No vectorizer configured for {index_path}")
-        vectorizer = load_vectorizer(vectorizer_path)
-        query_vec = vectorizer.transform([query_text]).astype(np.float32).toarray()
+    # The query is encoded by whatever built the index; transformer queries need an embedding index
+    if use_transformer and not is_embedder(loaded.vectorizer):
+        raise ValueError(f"{index_path} is a TF-IDF index; set VECTOR_ENCODERS[{index_path!r}] = \"sentence\" and re-vectorize")
+    query_vec = loaded.encode([query_text])
 
-    scores, indices = index.search(query_vec, top_k)
-    matches = [(id_map[i], texts[i], float(scores[0][rank])) for rank, i in enumerate(indices[0]) if i < len(id_map)]
+    scores, indices = loaded.index.search(query_vec, top_k)
+    matches = [(loaded.id_map[i], loaded.texts[i], float(scores[0][rank])) for rank, i in enumerate(indices[0]) if 0 <= i < len(loaded.id_map) and loaded.id_map[i] is not None]
     return matches
@@ -0,0 +1,111 @@
+# federated_search.py
+
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from django.conf import settings
+
+from llmintegration.index_registry import get_index
+from vtagent.index_artifacts import SOURCES
+
+
+# Shorthand accepted in `sources` for every log index at once
+SOURCE_GROUPS = {
+    "logs": [source for source in SOURCES if source.endswith("_logs")],
+}
+
+# FAISS releases the GIL while searching, so sources are searched concurrently in threads
+_executor = ThreadPoolExecutor(max_workers=settings.FEDERATED_SEARCH["WORKERS"], thread_name_prefix="federated-search")
+
+
+def resolve_sources(names=None):
+    """Source names (or group names such as "logs") expanded and de-duplicated; None means all."""
+    if not names:
+        return list(SOURCES)
+    resolved = []
+    for name in names:
+        for source in SOURCE_GROUPS.get(name, [name]):
+            if source not in SOURCES:
+                raise ValueError(f"No vector index configured for {source}")
+            if source not in resolved:
+                resolved.append(source)
+    return resolved
+
+
+def to_similarity(backend, score, query_norm=1.0):
+    """
+    Cosine similarity in [0, 1] from a backend's raw score. Indexed rows
+    are L2-normalised (TF-IDF by default, sentence embeddings explicitly),
+    so a FAISS squared L2 distance is d = |q|^2 + 1 - 2 q.x and the inner
+    product is (|q|^2 + 1 - d) / 2. That is the cosine for a unit query and
+    0 for an all-zero one (no in-vocabulary terms), which would otherwise
+    sit at d = 1 from every record. The sparse backend already scores by
+    cosine.
+    """
+    similarity = score if backend == "sparse" else (query_norm ** 2 + 1.0 - score) / 2.0
+    return min(max(float(similarity), 0.0), 1.0)
+
+
+def _search_source(source, query, k, include_text):
+    started = time.perf_counter()
+    loaded = get_index(source)
+    weight = settings.FEDERATED_SEARCH["WEIGHTS"].get(source, 1.0)
+    hits = []
+    for record_id, position, raw_score in loaded.search(query, top_k=k):
+        similarity = to_similarity(loaded.backend, raw_score)
+        hit = {
+            "source": source,
+            "record_id": record_id,
+            "score": round(similarity * weight, 4),
+            "similarity": round(similarity, 4),
+            "raw_score": round(raw_score, 4),
+        }
+        if include_text:
+            hit["text"] = (loaded.texts[position] or "")[:include_text].strip()
+        hits.append(hit)
+    return hits, (time.perf_counter() - started) * 1000
+
+
+def federated_search(query, sources=None, top_k=10, per_source_k=None, timeout=None, include_text=0):
+    """
+    Run `query` against several sources at once and merge the results.
+
+    Every source contributes up to `per_source_k` hits (default `top_k`),
+    scored by cosine similarity times its configured weight so that
+    distances from differently built indexes are comparable; the best
+    `top_k` overall are returned. Sources that fail, or are still running
+    after `timeout` seconds, are reported and left out, so one slow or
+    missing index does not hold up the others. With include_text=N each
+    hit carries the first N characters of its record text.
+    """
+    sources = resolve_sources(sources)
+    timeout = settings.FEDERATED_SEARCH["TIMEOUT"] if timeout is None else timeout
+    started = time.perf_counter()
+
+    futures = {
+        _executor.submit(_search_source, source, query, per_source_k or top_k, include_text): source
+        for source in sources
+    }
+    done, _ = wait(futures, timeout=timeout)
+
+    hits, report = [], {}
+    for future, source in futures.items():
+        if future not in done:
+            # Left running: it finishes loading the index in the background for the next query
+            report[source] = {"status": "timeout"}
+            continue
+        try:
+            source_hits, latency_ms = future.result()
+        except (OSError, ValueError, RuntimeError) as e:
+            report[source] = {"status": "error", "error": str(e)}
+            continue
+        hits.extend(source_hits)
+        report[source] = {"status": "ok", "hits": len(source_hits), "latency_ms": round(latency_ms, 2)}
+
+    hits.sort(key=lambda hit: -hit["score"])
+    return {
+        "query": query,
+        "results": hits[:top_k],
+        "sources": report,
+        "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
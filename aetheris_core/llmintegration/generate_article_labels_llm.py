@@ -87,7 +87,7 @@ def parse_labels(json_output: dict) -> dict:
 
 # === Main runner ===
 def main():
-    articles = RawArticle.objects.all().order_by("id")[:MAX_ARTICLES]
+    articles = RawArticle.canonical.order_by("id")[:MAX_ARTICLES]  # Near-duplicates share their canonical article's labels
     results = []
 
     for origin in ["Django", "FAISS"]:
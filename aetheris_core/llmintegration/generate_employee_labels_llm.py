@@ -2,7 +2,6 @@ import os
 import sys
 import json
 import django
-import pickle
 from django.conf import settings
 
 # === Django setup ===
@@ -13,13 +12,13 @@ django.setup()
 from syntheticemployees.models import Employee
 from vtagent.models import GeneratedTaxonomyLabel
 from llmintegration.llm_utils import call_gemini
+from vtagent.index_artifacts import artifact_paths
+from vtagent.record_store import read_ids, read_texts
 
 # === FAISS Vectorized Context ===
-FAISS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "faiss", "employees")
-with open(os.path.join(FAISS_DIR, "id_map.pkl"), "rb") as f:
-    id_map = pickle.load(f)
-with open(os.path.join(FAISS_DIR, "texts.pkl"), "rb") as f:
-    all_texts = pickle.load(f)
+FAISS_PATHS = artifact_paths("employees")
+id_map = read_ids(FAISS_PATHS["id_map"])
+all_texts = read_texts(FAISS_PATHS["texts"])
 
 id_map_lookup = dict(zip([f"Employee:{id}" for id in id_map], all_texts))
 
@@ -1,7 +1,6 @@
 import os
 import sys
 import json
-import pickle
 import time
 import django
 from django.conf import settings
@@ -14,10 +13,11 @@ django.setup()
 
 from vtagent.models import GeneratedTaxonomyLabel
 from llmintegration.llm_utils import call_gemini
+from vtagent.index_artifacts import artifact_paths
+from vtagent.record_store import read_ids, read_texts
 
 # Config
 LOG_TYPES = ["siem", "xdr", "ids", "firewall", "edr", "hids", "application"]
-FAISS_BASE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "faiss", "logs")
 DATA_BASE = os.path.join(settings.BASE_DIR, "synthetic_data")
 OUTPUT_DIR = os.path.join(settings.BASE_DIR, "llmintegration", "debug_outputs")
 os.makedirs(OUTPUT_DIR, exist_ok=True)
@@ -110,13 +110,9 @@ def main():
     for log_type in LOG_TYPES:
         try:
             print(f"\n=== Processing {log_type.upper()} logs ===")
-            id_map_path = os.path.join(FAISS_BASE, f"{log_type}.id_map.pkl")
-            texts_path = os.path.join(FAISS_BASE, f"{log_type}.texts.pkl")
-
-            with open(id_map_path, "rb") as f:
-                id_map = pickle.load(f)
-            with open(texts_path, "rb") as f:
-                texts = pickle.load(f)
+            faiss_paths = artifact_paths(f"{log_type}_logs")
+            id_map = read_ids(faiss_paths["id_map"])
+            texts = read_texts(faiss_paths["texts"])
 
             record_lookup = dict(zip([f"{log_type.upper()}:{i}" for i in id_map], texts))
 
@@ -0,0 +1,287 @@
+# index_benchmark.py
+
+import gc
+import os
+import platform
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import faiss
+import numpy as np
+import scipy.sparse as sp
+from django.conf import settings
+
+from llmintegration.index_registry import load_index
+from vtagent.index_artifacts import as_dense, build_index, configure_search, faiss_index_config, search_index
+
+
+# Characters of a stored record text used as a benchmark query
+QUERY_CHARS = 1000
+# Corpus rows re-encoded at a time while computing exact neighbours
+EXACT_CHUNK = 5000
+# Relative slack when a found neighbour ties with the k-th exact one (e.g. identical records)
+TIE_TOLERANCE = 1e-5
+
+# FAISS structures compared by sweep_structures(); each is built once and searched with every listed knob
+SWEEP_GRID = [
+    {"TYPE": "flat"},
+    {"TYPE": "ivf_flat", "NPROBE": 1},
+    {"TYPE": "ivf_flat", "NPROBE": 4},
+    {"TYPE": "ivf_flat", "NPROBE": 16},
+    {"TYPE": "ivf_pq", "M": 16, "NPROBE": 4},
+    {"TYPE": "ivf_pq", "M": 16, "NPROBE": 16},
+    {"TYPE": "hnsw", "M": 32, "EF_SEARCH": 16},
+    {"TYPE": "hnsw", "M": 32, "EF_SEARCH": 64},
+    {"TYPE": "hnsw", "M": 32, "EF_SEARCH": 128},
+]
+# Settings that change the built structure (the rest only affect search)
+BUILD_KEYS = ("TYPE", "NLIST", "M", "NBITS", "EF_CONSTRUCTION", "TRAIN_SAMPLE")
+
+
+def resident_memory():
+    """Resident set size of this process in bytes."""
+    try:
+        import psutil
+    except ImportError:
+        # psutil is in requirements.txt; /proc gives the same figure on Linux without it
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    return psutil.Process().memory_info().rss
+
+
+def latency_summary(latencies_ms):
+    latencies = np.asarray(latencies_ms)
+    return {
+        "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 3),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 3),
+        "mean_ms": round(float(latencies.mean()), 3),
+    }
+
+
+def sample_queries(loaded, count, seed=0):
+    """Up to `count` stored record texts, truncated to QUERY_CHARS, drawn at random from the build."""
+    texts = loaded.texts
+    rng = np.random.default_rng(seed)
+    queries = []
+    for position in rng.permutation(len(texts)):
+        text = texts[int(position)]
+        if text and text.strip():
+            queries.append(text[:QUERY_CHARS])
+            if len(queries) == count:
+                break
+    return queries
+
+
+def _distances(loaded, query_vectors, rows):
+    """Exact distances (lower is closer) between encoded queries and encoded corpus rows."""
+    if loaded.backend == "sparse":
+        # The sparse backend ranks by cosine similarity
+        return -np.asarray((query_vectors @ rows.T).todense())
+    rows = as_dense(rows)
+    return (
+        (query_vectors ** 2).sum(axis=1)[:, None]
+        - 2 * query_vectors @ rows.T
+        + (rows ** 2).sum(axis=1)[None, :]
+    )
+
+
+def _encode_rows(loaded, texts):
+    rows = loaded.vectorizer.transform(texts)
+    return rows.astype(np.float32) if sp.issparse(rows) else np.asarray(rows, dtype=np.float32)
+
+
+def exact_neighbours(loaded, query_vectors, k):
+    """
+    (positions, distances) of the exact top-k of every query over every
+    live record of the build, re-encoding the stored texts EXACT_CHUNK rows
+    at a time so the corpus is never densified at once.
+    """
+    n_queries = query_vectors.shape[0]
+    best = np.full((n_queries, k), np.inf)
+    best_positions = np.full((n_queries, k), -1, dtype=np.int64)
+    texts = loaded.texts
+    for start in range(0, len(texts), EXACT_CHUNK):
+        positions = [p for p in range(start, min(start + EXACT_CHUNK, len(texts))) if texts[p] is not None and loaded.id_map[p] is not None]
+        if not positions:
+            continue
+        distances = _distances(loaded, query_vectors, _encode_rows(loaded, [texts[p] for p in positions]))
+        merged = np.hstack([best, distances])
+        merged_positions = np.hstack([best_positions, np.broadcast_to(np.asarray(positions), distances.shape)])
+        order = np.argsort(merged, axis=1, kind="stable")[:, :k]
+        best = np.take_along_axis(merged, order, axis=1)
+        best_positions = np.take_along_axis(merged_positions, order, axis=1)
+    return best_positions, best
+
+
+def recall_at_k(loaded, query_vectors, found, k, exact=None):
+    """
+    Share of the exact top-k each query's results recover. A result that
+    ties with the k-th exact distance counts as a hit, so identical records
+    swapped for one another are not penalised. `exact` is the result of
+    exact_neighbours(), computed here when not given.
+    """
+    truth, truth_distances = exact if exact is not None else exact_neighbours(loaded, query_vectors, k)
+    recalls = []
+    for row, positions in enumerate(found):
+        expected = [p for p in truth[row] if p >= 0]
+        if not expected:
+            continue
+        if not positions:
+            recalls.append(0.0)
+            continue
+        kth = truth_distances[row][len(expected) - 1]
+        rows = _encode_rows(loaded, [loaded.texts[p] for p in positions])
+        distances = _distances(loaded, query_vectors[row:row + 1], rows)[0]
+        hits = sum(1 for p, d in zip(positions, distances) if p in expected or d <= kth + TIE_TOLERANCE * max(abs(kth), 1.0))
+        recalls.append(min(hits, len(expected)) / len(expected))
+    return float(np.mean(recalls)) if recalls else None
+
+
+def single_query_latencies(loaded, queries, k):
+    """End-to-end ms per query (encoding plus search) and the positions each returned."""
+    latencies, found = [], []
+    for query in queries:
+        started = time.perf_counter()
+        hits = loaded.search(query, top_k=k)
+        latencies.append((time.perf_counter() - started) * 1000)
+        found.append([position for _, position, _ in hits])
+    return latencies, found
+
+
+def batched_latencies(loaded, queries, k, batch_size):
+    """ms per batch of `batch_size` queries encoded and searched together."""
+    latencies = []
+    for start in range(0, len(queries), batch_size):
+        batch = queries[start:start + batch_size]
+        started = time.perf_counter()
+        search_index(loaded.index, loaded.encode(batch), k, loaded.backend)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def throughput(loaded, queries, k, threads, min_queries=200):
+    """Queries per second with `threads` concurrent callers of LoadedIndex.search()."""
+    workload = (queries * (min_queries // max(len(queries), 1) + 1))[:max(min_queries, len(queries))]
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        started = time.perf_counter()
+        list(pool.map(lambda query: loaded.search(query, top_k=k), workload))
+        elapsed = time.perf_counter() - started
+    return round(len(workload) / elapsed, 1)
+
+
+def index_type(loaded):
+    if loaded.backend == "sparse":
+        return "sparse"
+    return (loaded.manifest or {}).get("index_config", faiss_index_config(loaded.source)).get("TYPE", "flat")
+
+
+def benchmark_source(source, k=10, n_queries=200, batch_size=32, thread_counts=(1, 2, 4, 8), seed=0):
+    """Quality and performance figures for the published build of `source`."""
+    gc.collect()
+    rss_before = resident_memory()
+    started = time.perf_counter()
+    loaded = load_index(source)
+    load_seconds = time.perf_counter() - started
+    rss_loaded = resident_memory()
+
+    queries = sample_queries(loaded, n_queries, seed)
+    if not queries:
+        return {"source": source, "status": "skipped", "error": "no record texts"}
+
+    loaded.search(queries[0], top_k=k)  # Warm-up: query encoder and first index pages
+    single, found = single_query_latencies(loaded, queries, k)
+    batched = batched_latencies(loaded, queries, k, batch_size)
+    qps = {str(threads): throughput(loaded, queries, k, threads) for threads in thread_counts}
+    rss_served = resident_memory()
+
+    query_vectors = loaded.encode(queries)
+    recall = recall_at_k(loaded, query_vectors, found, k)
+
+    result = {
+        "source": source,
+        "status": "ok",
+        "version": loaded.version,
+        "backend": loaded.backend,
+        "index_type": index_type(loaded),
+        "encoder": (loaded.manifest or {}).get("encoder", type(loaded.vectorizer).__name__),
+        "rows": len(loaded),
+        "queries": len(queries),
+        "k": k,
+        "recall_at_k": round(recall, 4) if recall is not None else None,
+        "load_seconds": round(load_seconds, 4),
+        "single_query": latency_summary(single),
+        "batched_query": dict(
+            latency_summary(batched),
+            batch_size=batch_size,
+            per_query_ms=round(float(np.sum(batched)) / len(queries), 3),
+        ),
+        "qps": qps,
+        "rss_loaded_mb": round((rss_loaded - rss_before) / 2**20, 2),
+        "rss_serving_mb": round((rss_served - rss_before) / 2**20, 2),
+    }
+    return result
+
+
+def describe(config):
+    knobs = ", ".join(f"{key.lower()}={value}" for key, value in config.items() if key != "TYPE")
+    return f"{config['TYPE']}({knobs})" if knobs else config["TYPE"]
+
+
+def sweep_structures(source, configs, k=10, n_queries=200, seed=0):
+    """
+    recall@k, single-query search latency, build time and size of each FAISS
+    structure in `configs` built over the live records of the published
+    build of `source`. Queries and exact neighbours are those of
+    benchmark_source(), so the figures are comparable with its run.
+    """
+    loaded = load_index(source)
+    queries = sample_queries(loaded, n_queries, seed)
+    if not queries:
+        return []
+    live = np.array([position for position, record_id in enumerate(loaded.id_map) if record_id is not None], dtype=np.int64)
+    corpus = loaded.record_vectors(live)
+    query_vectors = loaded.encode(queries)
+    dense_queries = as_dense(query_vectors)
+    exact = exact_neighbours(loaded, query_vectors, k)
+
+    built, results = {}, []
+    for config in configs:
+        build_key = tuple((key, config.get(key)) for key in BUILD_KEYS)
+        if build_key not in built:
+            started = time.perf_counter()
+            index = build_index(corpus, "faiss", config=config)
+            built[build_key] = (index, time.perf_counter() - started, faiss.serialize_index(index).nbytes)
+        index, build_seconds, size = built[build_key]
+        configure_search(index, config)
+
+        latencies, found = [], []
+        for row in range(len(queries)):
+            started = time.perf_counter()
+            _, rows = index.search(dense_queries[row:row + 1], k)
+            latencies.append((time.perf_counter() - started) * 1000)
+            # Index rows are the live records in order
+            found.append([int(live[i]) for i in rows[0] if i >= 0])
+        recall = recall_at_k(loaded, query_vectors, found, k, exact)
+        results.append(dict(
+            latency_summary(latencies),
+            index=describe(config),
+            config=config,
+            recall_at_k=round(recall, 4) if recall is not None else None,
+            build_seconds=round(build_seconds, 3),
+            size_mb=round(size / 2**20, 2),
+        ))
+    return results
+
+
+def environment():
+    return {
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "host": platform.node(),
+        "python": platform.python_version(),
+        "faiss": faiss.__version__,
+        "cpus": os.cpu_count(),
+        "faiss_threads": faiss.omp_get_max_threads(),
+        "faiss_root": str(settings.FAISS_ROOT),
+    }
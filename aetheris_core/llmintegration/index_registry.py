@@ -0,0 +1,225 @@
+# index_registry.py
+
+import hashlib
+import os
+import pickle
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+
+from vtagent.index_artifacts import (
+    artifact_paths, current_version, faiss_index_config, read_index, read_manifest, row_norms, search_index, vector_backend,
+)
+from vtagent.embeddings import is_embedder
+from vtagent.record_store import read_ids, read_texts, resolve_artifact
+
+
+# Unversioned builds are only picked up again if one of these files changed
+WATCHED_ARTIFACTS = ("index", "id_map", "vectorizer")
+MAX_LOAD_ATTEMPTS = 3
+
+
+def _signature(source):
+    """
+    Cheap fingerprint of the build to serve: the published version name,
+    or (mtime, size) of every watched artifact of an unversioned build.
+    """
+    version = current_version(source)
+    if version is not None:
+        return version
+    paths = artifact_paths(source)
+    signature = []
+    for name in WATCHED_ARTIFACTS:
+        stat = os.stat(resolve_artifact(paths[name]))
+        signature.append((stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+class LoadedIndex:
+    """One immutable build of a source's vector index: index and vectorizer in memory, ids and texts memory-mapped."""
+
+    def __init__(self, source, backend, index, id_map, vectorizer, texts_path, signature, manifest=None):
+        self.source = source
+        self.backend = backend
+        self.index = index
+        self.id_map = id_map
+        self.vectorizer = vectorizer
+        self.signature = signature
+        self.manifest = manifest
+        self.loaded_at = time.time()
+        self._texts_path = texts_path
+        self._texts = None
+        self._texts_lock = threading.Lock()
+        self._derived = {}
+        self._derived_lock = threading.Lock()
+
+    @property
+    def texts(self):
+        # Record texts are only needed for display; they are mapped on first use and paged in per record
+        if self._texts is None:
+            with self._texts_lock:
+                if self._texts is None:
+                    self._texts = read_texts(self._texts_path)
+        return self._texts
+
+    def derived(self, name, factory):
+        """
+        Memoise data computed from this build (e.g. per-position metadata).
+        It is dropped together with the build when a new one is loaded.
+        """
+        if name not in self._derived:
+            with self._derived_lock:
+                if name not in self._derived:
+                    self._derived[name] = factory(self)
+        return self._derived[name]
+
+    @property
+    def version(self):
+        return self.manifest["version"] if self.manifest else None
+
+    def __len__(self):
+        return len(self.id_map)
+
+    def encode(self, query_texts):
+        if is_embedder(self.vectorizer):
+            return self.vectorizer.encode_queries(list(query_texts))
+        vectors = self.vectorizer.transform(query_texts).astype(np.float32)
+        # The sparse backend scores CSR queries directly; FAISS needs dense rows
+        return vectors if self.backend == "sparse" else vectors.toarray()
+
+    def record_vectors(self, positions):
+        """Stored records at `positions` encoded the way they were indexed (dense for FAISS, CSR for sparse)."""
+        texts = [self.texts[position] or "" for position in positions]
+        if is_embedder(self.vectorizer):
+            return self.vectorizer.transform(texts)  # Document embeddings come from the persistent cache
+        return self.encode(texts)
+
+    def search(self, query_text, top_k=5, allowed=None):
+        """
+        Return (record_id, position, score) tuples for the `top_k` nearest
+        records, only considering the `allowed` positions when given.
+        """
+        if allowed is not None and not len(allowed):
+            return []
+        query = self.encode([query_text])
+        if not row_norms(query)[0]:
+            # No in-vocabulary terms: every record is equally (un)related, so nothing matches
+            return []
+        scores, indices = search_index(self.index, query, top_k, self.backend, allowed)
+        return [
+            (self.id_map[i], int(i), float(scores[0][rank]))
+            for rank, i in enumerate(indices[0])
+            # Incrementally maintained indexes leave None in the slots of removed records
+            if 0 <= i < len(self.id_map) and self.id_map[i] is not None
+        ]
+
+
+def load_index(source):
+    """Read the current build of `source` from disk, bypassing the registry cache."""
+    version = current_version(source)
+    if version is not None:
+        # A published version directory is never modified, so one read is consistent
+        paths = artifact_paths(source, version)
+        manifest = read_manifest(os.path.dirname(paths["manifest"]))
+        backend = manifest["backend"]
+        # Query-time knobs (NPROBE, EF_SEARCH) come from the current settings, not the build's
+        index = read_index(paths["index"], backend, faiss_index_config(source))
+        id_map = read_ids(paths["id_map"])
+        with open(paths["vectorizer"], "rb") as f:
+            vectorizer = pickle.load(f)
+        return LoadedIndex(source, backend, index, id_map, vectorizer, paths["texts"], version, manifest)
+
+    paths = artifact_paths(source)
+    backend = vector_backend(source)
+    for _ in range(MAX_LOAD_ATTEMPTS):
+        signature = _signature(source)
+        index = read_index(paths["index"], backend, faiss_index_config(source))
+        id_map = read_ids(paths["id_map"])
+        with open(paths["vectorizer"], "rb") as f:
+            vectorizer = pickle.load(f)
+        # A writer touched the files while we were reading them; try again
+        if _signature(source) == signature:
+            return LoadedIndex(source, backend, index, id_map, vectorizer, paths["texts"], signature)
+    raise RuntimeError(f"Index artifacts for {source} kept changing while loading")
+
+
+class IndexRegistry:
+    """
+    Process-wide cache of loaded vector indexes.
+
+    Each source is loaded on first use and kept resident. Every
+    INDEX_RELOAD_INTERVAL seconds the source's CURRENT pointer is re-read;
+    when a vectorization run has published a new version it is loaded in
+    full and swapped in with a single assignment, so callers always see
+    either the old build or the new one, never a mix of both, and no
+    restart is needed.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._checked_at = {}
+        self._lock = threading.Lock()
+        self._load_locks = {}
+
+    def _load_lock(self, source):
+        with self._lock:
+            return self._load_locks.setdefault(source, threading.Lock())
+
+    def get(self, source):
+        entry = self._entries.get(source)
+        if entry is not None and not self._is_stale(source, entry):
+            return entry
+
+        with self._load_lock(source):
+            # Another thread may have finished the reload while we waited
+            entry = self._entries.get(source)
+            if entry is not None and not self._is_stale(source, entry, force=True):
+                return entry
+            entry = load_index(source)
+            self._entries[source] = entry
+            self._checked_at[source] = time.monotonic()
+            return entry
+
+    def _is_stale(self, source, entry, force=False):
+        now = time.monotonic()
+        if not force and now - self._checked_at.get(source, 0) < settings.INDEX_RELOAD_INTERVAL:
+            return False
+        self._checked_at[source] = now
+        try:
+            return _signature(source) != entry.signature
+        except OSError:
+            # Artifacts are mid-rewrite or gone; keep serving the build we have
+            return False
+
+    def invalidate(self, source=None):
+        with self._lock:
+            if source is None:
+                self._entries.clear()
+                self._checked_at.clear()
+            else:
+                self._entries.pop(source, None)
+                self._checked_at.pop(source, None)
+
+    def loaded_sources(self):
+        return {source: entry.loaded_at for source, entry in self._entries.items()}
+
+
+registry = IndexRegistry()
+
+
+def get_index(source):
+    return registry.get(source)
+
+
+def build_key(loaded):
+    """The index version a LoadedIndex was read from (unversioned builds get one from their file signature)."""
+    return loaded.version or "legacy-" + hashlib.sha1(repr(loaded.signature).encode("utf-8")).hexdigest()[:16]
+
+
+def vector_space(loaded):
+    """Identifies the vectorizer behind a build: scores of different fits are not comparable."""
+    if loaded.manifest:
+        return loaded.manifest["vectorizer_sha256"]
+    return hashlib.sha256(pickle.dumps(loaded.vectorizer)).hexdigest()
@@ -0,0 +1,252 @@
+# label_facets.py
+
+import threading
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q, Sum
+
+from vtagent.models import GeneratedTaxonomyLabel
+from llmintegration.models import LabelFacet, LabelRollup
+
+
+# Facet name -> whether the label stores it as a JSON list (otherwise a single string)
+FACETS = {
+    "platform": True,
+    "os": False,
+    "department": False,
+    "country": False,
+    "city": False,
+    "severity": True,
+    "impact": True,
+    "actor": True,
+    "mitre_tactics": True,
+}
+
+# Fields charted on the LLM dashboard, rolled up per (data_source, classification_source)
+ROLLUP_FACETS = ("impact", "os", "platform", "software", "department", "country", "mitre_tactics")
+# Rollup facet counting the labels themselves
+LABEL_TOTAL = "_labels"
+
+LABEL_FIELDS = ("raw_article_id", "data_source", "classification_source") + tuple(FACETS) + tuple(
+    facet for facet in ROLLUP_FACETS if facet not in FACETS
+)
+
+
+_suspended = threading.local()
+
+
+def maintenance_suspended():
+    return getattr(_suspended, "active", False)
+
+
+@contextmanager
+def bulk_label_changes():
+    """
+    Skip per-label facet maintenance inside the block and rebuild once at the
+    end; use around bulk_create() and large delete() calls.
+    """
+    _suspended.active = True
+    try:
+        yield
+    finally:
+        _suspended.active = False
+    rebuild_label_facets()
+
+
+def label_facet_values(label):
+    """Counter of (facet, value) pairs contributed by one label (a model instance or a values() dict)."""
+    get = label.get if isinstance(label, dict) else lambda name: getattr(label, name)
+    counts = Counter()
+    for facet, is_list in FACETS.items():
+        value = get(facet)
+        if is_list and isinstance(value, list):
+            counts.update((facet, str(v)[:500]) for v in value)
+        elif not is_list and isinstance(value, str):
+            counts[(facet, value[:500])] += 1
+    return counts
+
+
+def label_rollup_values(label):
+    """
+    Counter of (data_source, classification_source, facet, value) keys
+    contributed by one label to the dashboard rollups, counting the label
+    itself under LABEL_TOTAL.
+    """
+    get = label.get if isinstance(label, dict) else lambda name: getattr(label, name)
+    group = ((get("data_source") or "")[:100], (get("classification_source") or "")[:100])
+    counts = Counter({group + (LABEL_TOTAL, ""): 1})
+    for facet in ROLLUP_FACETS:
+        value = get(facet)
+        values = value if isinstance(value, list) else [value] if value else []
+        counts.update(group + (facet, str(v)[:255]) for v in values)
+    return counts
+
+
+def _scopes(raw_article_id):
+    return (None, raw_article_id) if raw_article_id else (None,)
+
+
+def _add(model, amount, **key):
+    rows = model.objects.filter(**key)
+    if rows.update(count=F("count") + amount):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(count=amount, **key)
+    except IntegrityError:
+        # A concurrent writer created the row first
+        rows.update(count=F("count") + amount)
+
+
+def _rollup_key(key):
+    data_source, classification_source, facet, value = key
+    return {"data_source": data_source, "classification_source": classification_source, "facet": facet, "value": value}
+
+
+def apply_label(label, sign=1):
+    """
+    Add (sign=1) or remove (sign=-1) one label's facet values from its
+    article's and the global counts, and from its dashboard rollups.
+    """
+    values = label_facet_values(label)
+    rollups = label_rollup_values(label)
+    raw_article_id = label.get("raw_article_id") if isinstance(label, dict) else label.raw_article_id
+    with transaction.atomic():
+        for scope in _scopes(raw_article_id):
+            for (facet, value), amount in values.items():
+                if sign > 0:
+                    _add(LabelFacet, amount, raw_article_id=scope, facet=facet, value=value)
+                else:
+                    LabelFacet.objects.filter(raw_article_id=scope, facet=facet, value=value).update(count=F("count") - amount)
+        for key, amount in rollups.items():
+            if sign > 0:
+                _add(LabelRollup, amount, **_rollup_key(key))
+            else:
+                LabelRollup.objects.filter(**_rollup_key(key)).update(count=F("count") - amount)
+        if sign < 0:
+            if values:
+                scope_filter = Q(raw_article__isnull=True) | Q(raw_article_id=raw_article_id)
+                LabelFacet.objects.filter(scope_filter, count__lte=0).delete()
+            data_source, classification_source = next(iter(rollups))[:2]
+            LabelRollup.objects.filter(data_source=data_source, classification_source=classification_source, count__lte=0).delete()
+
+
+def reconcile_label_rollups(expected, chunk_size=2000):
+    """
+    Bring LabelRollup in line with `expected` (a Counter of rollup keys),
+    touching only the rows that drifted; returns how many were corrected.
+    """
+    current = {
+        (data_source, classification_source, facet, value): (pk, count)
+        for pk, data_source, classification_source, facet, value, count in LabelRollup.objects.values_list(
+            "pk", "data_source", "classification_source", "facet", "value", "count"
+        ).iterator(chunk_size=chunk_size)
+    }
+    stale = [pk for key, (pk, _) in current.items() if key not in expected]
+    changed = [LabelRollup(pk=current[key][0], count=count) for key, count in expected.items() if key in current and current[key][1] != count]
+    missing = [LabelRollup(count=count, **_rollup_key(key)) for key, count in expected.items() if key not in current]
+    with transaction.atomic():
+        for start in range(0, len(stale), 500):
+            LabelRollup.objects.filter(pk__in=stale[start:start + 500]).delete()
+        LabelRollup.objects.bulk_update(changed, ["count"], batch_size=chunk_size)
+        LabelRollup.objects.bulk_create(missing, batch_size=chunk_size)
+    return len(stale) + len(changed) + len(missing)
+
+
+def rebuild_label_facets(chunk_size=2000):
+    """
+    Recompute every facet count from scratch and reconcile the dashboard
+    rollups in the same pass; needed after bulk_create/update() writes that
+    skip signals, and run periodically to correct any drift.
+    """
+    per_article = defaultdict(Counter)
+    rollups = Counter()
+    for label in GeneratedTaxonomyLabel.objects.values(*LABEL_FIELDS).iterator(chunk_size=chunk_size):
+        values = label_facet_values(label)
+        for scope in _scopes(label["raw_article_id"]):
+            per_article[scope].update(values)
+        rollups.update(label_rollup_values(label))
+
+    rows = [
+        LabelFacet(raw_article_id=scope, facet=facet, value=value, count=count)
+        for scope, counts in per_article.items()
+        for (facet, value), count in counts.items()
+    ]
+    with transaction.atomic():
+        LabelFacet.objects.all().delete()
+        LabelFacet.objects.bulk_create(rows, batch_size=chunk_size)
+        corrected = reconcile_label_rollups(rollups, chunk_size)
+    return {"facets": len(rows), "rollups": len(rollups), "corrected": corrected}
+
+
+# --- Queries ---
+
+def _grouped(rows):
+    grouped = defaultdict(Counter)
+    for facet, value, count in rows:
+        grouped[facet][value] += count
+    # Present facets in a stable order
+    return {facet: grouped[facet] for facet in FACETS if grouped[facet]}
+
+
+def article_facets(article_ids, filters=None):
+    """
+    Facet counts over the labels of `article_ids`, from the materialized table.
+    City/department filters apply per label, so they fall back to reading just
+    the facet columns of the matching labels.
+    """
+    if filters and (filters.get("city") or filters.get("department")):
+        labels = GeneratedTaxonomyLabel.objects.filter(raw_article_id__in=article_ids)
+        if filters.get("city"):
+            labels = labels.filter(city__icontains=filters["city"])
+        if filters.get("department"):
+            labels = labels.filter(department__icontains=filters["department"])
+        counts = Counter()
+        for label in labels.values(*LABEL_FIELDS):
+            counts.update(label_facet_values(label))
+        return _grouped((facet, value, count) for (facet, value), count in counts.items())
+
+    rows = (
+        LabelFacet.objects.filter(raw_article_id__in=article_ids)
+        .values_list("facet", "value")
+        .annotate(total=Sum("count"))
+    )
+    return _grouped(rows)
+
+
+def global_facets(top=10):
+    """The `top` most frequent values of every facet across all labels."""
+    rows = LabelFacet.objects.filter(raw_article__isnull=True).order_by("facet", "-count").values_list("facet", "value", "count")
+    grouped = _grouped(rows)
+    return {facet: Counter(dict(counter.most_common(top))) for facet, counter in grouped.items()}
+
+
+def dashboard_rollups(data_source=None, classification_source=None, top=10):
+    """
+    Label volumes per data source and per classifier, and the `top` values
+    of every ROLLUP_FACETS field, optionally narrowed to one data source
+    and/or classifier. Two grouped reads of LabelRollup, whose size follows
+    the number of distinct values rather than the number of labels.
+    """
+    rows = LabelRollup.objects.all()
+    if data_source:
+        rows = rows.filter(data_source=data_source)
+    if classification_source:
+        rows = rows.filter(classification_source=classification_source)
+
+    sources, classifiers = Counter(), Counter()
+    for source, classifier, count in rows.filter(facet=LABEL_TOTAL).values_list("data_source", "classification_source", "count"):
+        sources[source] += count
+        classifiers[classifier] += count
+
+    facets = {facet: Counter() for facet in ROLLUP_FACETS}
+    for facet, value, total in rows.filter(facet__in=ROLLUP_FACETS).values_list("facet", "value").annotate(total=Sum("count")):
+        facets[facet][value] = total
+
+    return {
+        "sources": sorted(sources.items()),
+        "classifiers": sorted(classifiers.items()),
+        "facets": {facet: counter.most_common(top) for facet, counter in facets.items()},
+    }
@@ -1,3 +1,4 @@
+import asyncio
 import os
 import sys
 
@@ -12,6 +13,8 @@ import google.generativeai as genai
 import django
 django.setup()
 
+from llmintegration.response_cache import get_response_cache
+
 GEMINI_API_KEY = settings.GEMINI_API_KEY
 
 # Configure Gemini
@@ -23,13 +26,19 @@ if not GEMINI_API_KEY:
 # Configure the Gemini client
 genai.configure(api_key=GEMINI_API_KEY)
 
+def _cache_key(prompt: str, model_name: str, cache_key):
+    """Responses are keyed on the model plus either the caller's key or the normalised prompt."""
+    cache = get_response_cache()
+    return cache, cache.make_key(model_name, cache_key or prompt)
+
+
 # Retry on quota errors or rate limit issues
 @retry(
     stop=stop_after_attempt(5),
     wait=wait_exponential(multiplier=2, min=2, max=10),
     retry=retry_if_exception_type(Exception)
 )
-def call_gemini(prompt: str, model_name: str = "gemini-2.0-flash") -> str:
+def _generate(prompt: str, model_name: str) -> str:
     try:
         model = genai.GenerativeModel(model_name)
         response = model.generate_content(prompt)
@@ -37,3 +46,88 @@ def call_gemini(prompt: str, model_name: str = "gemini-2.0-flash") -> str:
     except Exception as e:
         print(f"[!] Gemini API call failed: {e}")
         raise
+
+
+def call_gemini(prompt: str, model_name: str = "gemini-2.0-flash", cache_key=None, use_cache=True) -> str:
+    """
+    Send `prompt` to Gemini, answering from the response cache when possible.
+    Pass `cache_key` (e.g. response_cache.evidence_key) to key on something
+    other than the prompt text, or use_cache=False to always call the API.
+    """
+    if not use_cache:
+        return _generate(prompt, model_name)
+    cache, key = _cache_key(prompt, model_name, cache_key)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    text = _generate(prompt, model_name)
+    cache.set(key, text)
+    return text
+
+
+@retry(
+    stop=stop_after_attempt(5),
+    wait=wait_exponential(multiplier=2, min=2, max=10),
+    retry=retry_if_exception_type(Exception)
+)
+async def _agenerate(prompt: str, model_name: str) -> str:
+    try:
+        model = genai.GenerativeModel(model_name)
+        response = await model.generate_content_async(prompt)
+        return response.text.strip()
+    except Exception as e:
+        print(f"[!] Gemini API call failed: {e}")
+        raise
+
+
+async def acall_gemini(prompt: str, model_name: str = "gemini-2.0-flash", cache_key=None, use_cache=True) -> str:
+    """Async variant of call_gemini; awaits the API without holding a worker thread."""
+    if not use_cache:
+        return await _agenerate(prompt, model_name)
+    cache, key = _cache_key(prompt, model_name, cache_key)
+    cached = await asyncio.to_thread(cache.get, key)
+    if cached is not None:
+        return cached
+    text = await _agenerate(prompt, model_name)
+    await asyncio.to_thread(cache.set, key, text)
+    return text
+
+
+# Only the initial request is retried; once text has been streamed to the client we cannot replay it
+@retry(
+    stop=stop_after_attempt(5),
+    wait=wait_exponential(multiplier=2, min=2, max=10),
+    retry=retry_if_exception_type(Exception)
+)
+def _start_gemini_stream(prompt: str, model_name: str):
+    try:
+        model = genai.GenerativeModel(model_name)
+        return model.generate_content(prompt, stream=True)
+    except Exception as e:
+        print(f"[!] Gemini API call failed: {e}")
+        raise
+
+
+def stream_gemini(prompt: str, model_name: str = "gemini-2.0-flash", cache_key=None, use_cache=True):
+    """Yield response text chunks as soon as Gemini produces them (a cached answer is yielded whole)."""
+    if use_cache:
+        cache, key = _cache_key(prompt, model_name, cache_key)
+        cached = cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+    chunks = []
+    for chunk in _start_gemini_stream(prompt, model_name):
+        # Chunks without text parts (e.g. safety/finish metadata) raise on .text
+        try:
+            text = chunk.text
+        except ValueError:
+            continue
+        if text:
+            chunks.append(text)
+            yield text
+
+    # Only complete answers are cached
+    if use_cache and chunks:
+        cache.set(key, "".join(chunks).strip())
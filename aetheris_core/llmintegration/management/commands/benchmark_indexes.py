@@ -0,0 +1,144 @@
+# benchmark_indexes.py
+
+import json
+import os
+import tempfile
+from contextlib import nullcontext
+from datetime import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from llmintegration.index_benchmark import SWEEP_GRID, benchmark_source, environment, sweep_structures
+from vtagent.index_artifacts import SOURCES, faiss_index_config
+from vtagent.vector_sources import VECTOR_SOURCES
+
+
+# Where run results accumulate unless --output is given
+RESULTS_DIR = os.path.join(settings.BASE_DIR, "aetheris_core", "benchmarks")
+
+
+def change(old, new, digits):
+    if old is None or new is None:
+        return "n/a"
+    return f"{new:.{digits}f} ({new - old:+.{digits}f})"
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the published index of each source: recall@k against exact search, single and batched "
+        "query latency, QPS per thread count, load time and resident memory; results are saved as JSON. "
+        "--sweep also compares FAISS structures and search knobs rebuilt over the same records"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("sources", nargs="*", help=f"Sources to benchmark (default: all). Choices: {', '.join(SOURCES)}")
+        parser.add_argument("--k", type=int, default=10)
+        parser.add_argument("--queries", type=int, default=200, help="Stored record texts sampled as queries")
+        parser.add_argument("--batch-size", type=int, default=32, help="Queries per batch for the batched latency")
+        parser.add_argument("--threads", default="1,2,4,8", help="Comma-separated thread counts for the QPS runs")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--rebuild", action="store_true", help="First vectorize the sources into a scratch directory (synthetic_data/ and the database) and benchmark those builds")
+        parser.add_argument("--sweep", action="store_true", help="Also rebuild each source's records into every SWEEP_GRID structure (plus --config ones) and compare them")
+        parser.add_argument("--config", action="append", default=[], help='Extra structure for --sweep as JSON, e.g. \'{"TYPE": "hnsw", "EF_SEARCH": 32}\'')
+        parser.add_argument("--output", help=f"JSON file for the results (default: a timestamped file in {RESULTS_DIR})")
+        parser.add_argument("--compare", help="Earlier results JSON to print the differences against")
+
+    def handle(self, *args, **options):
+        sources = options["sources"] or list(SOURCES)
+        unknown = [source for source in sources if source not in SOURCES]
+        if unknown:
+            raise CommandError(f"Unknown sources: {', '.join(unknown)}")
+        thread_counts = [int(threads) for threads in options["threads"].split(",") if threads.strip()]
+        try:
+            extra = [json.loads(config) for config in options["config"]]
+        except json.JSONDecodeError as e:
+            raise CommandError(f"Invalid --config: {e}")
+
+        run = dict(environment(), k=options["k"], rebuilt=options["rebuild"], results={})
+        if options["sweep"]:
+            run["sweeps"] = {}
+        with tempfile.TemporaryDirectory(prefix="index-benchmark-") if options["rebuild"] else nullcontext() as scratch:
+            # Scratch builds never replace the published indexes
+            with override_settings(FAISS_ROOT=scratch) if scratch else nullcontext():
+                for source in sources:
+                    run["results"][source] = self.benchmark(source, options, thread_counts)
+                    if options["sweep"] and run["results"][source]["status"] == "ok":
+                        run["sweeps"][source] = self.sweep(source, options, extra)
+
+        output = options["output"] or os.path.join(RESULTS_DIR, f"index_benchmark_{datetime.now():%Y%m%d_%H%M%S}.json")
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, "w") as f:
+            json.dump(run, f, indent=2)
+        self.stdout.write(f"[✓] Results written to {output}")
+
+        if options["compare"]:
+            with open(options["compare"], "r") as f:
+                self.compare(json.load(f), run)
+
+    def benchmark(self, source, options, thread_counts):
+        try:
+            if options["rebuild"]:
+                built = VECTOR_SOURCES[source].vectorize()
+                if not built["indexed"]:
+                    return {"source": source, "status": "skipped", "error": built.get("message", "nothing indexed")}
+            result = benchmark_source(
+                source, k=options["k"], n_queries=options["queries"], batch_size=options["batch_size"],
+                thread_counts=thread_counts, seed=options["seed"],
+            )
+        except (OSError, ValueError, RuntimeError) as e:
+            self.stdout.write(f"[!] {source}: {e}")
+            return {"source": source, "status": "error", "error": str(e)}
+
+        if result["status"] != "ok":
+            self.stdout.write(f"[!] {source}: {result['error']}")
+            return result
+        single, batched = result["single_query"], result["batched_query"]
+        qps = ", ".join(f"{threads}t {value:.0f}" for threads, value in result["qps"].items())
+        recall = f"{result['recall_at_k']:.3f}" if result["recall_at_k"] is not None else "n/a"
+        self.stdout.write(f"[✓] {source}: {result['rows']} rows, {result['backend']}/{result['index_type']}, recall@{result['k']} {recall}")
+        self.stdout.write(
+            f"    single p50/p95/p99 {single['p50_ms']:.2f}/{single['p95_ms']:.2f}/{single['p99_ms']:.2f} ms, "
+            f"batched {batched['per_query_ms']:.3f} ms/query (batch p99 {batched['p99_ms']:.2f} ms)"
+        )
+        self.stdout.write(
+            f"    QPS {qps}; load {result['load_seconds']:.2f}s, "
+            f"RSS +{result['rss_loaded_mb']:.1f} MB loaded / +{result['rss_serving_mb']:.1f} MB serving"
+        )
+        return result
+
+    def sweep(self, source, options, extra):
+        configured = faiss_index_config(source)
+        try:
+            rows = sweep_structures(source, SWEEP_GRID + extra + [configured], k=options["k"], n_queries=options["queries"], seed=options["seed"])
+        except (RuntimeError, ValueError) as e:
+            self.stdout.write(f"[!] {source} sweep: {e}")
+            return []
+        if rows:
+            rows[-1]["configured"] = True
+        self.stdout.write(f"    {'index':<42} {'recall@k':>8} {'p50 ms':>8} {'p99 ms':>8} {'build s':>8} {'size MB':>8}")
+        for row in rows:
+            label = row["index"] + (" *" if row.get("configured") else "")
+            recall = f"{row['recall_at_k']:>8.3f}" if row["recall_at_k"] is not None else f"{'n/a':>8}"
+            self.stdout.write(
+                f"    {label:<42} {recall} {row['p50_ms']:>8.3f} {row['p99_ms']:>8.3f} "
+                f"{row['build_seconds']:>8.2f} {row['size_mb']:>8.2f}"
+            )
+        self.stdout.write("    (* = currently configured in settings.FAISS_INDEXES)")
+        return rows
+
+    def compare(self, previous, current):
+        self.stdout.write(f"\n=== Compared with the run of {previous.get('started_at', '?')} ===")
+        self.stdout.write(f"{'source':<18} {'recall@k':>16} {'p50 ms':>16} {'p99 ms':>16} {'max QPS':>18}")
+        for source, result in current["results"].items():
+            before = previous.get("results", {}).get(source)
+            if result.get("status") != "ok" or not before or before.get("status") != "ok":
+                continue
+
+            self.stdout.write(
+                f"{source:<18} {change(before['recall_at_k'], result['recall_at_k'], 3):>16} "
+                f"{change(before['single_query']['p50_ms'], result['single_query']['p50_ms'], 2):>16} "
+                f"{change(before['single_query']['p99_ms'], result['single_query']['p99_ms'], 2):>16} "
+                f"{change(max(before['qps'].values()), max(result['qps'].values()), 0):>18}"
+            )
@@ -0,0 +1,27 @@
+# cluster_stories.py
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from llmintegration.story_clusters import refresh_story_clusters
+
+
+class Command(BaseCommand):
+    help = "Cluster the indexed articles into threat stories (k-means over the article vectors) and store each article's story"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--full", action="store_true", help="Refit the centroids and reassign every article")
+        parser.add_argument("--chunk-size", type=int)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        result = refresh_story_clusters(full=options["full"], chunk_size=options["chunk_size"])
+        if result["mode"] == "unchanged":
+            self.stdout.write(f"[✓] Stories already match version {result['version']}")
+        else:
+            self.stdout.write(
+                f"[✓] {result['mode'].capitalize()} clustering: {result['assigned']} articles assigned to "
+                f"{result['clusters']} stories, {result['removed']} removed, version {result['version']} "
+                f"in {time.perf_counter() - started:.1f}s"
+            )
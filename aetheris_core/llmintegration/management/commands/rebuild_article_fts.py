@@ -0,0 +1,15 @@
+# rebuild_article_fts.py
+
+from django.core.management.base import BaseCommand, CommandError
+
+from llmintegration.article_search import fts_available, rebuild_article_fts
+
+
+class Command(BaseCommand):
+    help = "Fully re-populate the SQLite FTS5 index over RawArticle title/content"
+
+    def handle(self, *args, **options):
+        if not fts_available():
+            raise CommandError("The article full-text index requires the SQLite backend")
+        rebuild_article_fts()
+        self.stdout.write("[✓] Rebuilt the article full-text index")
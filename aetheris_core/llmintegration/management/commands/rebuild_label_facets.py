@@ -0,0 +1,20 @@
+# rebuild_label_facets.py
+
+from django.core.management.base import BaseCommand
+
+from llmintegration.label_facets import rebuild_label_facets
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the materialized taxonomy facet counts from GeneratedTaxonomyLabel and reconcile the "
+        "dashboard rollups; schedule it periodically to correct any drift"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        result = rebuild_label_facets(chunk_size=options["chunk_size"])
+        self.stdout.write(f"[✓] Rebuilt {result['facets']} label facet rows")
+        self.stdout.write(f"[✓] Reconciled {result['rollups']} dashboard rollup rows, {result['corrected']} corrected")
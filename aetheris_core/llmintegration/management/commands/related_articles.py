@@ -0,0 +1,27 @@
+# related_articles.py
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from llmintegration.related_articles import refresh_related_articles
+
+
+class Command(BaseCommand):
+    help = "Precompute the top-k \"more like this\" list of every indexed article from the published article index"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--k", type=int, help="Related articles kept per article (default: RELATED_ARTICLES['K'])")
+        parser.add_argument("--full", action="store_true", help="Recompute every list even if the index version is unchanged")
+        parser.add_argument("--chunk-size", type=int)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        result = refresh_related_articles(k=options["k"], full=options["full"], chunk_size=options["chunk_size"])
+        if result["mode"] == "unchanged":
+            self.stdout.write(f"[✓] Related articles already match version {result['version']}")
+        else:
+            self.stdout.write(
+                f"[✓] {result['mode'].capitalize()} update of {result['computed']} related-article lists, "
+                f"{result['removed']} removed, version {result['version']} in {time.perf_counter() - started:.1f}s"
+            )
@@ -0,0 +1,40 @@
+# score_anomalies.py
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from llmintegration.anomaly_scores import score_source
+from llmintegration.federated_search import SOURCE_GROUPS, resolve_sources
+from vtagent.index_artifacts import SOURCES
+
+
+class Command(BaseCommand):
+    help = "Precompute k-NN neighbours and outlier-detector scores (ANOMALY_SCORING['DETECTORS']) for the published index of each source"
+
+    def add_arguments(self, parser):
+        parser.add_argument("sources", nargs="*", help=f"Sources or groups to score (default: all). Choices: {', '.join(list(SOURCE_GROUPS) + list(SOURCES))}")
+        parser.add_argument("--k", type=int, help="Neighbours per record (default: ANOMALY_SCORING['K'])")
+        parser.add_argument("--full", action="store_true", help="Rescore every record even if the index version is unchanged")
+        parser.add_argument("--chunk-size", type=int)
+
+    def handle(self, *args, **options):
+        try:
+            sources = resolve_sources(options["sources"])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        for source in sources:
+            started = time.perf_counter()
+            try:
+                result = score_source(source, k=options["k"], full=options["full"], chunk_size=options["chunk_size"])
+            except (OSError, ValueError, RuntimeError) as e:
+                self.stderr.write(f"[!] {source}: {e}")
+                continue
+            if result["mode"] == "unchanged":
+                self.stdout.write(f"[✓] {source}: scores already match version {result['version']}")
+            else:
+                self.stdout.write(
+                    f"[✓] {source}: {result['mode']} scoring of {result['scored']} records, "
+                    f"{result['removed']} removed, version {result['version']} in {time.perf_counter() - started:.1f}s"
+                )
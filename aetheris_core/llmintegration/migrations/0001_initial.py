@@ -0,0 +1,29 @@
+# Generated by Django 5.2 on 2026-10-18 06:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('vtagent', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LabelFacet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('facet', models.CharField(max_length=50)),
+                ('value', models.CharField(max_length=500)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('raw_article', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='label_facets', to='vtagent.rawarticle')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('raw_article', 'facet', 'value'), name='label_facet_article_value'), models.UniqueConstraint(condition=models.Q(('raw_article__isnull', True)), fields=('facet', 'value'), name='label_facet_global_value')],
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2 on 2026-10-18 06:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('llmintegration', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnomalyScoringState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=50, unique=True)),
+                ('index_version', models.CharField(max_length=64)),
+                ('vector_space', models.CharField(max_length=64)),
+                ('k', models.PositiveSmallIntegerField()),
+                ('isolation_forest', models.BinaryField()),
+                ('scored_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AnomalyScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=50)),
+                ('record_id', models.CharField(max_length=255)),
+                ('position', models.PositiveIntegerField()),
+                ('index_version', models.CharField(max_length=64)),
+                ('neighbour_id', models.CharField(blank=True, max_length=255)),
+                ('similarity', models.FloatField()),
+                ('knn_distance', models.FloatField()),
+                ('isolation_score', models.FloatField()),
+                ('scored_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['source', 'similarity'], name='anomaly_score_similarity')],
+                'constraints': [models.UniqueConstraint(fields=('source', 'record_id'), name='anomaly_score_record')],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2 on 2026-10-18 06:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('llmintegration', '0002_anomaly_scores'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='anomalyscore',
+            old_name='isolation_score',
+            new_name='outlier_score',
+        ),
+        migrations.RenameField(
+            model_name='anomalyscoringstate',
+            old_name='isolation_forest',
+            new_name='model',
+        ),
+        migrations.AddField(
+            model_name='anomalyscore',
+            name='excerpt',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='anomalyscoringstate',
+            name='detector',
+            field=models.CharField(default='', max_length=20),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='anomalyscore',
+            index=models.Index(fields=['source', '-outlier_score'], name='anomaly_score_outlier'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2 on 2026-10-18 06:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('llmintegration', '0003_log_anomaly_scoring'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LabelRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data_source', models.CharField(blank=True, max_length=100)),
+                ('classification_source', models.CharField(blank=True, max_length=100)),
+                ('facet', models.CharField(max_length=50)),
+                ('value', models.CharField(blank=True, max_length=255)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['facet', 'data_source', 'classification_source'], name='label_rollup_facet')],
+                'constraints': [models.UniqueConstraint(fields=('data_source', 'classification_source', 'facet', 'value'), name='label_rollup_value')],
+            },
+        ),
+    ]
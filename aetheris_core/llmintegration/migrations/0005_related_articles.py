@@ -0,0 +1,36 @@
+# Generated by Django 5.2 on 2026-10-18 06:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('llmintegration', '0004_label_rollups'),
+        ('vtagent', '0003_label_generated_at_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedArticles',
+            fields=[
+                ('article', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='related', serialize=False, to='vtagent.rawarticle')),
+                ('position', models.PositiveIntegerField()),
+                ('index_version', models.CharField(max_length=64)),
+                ('neighbours', models.JSONField(default=list)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RelatedArticlesState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=50, unique=True)),
+                ('index_version', models.CharField(max_length=64)),
+                ('vector_space', models.CharField(max_length=64)),
+                ('k', models.PositiveSmallIntegerField()),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2 on 2026-10-18 06:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('llmintegration', '0005_related_articles'),
+        ('vtagent', '0003_label_generated_at_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoryClusteringState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=50, unique=True)),
+                ('index_version', models.CharField(max_length=64)),
+                ('vector_space', models.CharField(max_length=64)),
+                ('clusters', models.PositiveIntegerField()),
+                ('fitted_rows', models.PositiveIntegerField()),
+                ('centroids', models.BinaryField()),
+                ('fitted_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='StoryAssignment',
+            fields=[
+                ('article', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='story', serialize=False, to='vtagent.rawarticle')),
+                ('cluster', models.PositiveIntegerField()),
+                ('distance', models.FloatField()),
+                ('position', models.PositiveIntegerField()),
+                ('assigned_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['cluster', 'distance'], name='story_assignment_cluster')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StoryCluster',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cluster', models.PositiveIntegerField(unique=True)),
+                ('size', models.PositiveIntegerField()),
+                ('title', models.CharField(blank=True, max_length=200)),
+                ('representative', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='vtagent.rawarticle')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-size'], name='story_cluster_size')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2 on 2026-10-18 06:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('llmintegration', '0006_story_clusters'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='anomalyscore',
+            name='anomaly_score_outlier',
+        ),
+        migrations.AddField(
+            model_name='anomalyscore',
+            name='outlier_rank',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='anomalyscoringstate',
+            name='reference_scores',
+            field=models.BinaryField(default=b''),
+        ),
+        migrations.AddIndex(
+            model_name='anomalyscore',
+            index=models.Index(fields=['source', '-outlier_rank', '-outlier_score'], name='anomaly_score_rank'),
+        ),
+        migrations.AddIndex(
+            model_name='anomalyscore',
+            index=models.Index(fields=['-outlier_rank', '-outlier_score'], name='anomaly_score_rank_all'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2 on 2026-10-18 09:12
+
+from django.db import migrations
+
+
+# External-content FTS5 table over RawArticle.title/content (see llmintegration/article_search.py),
+# kept in sync by triggers and filled from the existing articles
+ARTICLE_FTS_SQL = [
+    (
+        """CREATE VIRTUAL TABLE IF NOT EXISTS vtagent_rawarticle_fts USING fts5(
+            title, content, content='vtagent_rawarticle', content_rowid='id', tokenize='porter unicode61'
+        )""",
+        "DROP TABLE IF EXISTS vtagent_rawarticle_fts",
+    ),
+    (
+        """CREATE TRIGGER IF NOT EXISTS vtagent_rawarticle_fts_ai AFTER INSERT ON vtagent_rawarticle BEGIN
+            INSERT INTO vtagent_rawarticle_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+        END""",
+        "DROP TRIGGER IF EXISTS vtagent_rawarticle_fts_ai",
+    ),
+    (
+        """CREATE TRIGGER IF NOT EXISTS vtagent_rawarticle_fts_ad AFTER DELETE ON vtagent_rawarticle BEGIN
+            INSERT INTO vtagent_rawarticle_fts(vtagent_rawarticle_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+        END""",
+        "DROP TRIGGER IF EXISTS vtagent_rawarticle_fts_ad",
+    ),
+    (
+        """CREATE TRIGGER IF NOT EXISTS vtagent_rawarticle_fts_au AFTER UPDATE OF title, content ON vtagent_rawarticle BEGIN
+            INSERT INTO vtagent_rawarticle_fts(vtagent_rawarticle_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+            INSERT INTO vtagent_rawarticle_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+        END""",
+        "DROP TRIGGER IF EXISTS vtagent_rawarticle_fts_au",
+    ),
+    (
+        "INSERT INTO vtagent_rawarticle_fts(vtagent_rawarticle_fts) VALUES ('rebuild')",
+        migrations.RunSQL.noop,
+    ),
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('llmintegration', '0007_anomaly_score_rank'),
+        ('vtagent', '0003_label_generated_at_index'),
+    ]
+
+    operations = [
+        migrations.RunSQL(sql, reverse_sql) for sql, reverse_sql in ARTICLE_FTS_SQL
+    ]
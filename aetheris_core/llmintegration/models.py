@@ -1,3 +1,183 @@
 from django.db import models
+from django.db.models import Q
 
-# Create your models here.
+from vtagent.models import RawArticle
+
+
+class LabelFacet(models.Model):
+    """
+    Materialized taxonomy facet count: how many GeneratedTaxonomyLabel rows
+    carry `value` in `facet`. Rows with a raw_article hold the counts of that
+    article's labels; rows without one hold the global counts over all labels.
+    Maintained by llmintegration.label_facets.
+    """
+    raw_article = models.ForeignKey(RawArticle, on_delete=models.CASCADE, null=True, blank=True, related_name="label_facets")
+    facet = models.CharField(max_length=50)
+    value = models.CharField(max_length=500)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["raw_article", "facet", "value"], name="label_facet_article_value"),
+            models.UniqueConstraint(fields=["facet", "value"], condition=Q(raw_article__isnull=True), name="label_facet_global_value"),
+        ]
+
+    def __str__(self):
+        scope = f"Article #{self.raw_article_id}" if self.raw_article_id else "Global"
+        return f"{scope} | {self.facet}={self.value} ({self.count})"
+
+
+class LabelRollup(models.Model):
+    """
+    Materialized dashboard count: how many GeneratedTaxonomyLabel rows of one
+    (data_source, classification_source) pair carry `value` in `facet`. The
+    "_labels" facet (empty value) counts the labels themselves. Maintained
+    with LabelFacet by llmintegration.label_facets.
+    """
+    data_source = models.CharField(max_length=100, blank=True)
+    classification_source = models.CharField(max_length=100, blank=True)
+    facet = models.CharField(max_length=50)
+    value = models.CharField(max_length=255, blank=True)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["data_source", "classification_source", "facet", "value"], name="label_rollup_value"),
+        ]
+        indexes = [
+            models.Index(fields=["facet", "data_source", "classification_source"], name="label_rollup_facet"),
+        ]
+
+    def __str__(self):
+        return f"{self.data_source or '-'}/{self.classification_source or '-'} | {self.facet}={self.value} ({self.count})"
+
+
+class AnomalyScore(models.Model):
+    """
+    Precomputed outlier scores of one record of a vector index: how far it
+    lies from its k nearest neighbours and what the source's outlier
+    detector makes of it. Maintained by llmintegration.anomaly_scores so
+    dashboards only run an indexed query and never touch the vectors.
+    """
+    source = models.CharField(max_length=50)
+    record_id = models.CharField(max_length=255)
+    position = models.PositiveIntegerField()  # Slot in the index; a new slot means new content
+    index_version = models.CharField(max_length=64)
+    neighbour_id = models.CharField(max_length=255, blank=True)  # Nearest other record
+    similarity = models.FloatField()  # Cosine similarity to the nearest other record
+    knn_distance = models.FloatField()  # Mean cosine distance to the k nearest other records
+    outlier_score = models.FloatField()  # From the configured detector; higher is more anomalous
+    # Share of the detector's fitting sample scoring lower; unlike the raw score comparable across sources
+    outlier_rank = models.FloatField(default=0.0)
+    excerpt = models.TextField(blank=True)  # Start of the record text, for display
+    scored_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["source", "record_id"], name="anomaly_score_record"),
+        ]
+        indexes = [
+            models.Index(fields=["source", "similarity"], name="anomaly_score_similarity"),
+            models.Index(fields=["source", "-outlier_rank", "-outlier_score"], name="anomaly_score_rank"),
+            # Ranking several sources at once (a scan in rank order skipping the other sources)
+            models.Index(fields=["-outlier_rank", "-outlier_score"], name="anomaly_score_rank_all"),
+        ]
+
+    def __str__(self):
+        return f"{self.source} {self.record_id} (similarity {self.similarity:.3f})"
+
+
+class AnomalyScoringState(models.Model):
+    """Which index version a source's anomaly scores reflect, plus the outlier detector fitted to its vector space."""
+    source = models.CharField(max_length=50, unique=True)
+    index_version = models.CharField(max_length=64)
+    vector_space = models.CharField(max_length=64)  # Hash of the vectorizer the vectors came from
+    k = models.PositiveSmallIntegerField()
+    detector = models.CharField(max_length=20)
+    model = models.BinaryField()  # Pickled fitted detector (empty for "knn")
+    reference_scores = models.BinaryField(default=b"")  # Sorted outlier scores of the fitting sample (.npy)
+    scored_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.source} @ {self.index_version}"
+
+
+class RelatedArticles(models.Model):
+    """
+    Precomputed "more like this" list of one indexed article: its k nearest
+    other articles as [{"id", "title", "similarity"}, ...], best first, so a
+    related-articles panel is one primary-key read. Maintained by
+    llmintegration.related_articles.
+    """
+    article = models.OneToOneField(RawArticle, on_delete=models.CASCADE, primary_key=True, related_name="related")
+    position = models.PositiveIntegerField()  # Slot in the article index; a new slot means new content
+    index_version = models.CharField(max_length=64)
+    neighbours = models.JSONField(default=list)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Article #{self.article_id}: {len(self.neighbours)} related"
+
+
+class RelatedArticlesState(models.Model):
+    """Which article index version the stored neighbour lists reflect."""
+    source = models.CharField(max_length=50, unique=True)
+    index_version = models.CharField(max_length=64)
+    vector_space = models.CharField(max_length=64)  # Hash of the vectorizer the vectors came from
+    k = models.PositiveSmallIntegerField()
+    computed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.source} @ {self.index_version}"
+
+
+class StoryAssignment(models.Model):
+    """
+    The threat story (k-means cluster over the article vectors) an indexed
+    article belongs to and its distance to the story centroid. Maintained
+    by llmintegration.story_clusters.
+    """
+    article = models.OneToOneField(RawArticle, on_delete=models.CASCADE, primary_key=True, related_name="story")
+    cluster = models.PositiveIntegerField()
+    distance = models.FloatField()  # Euclidean distance to the centroid of `cluster`
+    position = models.PositiveIntegerField()  # Slot in the article index; a new slot means new content
+    assigned_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["cluster", "distance"], name="story_assignment_cluster"),
+        ]
+
+    def __str__(self):
+        return f"Article #{self.article_id} -> story {self.cluster} ({self.distance:.3f})"
+
+
+class StoryCluster(models.Model):
+    """Size and most central article of one threat story, for story-level counts on the dashboard."""
+    cluster = models.PositiveIntegerField(unique=True)
+    size = models.PositiveIntegerField()
+    representative = models.ForeignKey(RawArticle, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    title = models.CharField(max_length=200, blank=True)  # Title of the representative article
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-size"], name="story_cluster_size"),
+        ]
+
+    def __str__(self):
+        return f"Story {self.cluster}: {self.title} ({self.size})"
+
+
+class StoryClusteringState(models.Model):
+    """The fitted story centroids and which article index version the assignments reflect."""
+    source = models.CharField(max_length=50, unique=True)
+    index_version = models.CharField(max_length=64)
+    vector_space = models.CharField(max_length=64)  # Hash of the vectorizer the centroids were fitted in
+    clusters = models.PositiveIntegerField()
+    fitted_rows = models.PositiveIntegerField()  # Articles indexed when the centroids were fitted
+    centroids = models.BinaryField()  # float32 .npy array, one row per cluster
+    fitted_at = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.source}: {self.clusters} stories @ {self.index_version}"
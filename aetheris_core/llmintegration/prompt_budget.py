@@ -0,0 +1,159 @@
+# prompt_budget.py
+
+import re
+
+from django.conf import settings
+
+
+TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text):
+    """
+    Local approximation of Gemini's tokenizer: subword tokenizers split
+    English words into pieces of roughly four characters and emit every
+    punctuation mark on its own.
+    """
+    return sum((len(token) + 3) // 4 for token in TOKEN_RE.findall(text or ""))
+
+
+class PromptSection:
+    """
+    Ranked content for one part of a prompt.
+
+    `items` are ordered best first (keep="tail" ranks from the end instead,
+    e.g. the most recent conversation turns). Each item is a string or a
+    tuple of variants from most to least detailed; when the full item no
+    longer fits, a shorter variant is tried before the item and everything
+    ranked below it are dropped. Kept items are emitted in their original
+    order, wrapped in `header`/`footer`, or `empty` when nothing was kept.
+    """
+
+    def __init__(self, name, items, separator="\n", keep="head", header="", footer="", empty=""):
+        self.name = name
+        self.items = [item if isinstance(item, tuple) else (item,) for item in items]
+        self.separator = separator
+        self.keep = keep
+        self.header = header
+        self.footer = footer
+        self.empty = empty
+
+    def fit(self, budget):
+        positions = range(len(self.items))
+        if self.keep == "tail":
+            positions = reversed(positions)
+
+        chosen, compressed = {}, 0
+        used = estimate_tokens(self.header) + estimate_tokens(self.footer)
+        for position in positions:
+            for level, variant in enumerate(self.items[position]):
+                cost = estimate_tokens(variant)
+                if used + cost <= budget:
+                    chosen[position] = variant
+                    used += cost
+                    compressed += level > 0
+                    break
+            else:
+                break
+
+        if not chosen:
+            return SectionFit(self.empty, estimate_tokens(self.empty), 0, 0, len(self.items))
+        text = self.header + self.separator.join(chosen[p] for p in sorted(chosen)) + self.footer
+        return SectionFit(text, used, len(chosen), compressed, len(self.items) - len(chosen))
+
+
+class SectionFit:
+    def __init__(self, text, tokens, kept, compressed, dropped):
+        self.text = text
+        self.tokens = tokens
+        self.kept = kept
+        self.compressed = compressed
+        self.dropped = dropped
+
+    @property
+    def truncated(self):
+        return bool(self.compressed or self.dropped)
+
+
+class AssembledPrompt(str):
+    """The prompt text, with the per-section token usage attached as `.usage`."""
+
+    def __new__(cls, text, usage):
+        prompt = super().__new__(cls, text)
+        prompt.usage = usage
+        return prompt
+
+
+class PromptAssembler:
+    """
+    Fill a prompt template within a token budget.
+
+    The fixed instructions are counted first; what remains is split between
+    the sections by their `allocations` weight. Budget a section does not
+    need is then handed, largest allocation first, to sections that had to
+    compress or drop content.
+    """
+
+    def __init__(self, budget, allocations):
+        self.budget = budget
+        self.allocations = allocations
+
+    def assemble(self, template, sections, **values):
+        placeholders = {}
+        for section in sections:
+            placeholders[section.name] = ""
+            placeholders[f"{section.name}_count"] = 0
+        fixed = estimate_tokens(template.format(**placeholders, **values))
+        available = max(0, self.budget - fixed)
+
+        weights = {s.name: self.allocations.get(s.name, 0) for s in sections}
+        total_weight = sum(weights.values()) or 1
+        granted = {name: int(available * weight / total_weight) for name, weight in weights.items()}
+        fits = {s.name: s.fit(granted[s.name]) for s in sections}
+
+        spare = available - sum(fit.tokens for fit in fits.values())
+        for section in sorted(sections, key=lambda s: -weights[s.name]):
+            if spare <= 0:
+                break
+            if fits[section.name].truncated:
+                # Spare is what the other sections left unused; this section may grow by that much beyond what it uses
+                before = fits[section.name].tokens
+                granted[section.name] = before + spare
+                fits[section.name] = section.fit(granted[section.name])
+                spare -= fits[section.name].tokens - before
+
+        for name, fit in fits.items():
+            placeholders[name] = fit.text
+            placeholders[f"{name}_count"] = fit.kept
+        text = template.format(**placeholders, **values)
+
+        usage = {
+            "budget": self.budget,
+            "fixed": fixed,
+            "total": estimate_tokens(text),
+            "sections": {
+                name: {
+                    "allocated": granted[name],
+                    "tokens": fit.tokens,
+                    "kept": fit.kept,
+                    "compressed": fit.compressed,
+                    "dropped": fit.dropped,
+                }
+                for name, fit in fits.items()
+            },
+        }
+        return AssembledPrompt(text, usage)
+
+
+def get_assembler(prompt_name):
+    """Assembler configured by settings.PROMPT_BUDGETS[prompt_name]."""
+    config = settings.PROMPT_BUDGETS[prompt_name]
+    return PromptAssembler(config["TOKENS"], config["SECTIONS"])
+
+
+def format_usage(usage):
+    sections = ", ".join(
+        f"{name} {stats['tokens']}/{stats['allocated']}" + (f" -{stats['dropped']}" if stats["dropped"] else "")
+        for name, stats in usage["sections"].items()
+    )
+    return f"{usage['total']}/{usage['budget']} tokens (fixed {usage['fixed']}; {sections})"
@@ -0,0 +1,164 @@
+# related_articles.py
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.functions import Substr
+
+from llmintegration.federated_search import to_similarity
+from llmintegration.index_registry import build_key, load_index, vector_space
+from llmintegration.models import RelatedArticles, RelatedArticlesState
+from vtagent.index_artifacts import row_norms, search_index
+from vtagent.models import RawArticle
+
+
+# Vector index the neighbour lists are computed from
+SOURCE = "articles"
+# Characters of each related article's title stored with the list
+TITLE_CHARS = 200
+
+
+def nearest(loaded, positions, depth):
+    """
+    For each position, up to `depth` (position, cosine similarity) pairs of
+    the nearest other live records, best first, from one batched search of
+    the stored vectors against the index.
+    """
+    vectors = loaded.record_vectors(positions)
+    norms = row_norms(vectors)
+    raw_scores, neighbours = search_index(loaded.index, vectors, depth + 1, loaded.backend)
+    results = []
+    for row, position in enumerate(positions):
+        hits = []
+        for neighbour, raw in zip(neighbours[row], raw_scores[row]):
+            # Skip padding, free slots and the record itself
+            if neighbour < 0 or neighbour == position or loaded.id_map[int(neighbour)] is None:
+                continue
+            hits.append((int(neighbour), to_similarity(loaded.backend, raw, norms[row])))
+            if len(hits) == depth:
+                break
+        results.append(hits)
+    return results
+
+
+def _save(lists, positions, version):
+    """
+    Store {article_id: [(neighbour_id, similarity), ...]} with the current
+    titles; articles deleted since the index was built are left out.
+    """
+    ids = set(lists) | {neighbour for hits in lists.values() for neighbour, _ in hits}
+    titles = dict(RawArticle.objects.filter(id__in=ids).annotate(short_title=Substr("title", 1, TITLE_CHARS)).values_list("id", "short_title"))
+    RelatedArticles.objects.bulk_create(
+        [
+            RelatedArticles(
+                article_id=article_id,
+                position=positions[article_id],
+                index_version=version,
+                neighbours=[
+                    {"id": neighbour, "title": titles[neighbour], "similarity": round(similarity, 4)}
+                    for neighbour, similarity in hits if neighbour in titles
+                ],
+            )
+            for article_id, hits in lists.items() if article_id in titles
+        ],
+        update_conflicts=True,
+        unique_fields=["article"],
+        update_fields=["position", "index_version", "neighbours", "computed_at"],
+    )
+
+
+def refresh_related_articles(k=None, full=False, chunk_size=None):
+    """
+    Bring the stored neighbour lists up to date with the published article
+    index. Nothing is done while the version is unchanged. After an
+    incremental update only the new and changed articles are searched, plus
+    the articles whose list held a removed or changed one; the new articles
+    are merged into the lists of the REVERSE_DEPTH articles nearest to them.
+    A refitted vectorizer, a different k or `full` recomputes every list.
+    """
+    config = settings.RELATED_ARTICLES
+    k = k or config["K"]
+    chunk_size = chunk_size or config["CHUNK_SIZE"]
+    loaded = load_index(SOURCE)
+    version, space = build_key(loaded), vector_space(loaded)
+
+    state = RelatedArticlesState.objects.filter(source=SOURCE).first()
+    if state is not None and state.k == k and state.index_version == version and not full:
+        return {"mode": "unchanged", "version": version, "computed": 0, "removed": 0}
+    full = full or state is None or state.k != k or state.vector_space != space
+
+    live = {position: int(article_id) for position, article_id in enumerate(loaded.id_map) if article_id is not None}
+    position_of = {article_id: position for position, article_id in live.items()}
+    stored = {
+        article_id: (position, [(n["id"], n["similarity"]) for n in neighbours])
+        for article_id, position, neighbours in RelatedArticles.objects.values_list("article_id", "position", "neighbours").iterator(chunk_size=5000)
+    }
+    removed = [article_id for article_id in stored if article_id not in position_of]
+
+    def compute(positions, depth=k):
+        """Search `positions` chunk by chunk and store their top-k lists; yields (position, hits to `depth`)."""
+        for start in range(0, len(positions), chunk_size):
+            chunk = positions[start:start + chunk_size]
+            results = nearest(loaded, chunk, depth)
+            _save({live[p]: [(live[n], s) for n, s in hits[:k]] for p, hits in zip(chunk, results)}, position_of, version)
+            yield from zip(chunk, results)
+
+    if full:
+        targets = sorted(live)
+        for _ in compute(targets):
+            pass
+    else:
+        # Changed articles are re-added in a new slot, so a moved position means new content
+        fresh = sorted(position for position, article_id in live.items() if stored.get(article_id, (None,))[0] != position)
+        changed = {live[position] for position in fresh if live[position] in stored}
+        # Lists holding an article that left the index (its own row may already be cascade-deleted) or changed
+        stale = sorted(
+            position_of[article_id] for article_id, (_, hits) in stored.items()
+            if article_id in position_of and position_of[article_id] not in fresh
+            and any(n not in position_of or n in changed for n, _ in hits)
+        )
+
+        # A new article joins the lists of the existing articles it is close to
+        candidates = {}
+        for position, hits in compute(fresh, depth=max(k, config["REVERSE_DEPTH"])):
+            for neighbour, similarity in hits:
+                candidates.setdefault(neighbour, []).append((live[position], similarity))
+        for _ in compute(stale):
+            pass
+
+        skip = set(fresh) | set(stale)
+        merged = {}
+        for position, extra in candidates.items():
+            if position in skip or live[position] not in stored:
+                continue
+            current = stored[live[position]][1]
+            hits = sorted(current + extra, key=lambda hit: -hit[1])[:k]
+            if hits != current:
+                merged[live[position]] = hits
+        merged_ids = list(merged)
+        for start in range(0, len(merged_ids), chunk_size):
+            _save({article_id: merged[article_id] for article_id in merged_ids[start:start + chunk_size]}, position_of, version)
+        targets = fresh + stale + merged_ids
+
+    with transaction.atomic():
+        for start in range(0, len(removed), 500):
+            RelatedArticles.objects.filter(article_id__in=removed[start:start + 500]).delete()
+        if not full:
+            # Lists no new or changed article displaced carry over to the new version
+            RelatedArticles.objects.exclude(index_version=version).update(index_version=version)
+        RelatedArticlesState.objects.update_or_create(
+            source=SOURCE, defaults={"index_version": version, "vector_space": space, "k": k},
+        )
+    return {"mode": "full" if full else "incremental", "version": version, "computed": len(targets), "removed": len(removed)}
+
+
+def related_articles(article_id, limit=None):
+    """The stored neighbour list of an article (one primary-key read), or None if it has none yet."""
+    row = RelatedArticles.objects.filter(pk=article_id).first()
+    if row is None:
+        return None
+    return {
+        "article_id": row.article_id,
+        "index_version": row.index_version,
+        "computed_at": row.computed_at.isoformat(),
+        "related": row.neighbours[:limit] if limit else row.neighbours,
+    }
@@ -0,0 +1,194 @@
+# response_cache.py
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+def normalize_text(text):
+    """Collapse whitespace and case so trivially different prompts share a cache entry."""
+    return re.sub(r"\s+", " ", str(text)).strip().casefold()
+
+
+def hash_parts(*parts):
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\x1f")
+    return digest.hexdigest()
+
+
+def evidence_key(user_query, record_ids, conversation_history=None):
+    """
+    Cache key for a retrieval-augmented answer: the normalised question, the
+    set of retrieved records and the recent conversation. The entry is only
+    reused while the same evidence is retrieved for the same question.
+    """
+    history = [
+        (msg.get("role"), normalize_text(msg.get("text", "")))
+        for msg in (conversation_history or [])[-6:]
+    ]
+    return hash_parts(normalize_text(user_query), sorted(record_ids), json.dumps(history))
+
+
+# --- Backends ---
+# A backend stores (value, expires_at) pairs and evicts least-recently-used entries past max_entries.
+
+class MemoryCacheBackend:
+    """In-process LRU dictionary; fastest, but per worker and lost on restart."""
+
+    def __init__(self, max_entries=1000, **options):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, value, expires_at):
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteCacheBackend:
+    """Single-file persistent cache shared by every worker and management command on the host."""
+
+    def __init__(self, location, max_entries=5000, **options):
+        self.location = str(location)
+        self.max_entries = max_entries
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(self.location) or ".", exist_ok=True)
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS response_cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS response_cache_accessed ON response_cache (accessed_at)")
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.location, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        conn = self._connection()
+        row = conn.execute("SELECT value, expires_at FROM response_cache WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            with conn:
+                conn.execute("UPDATE response_cache SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        return row
+
+    def set(self, key, value, expires_at):
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO response_cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, time.time()),
+            )
+            conn.execute("DELETE FROM response_cache WHERE expires_at < ?", (time.time(),))
+            conn.execute(
+                "DELETE FROM response_cache WHERE key IN ("
+                " SELECT key FROM response_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def delete(self, key):
+        with self._connection() as conn:
+            conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._connection() as conn:
+            conn.execute("DELETE FROM response_cache")
+
+    def __len__(self):
+        return self._connection().execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+
+
+BACKENDS = {
+    "memory": MemoryCacheBackend,
+    "sqlite": SQLiteCacheBackend,
+}
+
+
+class ResponseCache:
+    """TTL cache with hit/miss counters in front of a pluggable storage backend."""
+
+    def __init__(self, backend, ttl=3600):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def make_key(self, namespace, text):
+        return hash_parts(namespace, normalize_text(text))
+
+    def get(self, key):
+        entry = self.backend.get(key)
+        if entry is not None and entry[1] < time.time():
+            self.backend.delete(key)
+            entry = None
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return None if entry is None else entry[0]
+
+    def set(self, key, value, ttl=None):
+        self.backend.set(key, value, time.time() + (ttl or self.ttl))
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "entries": len(self.backend),
+        }
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_response_cache(alias="llm"):
+    """Process-wide cache configured by settings.RESPONSE_CACHES[alias]."""
+    with _caches_lock:
+        if alias not in _caches:
+            config = dict(settings.RESPONSE_CACHES[alias])
+            backend_class = BACKENDS[config.pop("BACKEND")]
+            ttl = config.pop("TTL", 3600)
+            options = {name.lower(): value for name, value in config.items()}
+            _caches[alias] = ResponseCache(backend_class(**options), ttl=ttl)
+        return _caches[alias]
@@ -0,0 +1,48 @@
+# signals.py
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from syntheticcmdb.models import ConfigurationItem
+from vtagent.models import GeneratedTaxonomyLabel
+from llmintegration.asset_index import asset_index
+from llmintegration.label_facets import LABEL_FIELDS, apply_label, maintenance_suspended
+
+
+# --- CMDB -> asset correlation index ---
+
+@receiver(post_save, sender=ConfigurationItem)
+def reindex_configuration_item(sender, instance, **kwargs):
+    asset_index.update(instance)
+
+
+@receiver(post_delete, sender=ConfigurationItem)
+def unindex_configuration_item(sender, instance, **kwargs):
+    asset_index.remove(instance.id)
+
+
+# --- Taxonomy labels -> materialized facet counts ---
+
+@receiver(pre_save, sender=GeneratedTaxonomyLabel)
+def remember_label_facets(sender, instance, **kwargs):
+    # An update replaces the label's previous facet values, so keep them to subtract
+    instance._previous_facets = None
+    if instance.pk and not maintenance_suspended():
+        instance._previous_facets = sender.objects.filter(pk=instance.pk).values(*LABEL_FIELDS).first()
+
+
+@receiver(post_save, sender=GeneratedTaxonomyLabel)
+def count_label_facets(sender, instance, created, **kwargs):
+    if maintenance_suspended():
+        return
+    previous = getattr(instance, "_previous_facets", None)
+    if previous and not created:
+        apply_label(previous, sign=-1)
+    apply_label(instance)
+
+
+@receiver(post_delete, sender=GeneratedTaxonomyLabel)
+def uncount_label_facets(sender, instance, **kwargs):
+    if maintenance_suspended():
+        return
+    apply_label(instance, sign=-1)
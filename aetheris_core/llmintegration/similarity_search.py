@@ -0,0 +1,100 @@
+# similarity_search.py
+
+import json
+import time
+
+from django.conf import settings
+from django.db.models.functions import Substr
+
+from llmintegration.federated_search import to_similarity
+from llmintegration.index_registry import get_index
+from llmintegration.response_cache import get_response_cache, hash_parts, normalize_text
+from vtagent.index_artifacts import SOURCES
+from vtagent.models import RawArticle
+
+
+# Characters of record text returned with each hit
+EXCERPT_CHARS = 300
+
+
+def _hydrate_articles(record_ids):
+    """Title, URL and excerpt of each article in one id__in query, reading only those columns."""
+    rows = (
+        RawArticle.objects.filter(id__in=record_ids)
+        .only("id", "title", "url", "published")
+        .annotate(excerpt=Substr("content", 1, EXCERPT_CHARS))
+    )
+    return {
+        article.id: {"title": article.title, "url": article.url, "published": article.published, "excerpt": article.excerpt}
+        for article in rows
+    }
+
+
+# Source -> function returning {record_id: fields} for a page of hits. Sources without one
+# are described by the record text stored with the index.
+HYDRATORS = {
+    "articles": _hydrate_articles,
+}
+
+
+def ranked_hits(source, query, depth):
+    """
+    (record_id, position, similarity) of the `depth` nearest records, cached
+    per index build: the key holds the build's version (or file signature),
+    so a newly published index is never answered from an older ranking.
+    Returns (loaded index, hits, served from cache).
+    """
+    loaded = get_index(source)
+    cache = get_response_cache("similarity")
+    key = hash_parts("similarity", source, loaded.signature, normalize_text(query), depth)
+    cached = cache.get(key)
+    if cached is not None:
+        return loaded, [tuple(hit) for hit in json.loads(cached)], True
+
+    hits = [
+        (record_id, position, to_similarity(loaded.backend, raw_score))
+        for record_id, position, raw_score in loaded.search(query, top_k=depth)
+    ]
+    cache.set(key, json.dumps(hits))
+    return loaded, hits, False
+
+
+def search_page(query, source="articles", k=10, offset=0):
+    """
+    One page of the records of `source` most similar to `query`: hits
+    offset..offset+k, hydrated in a single query. Records no longer in the
+    database are dropped, so a page can come back short.
+    """
+    config = settings.SIMILARITY_SEARCH
+    if source not in SOURCES:
+        raise ValueError(f"No vector index configured for {source}")
+    k = min(max(int(k), 1), config["MAX_K"])
+    offset = min(max(int(offset), 0), config["MAX_OFFSET"])
+    started = time.perf_counter()
+
+    loaded, hits, cached = ranked_hits(source, query, offset + k)
+    page = hits[offset:offset + k]
+
+    hydrate = HYDRATORS.get(source)
+    records = hydrate([record_id for record_id, _, _ in page]) if hydrate else None
+    results = []
+    for rank, (record_id, position, similarity) in enumerate(page, start=offset + 1):
+        if records is not None:
+            fields = records.get(record_id)
+            if fields is None:
+                continue
+        else:
+            fields = {"excerpt": (loaded.texts[position] or "")[:EXCERPT_CHARS].strip()}
+        results.append(dict(fields, rank=rank, record_id=record_id, similarity=round(similarity, 4)))
+
+    return {
+        "query": query,
+        "source": source,
+        "version": loaded.version,
+        "k": k,
+        "offset": offset,
+        "next_offset": offset + k if len(hits) == offset + k else None,
+        "results": results,
+        "cached": cached,
+        "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
@@ -0,0 +1,202 @@
+# story_clusters.py
+
+import io
+from collections import Counter
+
+import faiss
+import numpy as np
+import scipy.sparse as sp
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import Substr
+from django.utils import timezone
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.preprocessing import normalize
+
+from llmintegration.index_registry import build_key, get_index, load_index, vector_space
+from llmintegration.models import StoryAssignment, StoryCluster, StoryClusteringState
+from vtagent.index_artifacts import as_dense
+from vtagent.models import RawArticle
+
+
+# Vector index the stories are clustered from
+SOURCE = "articles"
+
+
+def cluster_count(rows, config):
+    """Configured number of stories, or one per ARTICLES_PER_STORY indexed articles."""
+    return max(1, min(config["CLUSTERS"] or rows // config["ARTICLES_PER_STORY"], rows))
+
+
+def fit_centroids(loaded, positions, clusters, config, seed=0):
+    """
+    Story centroids fitted on a random sample of at most TRAIN_SAMPLE
+    articles: faiss k-means on the dense vectors of the faiss backend,
+    scikit-learn mini-batch k-means on the CSR rows of the sparse one.
+    """
+    rng = np.random.default_rng(seed)
+    sample = np.sort(rng.choice(positions, min(config["TRAIN_SAMPLE"], len(positions)), replace=False))
+    vectors = loaded.record_vectors(sample)
+    clusters = min(clusters, len(sample))
+    if sp.issparse(vectors):
+        kmeans = MiniBatchKMeans(n_clusters=clusters, n_init=3, max_iter=config["NITER"], random_state=seed)
+        return kmeans.fit(vectors).cluster_centers_.astype(np.float32)
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    kmeans = faiss.Kmeans(vectors.shape[1], clusters, niter=config["NITER"], seed=seed, min_points_per_centroid=1)
+    kmeans.train(vectors)
+    return kmeans.centroids
+
+
+def nearest_centroids(vectors, centroids):
+    """(cluster, Euclidean distance) of the nearest centroid of every row, for dense or CSR rows."""
+    if sp.issparse(vectors):
+        row_norms = np.asarray(vectors.multiply(vectors).sum(axis=1)).ravel()
+    else:
+        row_norms = (vectors ** 2).sum(axis=1)
+    distances = row_norms[:, None] - 2 * np.asarray(vectors @ centroids.T) + (centroids ** 2).sum(axis=1)[None, :]
+    clusters = distances.argmin(axis=1)
+    return clusters, np.sqrt(np.maximum(distances[np.arange(len(clusters)), clusters], 0.0))
+
+
+def _dump(centroids):
+    buffer = io.BytesIO()
+    np.save(buffer, centroids)
+    return buffer.getvalue()
+
+
+def _load(blob):
+    return np.load(io.BytesIO(bytes(blob)))
+
+
+def summarize_stories(chunk_size=5000):
+    """Recompute the size and most central article of every story from the assignments."""
+    sizes = dict(StoryAssignment.objects.values_list("cluster").annotate(size=Count("pk")).order_by())
+    representatives = {}
+    for cluster, article_id in StoryAssignment.objects.order_by("cluster", "distance").values_list("cluster", "article_id").iterator(chunk_size=chunk_size):
+        representatives.setdefault(cluster, article_id)
+    titles = dict(
+        RawArticle.objects.filter(id__in=representatives.values())
+        .annotate(short_title=Substr("title", 1, 200)).values_list("id", "short_title")
+    )
+    with transaction.atomic():
+        StoryCluster.objects.all().delete()
+        StoryCluster.objects.bulk_create(
+            [
+                StoryCluster(cluster=cluster, size=size, representative_id=representatives[cluster], title=titles.get(representatives[cluster], ""))
+                for cluster, size in sizes.items()
+            ],
+            batch_size=chunk_size,
+        )
+    return len(sizes)
+
+
+def refresh_story_clusters(full=False, chunk_size=None):
+    """
+    Bring the story assignments up to date with the published article
+    index. Nothing is done while the version is unchanged. New and changed
+    articles are assigned to the existing centroids; the centroids are
+    refitted, and every article reassigned, when the vectorizer was refitted,
+    when more than REFIT_FRACTION of the corpus arrived since the last fit,
+    or with `full`.
+    """
+    config = settings.STORY_CLUSTERING
+    chunk_size = chunk_size or config["CHUNK_SIZE"]
+    loaded = load_index(SOURCE)
+    version, space = build_key(loaded), vector_space(loaded)
+
+    state = StoryClusteringState.objects.filter(source=SOURCE).first()
+    if state is not None and state.index_version == version and not full:
+        return {"mode": "unchanged", "version": version, "clusters": state.clusters, "assigned": 0, "removed": 0}
+
+    live = {position: int(article_id) for position, article_id in enumerate(loaded.id_map) if article_id is not None}
+    live_ids = set(live.values())
+    stored = dict(StoryAssignment.objects.values_list("article_id", "position").iterator(chunk_size=5000))
+    removed = [article_id for article_id in stored if article_id not in live_ids]
+    # Changed articles are re-added in a new slot, so a moved position means new content
+    fresh = sorted(position for position, article_id in live.items() if stored.get(article_id) != position)
+
+    refit = (
+        full or state is None or state.vector_space != space
+        or len(fresh) > config["REFIT_FRACTION"] * max(state.fitted_rows, 1)
+    )
+    if refit:
+        targets = sorted(live)
+        centroids = fit_centroids(loaded, targets, cluster_count(len(targets), config), config) if targets else np.zeros((0, 0), np.float32)
+    else:
+        targets = fresh
+        centroids = _load(state.centroids)
+
+    for start in range(0, len(targets), chunk_size):
+        chunk = targets[start:start + chunk_size]
+        clusters, distances = nearest_centroids(loaded.record_vectors(chunk), centroids)
+        existing = set(RawArticle.objects.filter(id__in=[live[p] for p in chunk]).values_list("id", flat=True))
+        StoryAssignment.objects.bulk_create(
+            [
+                StoryAssignment(article_id=live[position], cluster=int(cluster), distance=float(distance), position=position)
+                for position, cluster, distance in zip(chunk, clusters, distances)
+                # Articles deleted since the index was built
+                if live[position] in existing
+            ],
+            update_conflicts=True,
+            unique_fields=["article"],
+            update_fields=["cluster", "distance", "position", "assigned_at"],
+        )
+
+    with transaction.atomic():
+        for start in range(0, len(removed), 500):
+            StoryAssignment.objects.filter(article_id__in=removed[start:start + 500]).delete()
+        defaults = {"index_version": version, "vector_space": space}
+        if refit:
+            defaults.update(clusters=len(centroids), fitted_rows=len(targets), centroids=_dump(centroids), fitted_at=timezone.now())
+        StoryClusteringState.objects.update_or_create(source=SOURCE, defaults=defaults)
+    stories = summarize_stories()
+    return {
+        "mode": "full" if refit else "incremental",
+        "version": version,
+        "clusters": stories,
+        "assigned": len(targets),
+        "removed": len(removed),
+    }
+
+
+def one_per_story(article_ids, loaded=None):
+    """
+    `article_ids` in order, dropping each article that repeats one already
+    kept: same story and a cosine similarity of at least DUPLICATE_SIMILARITY
+    to a kept article of that story. Sharing a story alone is not enough, as
+    k-means also groups loosely related articles. Only the articles that
+    share a story with another candidate are encoded; articles without a
+    story are always kept.
+    """
+    loaded = loaded or get_index(SOURCE)
+    # Assignments older than the loaded build may point at a reused slot
+    assignments = {
+        article_id: (cluster, position)
+        for article_id, cluster, position in StoryAssignment.objects.filter(article_id__in=article_ids)
+        .values_list("article_id", "cluster", "position")
+        if position < len(loaded.id_map) and loaded.id_map[position] == article_id
+    }
+    sizes = Counter(cluster for cluster, _ in assignments.values())
+    shared = [
+        article_id for article_id in dict.fromkeys(article_ids)
+        if article_id in assignments and sizes[assignments[article_id][0]] > 1
+    ]
+    if not shared:
+        return list(article_ids)
+    vectors = normalize(loaded.record_vectors([assignments[article_id][1] for article_id in shared]))
+    similarities = as_dense(vectors @ vectors.T)
+    row = {article_id: i for i, article_id in enumerate(shared)}
+
+    threshold = settings.STORY_CLUSTERING["DUPLICATE_SIMILARITY"]
+    kept_rows = {}
+    kept = []
+    for article_id in article_ids:
+        if article_id in row:
+            cluster, i = assignments[article_id][0], row[article_id]
+            story_rows = kept_rows.setdefault(cluster, [])
+            if any(similarities[i, j] >= threshold for j in story_rows):
+                continue
+            story_rows.append(i)
+        kept.append(article_id)
+    return kept
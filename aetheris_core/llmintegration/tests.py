@@ -1,3 +1,326 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+import time
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from asgiref.sync import async_to_sync
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from llmintegration.anomaly_scores import low_similarity_records, outlier_ranks, ranked_anomalies, score_source
+from llmintegration.article_search import lexical_search, reciprocal_rank_fusion
+from llmintegration.contextual_query_pipeline import abuild_gemini_request, render_threat_prompt
+from llmintegration.federated_search import federated_search, resolve_sources
+from llmintegration.index_registry import load_index, registry
+from llmintegration.llm_utils import call_gemini
+from llmintegration.models import AnomalyScore, AnomalyScoringState, StoryAssignment
+from llmintegration.response_cache import MemoryCacheBackend, ResponseCache, SQLiteCacheBackend, evidence_key
+from llmintegration.story_clusters import one_per_story
+from vtagent.index_artifacts import new_version, publish_version, write_index_artifacts
+from vtagent.models import NewsSource, RawArticle
+
+
+ARTICLE_TEXTS = [
+    "Critical PAN-OS GlobalProtect flaw CVE-2024-3400 exploited to run commands on Palo Alto firewalls",
+    "Critical PAN-OS GlobalProtect flaw CVE-2024-3400 exploited to run commands on Palo Alto firewalls, patch now",
+    "Ransomware gang leaks patient records stolen from a hospital network",
+    "Phishing campaign abuses OAuth consent screens to take over Microsoft 365 mailboxes",
+]
+
+
+class OnePerStoryTests(TestCase):
+    """Articles of one story are only dropped when they repeat an article already kept."""
+
+    def setUp(self):
+        self.faiss_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.faiss_root)
+        source = NewsSource.objects.create(name="Test", url="https://news.example.org", category="cybersecurity")
+        self.ids = [
+            RawArticle.objects.create(source=source, source_type="bs4", title=text[:40], url=f"https://news.example.org/{i}", content=text).id
+            for i, text in enumerate(ARTICLE_TEXTS)
+        ]
+        vectorizer = TfidfVectorizer()
+        matrix = vectorizer.fit_transform(ARTICLE_TEXTS)
+        write_index_artifacts(f"{self.faiss_root}/articles", matrix, self.ids, ARTICLE_TEXTS, vectorizer)
+        # k-means put all four articles in one story
+        StoryAssignment.objects.bulk_create(
+            [StoryAssignment(article_id=article_id, cluster=0, distance=0.5, position=i) for i, article_id in enumerate(self.ids)]
+        )
+
+    def test_near_duplicate_dropped_unrelated_kept(self):
+        with override_settings(FAISS_ROOT=self.faiss_root):
+            loaded = load_index("articles")
+        original, near_duplicate, unrelated, other = self.ids
+        self.assertEqual(
+            one_per_story([original, near_duplicate, unrelated, other], loaded),
+            [original, unrelated, other],
+        )
+
+    def test_articles_without_story_kept(self):
+        with override_settings(FAISS_ROOT=self.faiss_root):
+            loaded = load_index("articles")
+        StoryAssignment.objects.all().delete()
+        self.assertEqual(one_per_story(self.ids, loaded), self.ids)
+
+
+class AsyncPipelineTests(TransactionTestCase):
+    """The async chat pipeline runs its ORM stages off the event loop."""
+
+    def test_filter_extraction_off_event_loop(self):
+        # extract_filter_entities reads NewsSource names; on the event loop that raises SynchronousOnlyOperation
+        NewsSource.objects.create(name="Test", url="https://news.example.org", category="cybersecurity")
+        prompt, cache_key = async_to_sync(abuild_gemini_request)("How many servers are in Berlin?")
+        self.assertIn("Berlin", prompt)
+        self.assertIsNone(cache_key)
+
+
+class ThreatPromptBudgetTests(SimpleTestCase):
+    """The threat prompt stays inside its token budget and only names the sources of articles it kept."""
+
+    def setUp(self):
+        self.articles = [
+            SimpleNamespace(
+                id=i, title=f"Threat report {i}", published="2026-10-01", url=f"https://news.example.org/{i}",
+                content="exploited vulnerability lateral movement " * 100, source=SimpleNamespace(name=f"Feed{i:02d}"),
+            )
+            for i in range(20)
+        ]
+
+    def render(self, budget):
+        config = {"TOKENS": budget, "SECTIONS": {"articles": 0.5, "assets": 0.2, "labels": 0.15, "history": 0.15}}
+        with override_settings(PROMPT_BUDGETS={"threat": config}):
+            return render_threat_prompt("What is exploited?", None, self.articles, {}, {}, [], 0)
+
+    def test_within_budget(self):
+        prompt = self.render(1500)
+        self.assertLessEqual(prompt.usage["total"], 1500)
+        self.assertTrue(prompt.usage["sections"]["articles"]["dropped"])
+
+    def test_dropped_articles_take_their_sources(self):
+        prompt = self.render(1500)
+        kept = prompt.usage["sections"]["articles"]["kept"]
+        self.assertGreater(kept, 0)
+        for article in self.articles:
+            self.assertEqual(article.source.name in prompt, article.id < kept)
+
+
+class ResponseCacheTests(SimpleTestCase):
+    """Gemini answers are reused for the same question and evidence, and expire or get evicted."""
+
+    def test_evidence_key(self):
+        history = [{"role": "chat-user", "text": "Anything new on PAN-OS?"}]
+        key = evidence_key("Which  servers are AFFECTED?", ["Article:1", "CMDB:7"], history)
+        self.assertEqual(key, evidence_key("which servers are affected?", ["CMDB:7", "Article:1"], history))
+        self.assertNotEqual(key, evidence_key("which servers are affected?", ["Article:1", "CMDB:8"], history))
+        self.assertNotEqual(key, evidence_key("which servers are affected?", ["Article:1", "CMDB:7"]))
+
+    def test_ttl_and_stats(self):
+        cache = ResponseCache(MemoryCacheBackend(), ttl=60)
+        cache.set("fresh", "answer")
+        cache.set("stale", "answer", ttl=-1)
+        self.assertEqual(cache.get("fresh"), "answer")
+        self.assertIsNone(cache.get("stale"))
+        self.assertIsNone(cache.get("missing"))
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 2, "hit_rate": 0.333, "entries": 1})
+
+    def test_memory_backend_evicts_least_recently_used(self):
+        backend = MemoryCacheBackend(max_entries=2)
+        expires_at = time.time() + 60
+        backend.set("a", "1", expires_at)
+        backend.set("b", "2", expires_at)
+        backend.get("a")
+        backend.set("c", "3", expires_at)
+        self.assertIsNone(backend.get("b"))
+        self.assertEqual(backend.get("a"), ("1", expires_at))
+
+    def test_sqlite_backend_shared_across_instances(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        location = os.path.join(directory, "responses.sqlite3")
+        expires_at = time.time() + 60
+        writer = SQLiteCacheBackend(location, max_entries=2)
+        for key in ("a", "b", "c"):
+            writer.set(key, key.upper(), expires_at)
+        reader = SQLiteCacheBackend(location)
+        self.assertEqual(len(reader), 2)
+        self.assertIsNone(reader.get("a"))
+        self.assertEqual(reader.get("c"), ("C", expires_at))
+
+    def test_call_gemini_answers_from_cache(self):
+        cache = ResponseCache(MemoryCacheBackend())
+        with mock.patch("llmintegration.llm_utils.get_response_cache", return_value=cache), \
+                mock.patch("llmintegration.llm_utils._generate", return_value="answer") as generate:
+            self.assertEqual(call_gemini("Prompt  one", cache_key="evidence"), "answer")
+            self.assertEqual(call_gemini("Prompt two", cache_key="evidence"), "answer")
+            self.assertEqual(call_gemini("prompt one"), "answer")
+            self.assertEqual(call_gemini("PROMPT ONE "), "answer")
+        self.assertEqual(generate.call_count, 2)
+
+
+class ArticleSearchTests(TestCase):
+    """BM25 retrieval over the FTS5 table the triggers keep in step with RawArticle, and rank fusion."""
+
+    def setUp(self):
+        self.source = NewsSource.objects.create(name="Test", url="https://news.example.org", category="cybersecurity")
+        self.other = NewsSource.objects.create(name="Other", url="https://other.example.org", category="cybersecurity")
+        self.in_title = self.article("Ransomware hits a hospital", "Systems were encrypted overnight.")
+        self.in_body = self.article("Weekly roundup", "A ransomware crew also claimed a school district.")
+        self.unrelated = self.article("Phishing kit sold", "Operators target OAuth consent screens.", source=self.other)
+
+    def article(self, title, content, source=None):
+        return RawArticle.objects.create(
+            source=source or self.source, source_type="bs4", title=title, url=f"https://news.example.org/{RawArticle.objects.count()}", content=content,
+        )
+
+    def test_title_match_ranks_first(self):
+        self.assertEqual(lexical_search("ransomware attacks"), [self.in_title.id, self.in_body.id])
+
+    def test_triggers_follow_updates_and_deletes(self):
+        RawArticle.objects.filter(id=self.unrelated.id).update(content="Ransomware affiliates bought the kit.")
+        self.assertIn(self.unrelated.id, lexical_search("ransomware"))
+        self.in_title.delete()
+        self.assertNotIn(self.in_title.id, lexical_search("ransomware"))
+
+    def test_filters(self):
+        copy = self.article("Ransomware hits a hospital", "Systems were encrypted overnight.")
+        RawArticle.objects.filter(id=copy.id).update(duplicate_of=self.in_title)
+        self.assertNotIn(copy.id, lexical_search("ransomware"))
+        self.assertEqual(lexical_search("ransomware phishing", source="other"), [self.unrelated.id])
+
+    def test_query_syntax_is_quoted(self):
+        self.assertCountEqual(lexical_search('ransomware" OR NEAR(phishing'), [self.in_title.id, self.in_body.id, self.unrelated.id])
+        self.assertEqual(lexical_search("the and of"), [])
+
+    def test_reciprocal_rank_fusion(self):
+        # Ranked high by both retrievers beats first place in only one of them
+        self.assertEqual(reciprocal_rank_fusion([[1, 2, 3], [2, 4, 1]]), [2, 1, 4, 3])
+        self.assertEqual(reciprocal_rank_fusion([]), [])
+
+
+class FederatedSearchTests(SimpleTestCase):
+    """One query searched across several indexes, merged on a common similarity scale."""
+
+    def setUp(self):
+        self.faiss_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.faiss_root)
+        settings_override = override_settings(FAISS_ROOT=self.faiss_root, FEDERATED_SEARCH={"WORKERS": 4, "TIMEOUT": 5.0, "WEIGHTS": {}})
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        registry.invalidate()
+        self.addCleanup(registry.invalidate)
+        self.build("articles", ARTICLE_TEXTS, [1, 2, 3, 4])
+        self.build("cmdb", ["Linux web server in Berlin running nginx", "Windows laptop in Paris with Microsoft 365"], [10, 11])
+
+    def build(self, source, texts, ids):
+        vectorizer = TfidfVectorizer()
+        write_index_artifacts(f"{self.faiss_root}/{source}", vectorizer.fit_transform(texts), ids, texts, vectorizer)
+
+    def test_results_merged_by_similarity(self):
+        result = federated_search("Microsoft 365 mailboxes", sources=["articles", "cmdb"], top_k=3, include_text=20)
+        self.assertEqual([(hit["source"], hit["record_id"]) for hit in result["results"][:2]], [("cmdb", 11), ("articles", 4)])
+        self.assertEqual(result["results"][1]["text"], ARTICLE_TEXTS[3][:20].strip())
+        scores = [hit["score"] for hit in result["results"]]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertEqual({source: report["status"] for source, report in result["sources"].items()}, {"articles": "ok", "cmdb": "ok"})
+
+    def test_weights_scale_scores(self):
+        with override_settings(FEDERATED_SEARCH={"WORKERS": 4, "TIMEOUT": 5.0, "WEIGHTS": {"cmdb": 0.1}}):
+            result = federated_search("Microsoft 365 mailboxes", sources=["articles", "cmdb"], top_k=2)
+        self.assertEqual([hit["source"] for hit in result["results"]], ["articles", "cmdb"])
+        cmdb = result["results"][1]
+        self.assertAlmostEqual(cmdb["score"], cmdb["similarity"] * 0.1, places=3)
+
+    def test_query_without_known_terms_matches_nothing(self):
+        result = federated_search("zzzz qqqq", sources=["articles", "cmdb"])
+        self.assertTrue(all(hit["similarity"] == 0.0 for hit in result["results"]))
+
+    def test_missing_source_reported_not_fatal(self):
+        result = federated_search("Berlin server", sources=["articles", "cmdb", "ad"])
+        self.assertEqual(result["sources"]["ad"]["status"], "error")
+        self.assertEqual(result["results"][0]["record_id"], 10)
+
+    def test_resolve_sources(self):
+        self.assertEqual(resolve_sources(["cmdb", "logs", "siem_logs"])[:2], ["cmdb", "siem_logs"])
+        self.assertEqual(len(resolve_sources(["logs"])), 7)
+        with self.assertRaises(ValueError):
+            resolve_sources(["classifier"])
+
+
+ANOMALY_SCORING = {"K": 2, "CHUNK_SIZE": 2, "DETECTOR_SAMPLE": 100, "THRESHOLD": 0.3, "DETECTORS": {"default": "knn", "cmdb": "iforest"}}
+
+
+@override_settings(ANOMALY_SCORING=ANOMALY_SCORING)
+class AnomalyScoreTests(TestCase):
+    """Cached nearest-neighbour anomaly scores follow the published index and rank sources on one scale."""
+
+    def setUp(self):
+        self.faiss_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.faiss_root)
+        settings_override = override_settings(FAISS_ROOT=self.faiss_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.vectorizer = TfidfVectorizer().fit(ARTICLE_TEXTS)
+        self.publish("articles", ARTICLE_TEXTS)
+
+    def publish(self, source, texts, vectorizer=None):
+        vectorizer = vectorizer or self.vectorizer
+        version, staging = new_version(source)
+        ids = list(range(1, len(texts) + 1))
+        write_index_artifacts(staging, vectorizer.transform(texts), ids, texts, vectorizer)
+        publish_version(source, version, staging, "faiss", len(ids), time.time())
+        return version
+
+    def test_full_scoring(self):
+        result = score_source("articles")
+        self.assertEqual((result["mode"], result["scored"]), ("full", len(ARTICLE_TEXTS)))
+        rows = {row.record_id: row for row in AnomalyScore.objects.filter(source="articles")}
+        # The two reports of the same flaw are each other's nearest neighbour
+        self.assertEqual((rows["1"].neighbour_id, rows["2"].neighbour_id), ("2", "1"))
+        self.assertGreater(rows["1"].similarity, 0.8)
+        self.assertAlmostEqual(rows["3"].outlier_score, rows["3"].knn_distance)
+        self.assertEqual(rows["4"].excerpt, ARTICLE_TEXTS[3])
+        self.assertEqual(
+            [row.record_id for row in low_similarity_records("articles", threshold=0.5)],
+            [record_id for record_id in ("3", "4") if rows[record_id].similarity < 0.5],
+        )
+        self.assertEqual(score_source("articles")["mode"], "unchanged")
+
+    def test_new_records_scored_incrementally(self):
+        score_source("articles")
+        copy = ARTICLE_TEXTS[2] + ", hospital network"
+        version = self.publish("articles", ARTICLE_TEXTS + [copy])
+        result = score_source("articles")
+        self.assertEqual(result["mode"], "incremental")
+        # The new record and the existing one it became the nearest neighbour of
+        self.assertEqual(result["scored"], 2)
+        rows = {row.record_id: row for row in AnomalyScore.objects.filter(source="articles")}
+        self.assertEqual((rows["5"].neighbour_id, rows["3"].neighbour_id, rows["3"].index_version), ("3", "5", version))
+        self.assertEqual(AnomalyScoringState.objects.get(source="articles").index_version, version)
+
+    def test_refitted_vectorizer_rescored_in_full(self):
+        score_source("articles")
+        self.publish("articles", ARTICLE_TEXTS[:3], TfidfVectorizer().fit(ARTICLE_TEXTS[:3]))
+        result = score_source("articles")
+        self.assertEqual((result["mode"], result["scored"], result["removed"]), ("full", 3, 1))
+
+    def test_outlier_ranks(self):
+        reference = np.array([0.1, 0.2, 0.3, 0.4])
+        self.assertEqual(list(outlier_ranks(reference, np.array([0.05, 0.2, 0.9]))), [0.0, 0.5, 1.0])
+        self.assertEqual(list(outlier_ranks(np.zeros(0), np.array([0.5]))), [0.0])
+
+    def test_sources_ranked_by_percentile(self):
+        cmdb_texts = ["Linux web server in Berlin running nginx", "Linux web server in Munich running nginx", "Windows laptop in Paris"]
+        self.publish("cmdb", cmdb_texts, TfidfVectorizer().fit(cmdb_texts))
+        score_source("articles")
+        score_source("cmdb")
+        self.assertEqual(AnomalyScoringState.objects.get(source="cmdb").detector, "iforest")
+        rows = list(ranked_anomalies(["articles", "cmdb"]))
+        self.assertEqual({row.source for row in rows}, {"articles", "cmdb"})
+        ranks = [row.outlier_rank for row in rows]
+        self.assertEqual(ranks, sorted(ranks, reverse=True))
+        self.assertTrue(all(0.0 <= rank <= 1.0 for rank in ranks))
+        with override_settings(ANOMALY_SCORING=dict(ANOMALY_SCORING, DETECTORS={"default": "knn"})):
+            self.assertEqual(score_source("cmdb")["mode"], "full")
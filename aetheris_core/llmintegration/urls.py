@@ -4,16 +4,25 @@ from . import views, views_orchestrator, views_dashboard, views_similarity, view
 urlpatterns = [
     # Chat interface
     path("chat/", views.llm_chat_view, name="llm_chat_view"),
+    path("chat/stream/", views.llm_chat_stream_view, name="llm_chat_stream_view"),
+    path("chat/async/", views.llm_chat_async_view, name="llm_chat_async_view"),
 
     # API endpoint for raw Aetheris LLM prompt
     path("api/llm/", views.gemini_prompt_api_view, name="aetheris_llm_api"),
+    path("api/llm/cache-stats/", views.llm_cache_stats_view, name="llm_cache_stats"),
+
+    # Federated vector search across sources
+    path("api/search/", views.federated_search_view, name="federated_search"),
 
     # Dashboard
     path("dashboard/", views_dashboard.llm_dashboard_view, name="llm_dashboard"),
 
     #FAISS similarity reports
     path("similarity-dashboard/", views_similarity.similarity_dashboard_view, name="llm_similarity_dashboard"),
+    path("api/similarity/", views_similarity.similarity_search_api_view, name="similarity_search_api"),
+    path("api/articles/<int:article_id>/related/", views_similarity.related_articles_api_view, name="related_articles_api"),
 
     #FAISS Anamolies reports
     path("anomalies/", views_anomaly.anomaly_dashboard_view, name="llm_anomalies_dashboard"),
+    path("anomalies/logs/", views_anomaly.log_anomalies_view, name="llm_log_anomalies"),
 ]
@@ -2,10 +2,16 @@
 
 import json
 from django.shortcuts import render
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
-from llmintegration.contextual_query_pipeline import build_gemini_prompt_and_response
+from llmintegration.contextual_query_pipeline import (
+    abuild_gemini_prompt_and_response,
+    build_gemini_prompt_and_response,
+    stream_gemini_prompt_and_response,
+)
+from llmintegration.federated_search import federated_search
 from llmintegration.llm_utils import call_gemini
+from llmintegration.response_cache import get_response_cache
 import markdown2
 
 # UI-based Chat View
@@ -58,6 +64,90 @@ def llm_chat_view(request):
     })
 
 
+def _sse(payload, event=None):
+    """Encode one Server-Sent Event carrying a JSON payload"""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(payload)}\n\n"
+
+
+# Streaming Chat View (Server-Sent Events)
+@csrf_exempt
+def llm_chat_stream_view(request):
+    if request.method != "POST":
+        return JsonResponse({"error": "Only POST allowed"}, status=405)
+
+    user_input = request.POST.get("user_input", "").strip()
+    if not user_input:
+        return JsonResponse({"error": "Message cannot be empty"}, status=400)
+
+    # Make sure the session (and its cookie) exists before the response starts streaming
+    if "history" not in request.session:
+        request.session["history"] = []
+    conversation_history = list(request.session["history"])
+
+    def event_stream():
+        chunks = []
+        try:
+            for chunk in stream_gemini_prompt_and_response(user_input, conversation_history):
+                chunks.append(chunk)
+                yield _sse({"delta": chunk})
+        except Exception as e:
+            yield _sse({"error": str(e)}, event="error")
+            return
+
+        gemini_response = "".join(chunks).strip()
+        response_html = markdown2.markdown(gemini_response)
+
+        # SessionMiddleware has already run by the time the stream ends, so persist explicitly
+        request.session["history"].append({"role": "chat-user", "text": user_input})
+        request.session["history"].append({"role": "chat-bot", "text": gemini_response, "text_html": response_html})
+        request.session.save()
+
+        yield _sse({
+            "response_html": response_html,
+            "message_count": len(request.session["history"])
+        }, event="done")
+
+    response = StreamingHttpResponse(event_stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # Disable proxy buffering so tokens are flushed immediately
+    return response
+
+
+# Async Chat View (serve through ASGI, e.g. `uvicorn aetheris_core.asgi:application`)
+@csrf_exempt
+async def llm_chat_async_view(request):
+    if request.method != "POST":
+        return JsonResponse({"error": "Only POST allowed"}, status=405)
+
+    if request.POST.get("clear_context"):
+        await request.session.aset("history", [])
+        return JsonResponse({"success": True, "message_count": 0})
+
+    user_input = request.POST.get("user_input", "").strip()
+    if not user_input:
+        return JsonResponse({"error": "Message cannot be empty"}, status=400)
+
+    conversation_history = await request.session.aget("history", [])
+    try:
+        gemini_response = await abuild_gemini_prompt_and_response(user_input, conversation_history)
+    except Exception as e:
+        return JsonResponse({"success": False, "error": str(e)}, status=500)
+
+    response_html = markdown2.markdown(gemini_response)
+    history = conversation_history + [
+        {"role": "chat-user", "text": user_input},
+        {"role": "chat-bot", "text": gemini_response, "text_html": response_html},
+    ]
+    await request.session.aset("history", history)
+
+    return JsonResponse({
+        "success": True,
+        "response_html": response_html,
+        "message_count": len(history)
+    })
+
+
 # JSON API endpoint for Gemini prompt
 @csrf_exempt
 def gemini_prompt_api_view(request):
@@ -76,3 +166,24 @@ def gemini_prompt_api_view(request):
             return JsonResponse({"error": str(e)}, status=500)
 
     return JsonResponse({"error": "Only POST allowed"}, status=405)
+
+
+def federated_search_view(request):
+    """
+    One query across several vector indexes: ?q=fortigate&sources=cmdb,ad,logs&k=10.
+    Returns the merged ranking with source tags and each source's latency.
+    """
+    query = request.GET.get("q", "").strip()
+    if not query:
+        return JsonResponse({"error": "Missing query parameter q"}, status=400)
+    sources = [name.strip() for name in request.GET.get("sources", "").split(",") if name.strip()]
+    try:
+        top_k = min(max(int(request.GET.get("k", 10)), 1), 100)
+        return JsonResponse(federated_search(query, sources=sources or None, top_k=top_k, include_text=300))
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+
+def llm_cache_stats_view(request):
+    """Hit/miss counters of this worker's LLM response cache."""
+    return JsonResponse(get_response_cache().stats())
@@ -1,34 +1,50 @@
 # views_anomaly.py
 
-from django.shortcuts import render
-from llmintegration.faiss_query_utils import load_faiss_index
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.shortcuts import redirect, render
+from llmintegration.anomaly_scores import low_similarity_records, ranked_anomalies
+from llmintegration.federated_search import SOURCE_GROUPS
+from llmintegration.models import AnomalyScoringState
+from vtagent.index_artifacts import current_version
 from vtagent.models import RawArticle, GeneratedTaxonomyLabel
 from syntheticcmdb.models import ConfigurationItem
 
 
+# Records listed per page load, most isolated first
+MAX_RECORDS = 100
+LOG_PAGE_SIZE = 50
+
+
 def anomaly_dashboard_view(request):
     data_type = request.GET.get("type", "articles")  # can be "articles" or "logs"
-    index_path = data_type if data_type != "logs" else "logs/siem"
-
-    # Load FAISS index + metadata
-    index, id_map, texts = load_faiss_index(index_path)
+    if data_type == "logs":
+        return redirect("llm_log_anomalies")
+    source = data_type
 
-    # Step 1: Run similarity search against all vectors themselves
-    scores, indices = index.search(index.reconstruct_n(0, len(id_map)), 2)
+    try:
+        threshold = float(request.GET.get("threshold", settings.ANOMALY_SCORING["THRESHOLD"]))
+    except ValueError:
+        threshold = settings.ANOMALY_SCORING["THRESHOLD"]
 
-    # Step 2: Select low similarity records (e.g. below threshold)
-    threshold = 0.3
-    low_sim_ids = [id_map[i] for i, sim in enumerate(scores[:, 1]) if sim < threshold]
+    # Step 1: Read the precomputed low-similarity records (`manage.py score_anomalies`); no vector search here
+    scores = list(low_similarity_records(source, threshold, limit=MAX_RECORDS))
 
-    # Step 3: Pull low similarity articles/logs
-    records = RawArticle.objects.filter(id__in=low_sim_ids) if data_type == "articles" else []
+    # Step 2: Pull low similarity articles/logs in score order
+    records = []
+    if data_type == "articles":
+        articles = RawArticle.objects.only("id", "title", "content").in_bulk([int(score.record_id) for score in scores])
+        for score in scores:
+            article = articles.get(int(score.record_id))
+            if article is not None:
+                article.anomaly = score
+                records.append(article)
     matched_taxonomy = GeneratedTaxonomyLabel.objects.filter(record_id__in=[f"Article:{r.id}" for r in records])
 
-    # Step 4: Map taxonomy to affected internal assets
+    # Step 3: Map taxonomy to affected internal assets
     matched_platforms = set(p for label in matched_taxonomy for p in (label.platform or []))
     possible_assets = ConfigurationItem.objects.all()[:200]
 
-
     return render(request, "llmintegration/llm_anomaly_dashboard.html", {
         "records": records,
         "taxonomy": matched_taxonomy,
@@ -36,3 +52,33 @@ def anomaly_dashboard_view(request):
         "threshold": threshold,
         "data_type": data_type
     })
+
+
+def log_anomalies_view(request):
+    """
+    Paginated log anomalies across the seven log families (or ?family=<source>),
+    most anomalous first. Only the cached scores are read; they are refreshed
+    by `manage.py score_anomalies logs`, never inside a request.
+    """
+    families = SOURCE_GROUPS["logs"]
+    family = request.GET.get("family", "all")
+    sources = [family] if family in families else families
+
+    rows = ranked_anomalies(sources).only(
+        "source", "record_id", "similarity", "knn_distance", "outlier_score", "outlier_rank", "excerpt", "index_version", "scored_at",
+    )
+    page = Paginator(rows, LOG_PAGE_SIZE).get_page(request.GET.get("page"))
+
+    # Families whose published index moved on since they were scored (a pointer read each, no index load)
+    scored = dict(AnomalyScoringState.objects.filter(source__in=sources).values_list("source", "index_version"))
+    stale = [
+        source for source in sources
+        if source not in scored or (current_version(source) is not None and scored[source] != current_version(source))
+    ]
+
+    return render(request, "llmintegration/llm_log_anomalies.html", {
+        "families": families,
+        "family": family if family in families else "all",
+        "page": page,
+        "stale": stale,
+    })
@@ -1,74 +1,55 @@
 # views_dashboard.py
 
 from django.shortcuts import render
-from django.db.models import Count
 from vtagent.models import GeneratedTaxonomyLabel
+from llmintegration.label_facets import dashboard_rollups
+from llmintegration.models import StoryCluster
 import json
-from collections import Counter
+
+
+# Dashboard chart -> rolled-up label field
+CHARTS = {
+    "impact": "impact",
+    "os": "os",
+    "platform": "platform",
+    "software": "software",
+    "department": "department",
+    "country": "country",
+    "mitre": "mitre_tactics",
+}
 
 
 def llm_dashboard_view(request):
-    # Total label volume by data source
-    source_counts = (
-        GeneratedTaxonomyLabel.objects
-        .values("data_source")
-        .annotate(count=Count("id"))
-        .order_by("data_source")
-    )
+    # Optional narrowing to one data source and/or classifier
+    data_source = request.GET.get("data_source") or None
+    classification_source = request.GET.get("classification_source") or None
 
-    # Classification source breakdown (LLM vs ML)
-    classification_counts = (
-        GeneratedTaxonomyLabel.objects
-        .values("classification_source")
-        .annotate(count=Count("id"))
-        .order_by("classification_source")
-    )
+    # Label volumes and top field values, from the materialized rollups
+    rollups = dashboard_rollups(data_source, classification_source)
 
     # Recent label generation (last 10 by timestamp)
     recent_labels = (
         GeneratedTaxonomyLabel.objects
+        .only("record_id", "data_source", "classification_source", "labels_generated_at")
         .order_by("-labels_generated_at")[:10]
     )
 
-    # Helper to flatten multivalued fields
-    def flatten_field(field_name):
-        all_values = []
-        for label in GeneratedTaxonomyLabel.objects.exclude(**{field_name: None}):
-            val = getattr(label, field_name)
-            if isinstance(val, list):
-                all_values.extend(val)
-            elif val:
-                all_values.append(val)
-        return Counter(all_values).most_common(10)
-
-    impact_data = flatten_field("impact")
-    os_data = flatten_field("os")
-    platform_data = flatten_field("platform")
-    software_data = flatten_field("software")
-    department_data = flatten_field("department")
-    country_data = flatten_field("country")
-    mitre_data = flatten_field("mitre_tactics")
+    # Largest threat stories (article clusters), maintained by `manage.py cluster_stories`
+    top_stories = StoryCluster.objects.only("cluster", "size", "representative_id", "title").order_by("-size")[:10]
 
     context = {
-        "source_labels": json.dumps([x["data_source"] for x in source_counts]),
-        "source_values": json.dumps([x["count"] for x in source_counts]),
-        "class_labels": json.dumps([x["classification_source"] for x in classification_counts]),
-        "class_values": json.dumps([x["count"] for x in classification_counts]),
+        "source_labels": json.dumps([x[0] for x in rollups["sources"]]),
+        "source_values": json.dumps([x[1] for x in rollups["sources"]]),
+        "class_labels": json.dumps([x[0] for x in rollups["classifiers"]]),
+        "class_values": json.dumps([x[1] for x in rollups["classifiers"]]),
         "recent_labels": recent_labels,
-        "impact_labels": json.dumps([x[0] for x in impact_data]),
-        "impact_values": json.dumps([x[1] for x in impact_data]),
-        "os_labels": json.dumps([x[0] for x in os_data]),
-        "os_values": json.dumps([x[1] for x in os_data]),
-        "platform_labels": json.dumps([x[0] for x in platform_data]),
-        "platform_values": json.dumps([x[1] for x in platform_data]),
-        "software_labels": json.dumps([x[0] for x in software_data]),
-        "software_values": json.dumps([x[1] for x in software_data]),
-        "department_labels": json.dumps([x[0] for x in department_data]),
-        "department_values": json.dumps([x[1] for x in department_data]),
-        "country_labels": json.dumps([x[0] for x in country_data]),
-        "country_values": json.dumps([x[1] for x in country_data]),
-        "mitre_labels": json.dumps([x[0] for x in mitre_data]),
-        "mitre_values": json.dumps([x[1] for x in mitre_data])
+        "top_stories": top_stories,
+        "story_count": StoryCluster.objects.count(),
+        "data_source": data_source or "",
+        "classification_source": classification_source or "",
     }
+    for chart, field in CHARTS.items():
+        context[f"{chart}_labels"] = json.dumps([x[0] for x in rollups["facets"][field]])
+        context[f"{chart}_values"] = json.dumps([x[1] for x in rollups["facets"][field]])
 
     return render(request, "llmintegration/llm_dashboard.html", context)
@@ -1,27 +1,56 @@
 # views_similarity.py
 
+from django.http import JsonResponse
 from django.shortcuts import render
-from llmintegration.faiss_query_utils import search_similar
-from vtagent.models import RawArticle
+from llmintegration.related_articles import related_articles
+from llmintegration.similarity_search import search_page
+
+
+def similarity_search_api_view(request):
+    """
+    Similarity search over one index: ?q=phishing&source=articles&k=10&offset=0.
+    Hits come back ranked with their similarity and, for articles, title, URL
+    and excerpt; `next_offset` pages on while more hits exist.
+    """
+    query = request.GET.get("q", "").strip()
+    if not query:
+        return JsonResponse({"error": "Missing query parameter q"}, status=400)
+    try:
+        return JsonResponse(search_page(
+            query,
+            source=request.GET.get("source", "articles"),
+            k=request.GET.get("k", 10),
+            offset=request.GET.get("offset", 0),
+        ))
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+
+def related_articles_api_view(request, article_id):
+    """Precomputed "more like this" list of one article (?k= to shorten it); no vector search is run."""
+    try:
+        limit = int(request.GET["k"]) if "k" in request.GET else None
+    except ValueError:
+        return JsonResponse({"error": "k must be an integer"}, status=400)
+    related = related_articles(article_id, limit=limit)
+    if related is None:
+        return JsonResponse({"error": f"No related articles computed for article {article_id}"}, status=404)
+    return JsonResponse(related)
 
 
 def similarity_dashboard_view(request):
     query = request.GET.get("q", "phishing threat")
-    results = search_similar(query_text=query, index_key="articles", top_k=5)
-
-    enriched = []
-    for record_id, text, score in results:
-        try:
-            article = RawArticle.objects.get(id=record_id)
-            enriched.append({
-                "title": article.title,
-                "excerpt": article.content[:300] + "...",
-                "score": round(score, 3)
-            })
-        except RawArticle.DoesNotExist:
-            continue
+    try:
+        k = int(request.GET.get("k", 5))
+        offset = int(request.GET.get("offset", 0))
+    except ValueError:
+        k, offset = 5, 0
+    page = search_page(query, source="articles", k=k, offset=offset)
 
     return render(request, "llmintegration/llm_similarity_dashboard.html", {
         "query": query,
-        "results": enriched
+        "results": page["results"],
+        "k": page["k"],
+        "previous_offset": max(page["offset"] - page["k"], 0) if page["offset"] else None,
+        "next_offset": page["next_offset"],
     })
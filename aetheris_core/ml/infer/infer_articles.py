@@ -15,25 +15,27 @@ django.setup()
 
 
 from vtagent.models import RawArticle, GeneratedTaxonomyLabel
+from vtagent.index_artifacts import artifact_paths
+from vtagent.record_store import read_ids, read_texts
 
 # --- Paths ---
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-FAISS_DIR = os.path.join(PROJECT_ROOT, "..", "faiss", "articles")
 MODEL_PATH = os.path.join(PROJECT_ROOT, "..", "ml", "models", "article_rf.pkl")
 
 MLB_PATH = os.path.join(PROJECT_ROOT, "..", "ml", "models", "article_mlb.pkl")
 mlb = joblib.load(MLB_PATH)
 
 # --- Load FAISS Data ---
-index_path = os.path.join(FAISS_DIR, "index.index")
-id_map_path = os.path.join(FAISS_DIR, "id_map.pkl")
-vectorizer_path = os.path.join(FAISS_DIR, "vectorizer.pkl")
-texts_path = os.path.join(FAISS_DIR, "texts.pkl")
+faiss_paths = artifact_paths("articles")
+index_path = faiss_paths["index"]
+id_map_path = faiss_paths["id_map"]
+vectorizer_path = faiss_paths["vectorizer"]
+texts_path = faiss_paths["texts"]
 
 index = faiss.read_index(index_path)
-id_map = joblib.load(id_map_path)  # Should be list of article IDs
+id_map = read_ids(id_map_path)  # Article id per vector position, None for a free slot
 vectorizer = joblib.load(vectorizer_path)
-texts = joblib.load(texts_path)
+texts = [text or "" for text in read_texts(texts_path)]
 
 # --- Load ML Model ---
 clf = joblib.load(MODEL_PATH)
@@ -9,36 +9,39 @@ django.setup()
 
 from vtagent.models import GeneratedTaxonomyLabel
 from syntheticcmdb.models import ConfigurationItem
+from llmintegration.label_facets import bulk_label_changes
 
-# --- Wipe Existing CMDB Labels ---
-GeneratedTaxonomyLabel.objects.filter(classification_source="cmdb").delete()
-print("[✓] Deleted previous CMDB classification labels")
+# bulk_create skips model signals, so facet counts are rebuilt once at the end
+with bulk_label_changes():
+    # --- Wipe Existing CMDB Labels ---
+    GeneratedTaxonomyLabel.objects.filter(classification_source="cmdb").delete()
+    print("[✓] Deleted previous CMDB classification labels")
 
-# --- Generate New Labels ---
-new_labels = []
+    # --- Generate New Labels ---
+    new_labels = []
 
-for ci in ConfigurationItem.objects.all()[:50]:  # Limiting to 50 for now
-    label = GeneratedTaxonomyLabel(
-        raw_article=None,
-        record_id=ci.id,
-        classification_source="cmdb",
-        platform=[ci.os],
-        software=ci.software,
-        connectivity=ci.connectivity,
-        hardware_vendor=ci.hardware_vendor,
-        network_zone=ci.network_zone,
-        country=ci.country,
-        city=ci.city,
-        business_unit=ci.business_unit,
-        department=ci.department,
-        security_posture=ci.security_posture,
-        severity=["Low"],       # Placeholder
-        impact=["Minimal"],
-        actor=["Insider"],
-        origin=["Internal"],
-        compliance=["ISO27001"]
-    )
-    new_labels.append(label)
+    for ci in ConfigurationItem.objects.all()[:50]:  # Limiting to 50 for now
+        label = GeneratedTaxonomyLabel(
+            raw_article=None,
+            record_id=ci.id,
+            classification_source="cmdb",
+            platform=[ci.os],
+            software=ci.software,
+            connectivity=ci.connectivity,
+            hardware_vendor=ci.hardware_vendor,
+            network_zone=ci.network_zone,
+            country=ci.country,
+            city=ci.city,
+            business_unit=ci.business_unit,
+            department=ci.department,
+            security_posture=ci.security_posture,
+            severity=["Low"],       # Placeholder
+            impact=["Minimal"],
+            actor=["Insider"],
+            origin=["Internal"],
+            compliance=["ISO27001"]
+        )
+        new_labels.append(label)
 
-GeneratedTaxonomyLabel.objects.bulk_create(new_labels)
-print(f"[✓] Created {len(new_labels)} CMDB classification labels")
+    GeneratedTaxonomyLabel.objects.bulk_create(new_labels)
+    print(f"[✓] Created {len(new_labels)} CMDB classification labels")
@@ -3,7 +3,6 @@ import sys
 import django
 import joblib
 import faiss
-import pickle
 import numpy as np
 from sklearn.multioutput import MultiOutputClassifier
 from sklearn.ensemble import RandomForestClassifier
@@ -15,16 +14,18 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "aetheris_core.settings")
 django.setup()
 
 from vtagent.models import GeneratedTaxonomyLabel
+from vtagent.index_artifacts import artifact_paths
+from vtagent.record_store import read_ids, read_texts
 
 # --- FAISS + Label Paths ---
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))  # C:\Projects\Aetheris_POC\aetheris_core
-FAISS_DIR = os.path.join(PROJECT_ROOT, "faiss", "ad")
 MODEL_DIR = os.path.join(PROJECT_ROOT, "ml", "models")
 os.makedirs(MODEL_DIR, exist_ok=True)
 
-INDEX_PATH = os.path.join(FAISS_DIR, "index.index")
-ID_MAP_PATH = os.path.join(FAISS_DIR, "id_map.pkl")
-TEXTS_PATH = os.path.join(FAISS_DIR, "texts.pkl")
+FAISS_PATHS = artifact_paths("ad")
+INDEX_PATH = FAISS_PATHS["index"]
+ID_MAP_PATH = FAISS_PATHS["id_map"]
+TEXTS_PATH = FAISS_PATHS["texts"]
 MODEL_PATH = os.path.join(MODEL_DIR, "ad_rf.pkl")
 
 print(f"[DEBUG] INDEX_PATH: {INDEX_PATH}")
@@ -33,8 +34,7 @@ print(f"[DEBUG] Exists? {os.path.exists(INDEX_PATH)}")
 # --- Load FAISS Index & Metadata ---
 index = faiss.read_index(INDEX_PATH)
 
-with open(ID_MAP_PATH, "rb") as f:
-    id_map_raw = pickle.load(f)
+id_map_raw = list(read_ids(ID_MAP_PATH))
 
 # Convert to dict if needed
 id_map = (
@@ -47,8 +47,7 @@ print(f"[DEBUG] id_map sample values: {list(id_map.items())[:5]}")
 print(f"[DEBUG] id_map type: {type(id_map)}")
 print(f"[DEBUG] Total index length: {index.ntotal}")
 
-with open(TEXTS_PATH, "rb") as f:
-    all_texts = pickle.load(f)
+all_texts = read_texts(TEXTS_PATH)
 
 # --- Load Labels ---
 labels = GeneratedTaxonomyLabel.objects.filter(classification_source="ad")
@@ -10,7 +10,6 @@ from sklearn.multioutput import MultiOutputClassifier
 from sklearn.preprocessing import MultiLabelBinarizer
 from sklearn.pipeline import make_pipeline
 from sklearn.preprocessing import StandardScaler
-import pickle
 
 # --- Django Setup ---
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
@@ -18,27 +17,25 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "aetheris_core.settings")
 django.setup()
 
 from vtagent.models import GeneratedTaxonomyLabel
+from vtagent.index_artifacts import artifact_paths
+from vtagent.record_store import read_ids, read_texts
 
 # --- Paths ---
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
-FAISS_DIR = os.path.join(PROJECT_ROOT, "faiss", "articles")
 MODEL_DIR = os.path.join(PROJECT_ROOT, "ml", "models")
 os.makedirs(MODEL_DIR, exist_ok=True)
 
-INDEX_PATH = os.path.join(FAISS_DIR, "index.index")
-ID_MAP_PATH = os.path.join(FAISS_DIR, "id_map.pkl")
-TEXTS_PATH = os.path.join(FAISS_DIR, "texts.pkl")
-VECTORIZER_PATH = os.path.join(FAISS_DIR, "vectorizer.pkl")
+FAISS_PATHS = artifact_paths("articles")
+INDEX_PATH = FAISS_PATHS["index"]
+ID_MAP_PATH = FAISS_PATHS["id_map"]
+TEXTS_PATH = FAISS_PATHS["texts"]
+VECTORIZER_PATH = FAISS_PATHS["vectorizer"]
 
 print(f"[DEBUG] INDEX_PATH: {INDEX_PATH}")
 print(f"[DEBUG] Exists? {os.path.exists(INDEX_PATH)}")
 
 # --- Load Vectorizer & Texts ---
-with open(ID_MAP_PATH, "rb") as f:
-    id_map = joblib.load(f)
-
-with open(TEXTS_PATH, "rb") as f:
-    all_texts = joblib.load(f)
+id_map = list(read_ids(ID_MAP_PATH))
 
 with open(VECTORIZER_PATH, "rb") as f:
     vectorizer = joblib.load(f)
@@ -75,8 +72,7 @@ print(f"[DEBUG] Valid labels after filtering: {len(valid_labels)}")
 
 
 # --- Load all text descriptions ---
-with open(TEXTS_PATH, "rb") as f:
-    all_texts = pickle.load(f)
+all_texts = read_texts(TEXTS_PATH)
 
 # --- Prepare Training Data ---
 X_raw = []
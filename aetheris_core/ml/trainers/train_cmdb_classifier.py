@@ -17,16 +17,18 @@ django.setup()
 
 
 from vtagent.models import GeneratedTaxonomyLabel
+from vtagent.index_artifacts import artifact_paths
+from vtagent.record_store import read_ids, read_texts
 
 # --- Correct Path Setup ---
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))  # C:\Projects\Aetheris_POC\aetheris_core
-FAISS_DIR = os.path.join(PROJECT_ROOT, "faiss", "cmdb")
 MODEL_DIR = os.path.join(PROJECT_ROOT, "ml", "models")
 
-INDEX_PATH = os.path.join(FAISS_DIR, "index.index")
-ID_MAP_PATH = os.path.join(FAISS_DIR, "id_map.pkl")
-TEXTS_PATH = os.path.join(FAISS_DIR, "texts.pkl")
-VECTORIZER_PATH = os.path.join(FAISS_DIR, "vectorizer.pkl")
+FAISS_PATHS = artifact_paths("cmdb")
+INDEX_PATH = FAISS_PATHS["index"]
+ID_MAP_PATH = FAISS_PATHS["id_map"]
+TEXTS_PATH = FAISS_PATHS["texts"]
+VECTORIZER_PATH = FAISS_PATHS["vectorizer"]
 
 # Debug paths to confirm
 print(f"[DEBUG] INDEX_PATH: {INDEX_PATH}")
@@ -36,8 +38,7 @@ print(f"[DEBUG] Exists? {os.path.exists(INDEX_PATH)}")
 # --- Load FAISS and metadata ---
 index = faiss.read_index(INDEX_PATH)
 
-with open(ID_MAP_PATH, "rb") as f:
-    id_map = pickle.load(f)  # dict: {record_id: vector_index}
+id_map = list(read_ids(ID_MAP_PATH))
 # Convert list to dict for safer access
 if isinstance(id_map, list):
     id_map = {rid: idx for idx, rid in enumerate(id_map)}
@@ -47,8 +48,7 @@ print(f"[DEBUG] id_map sample values: {list(id_map.items())[:5]}")
 with open(VECTORIZER_PATH, "rb") as f:
     vectorizer = pickle.load(f)
 
-with open(TEXTS_PATH, "rb") as f:
-    all_texts = pickle.load(f)
+all_texts = read_texts(TEXTS_PATH)
 
 print(f"[DEBUG] id_map type: {type(id_map)}")
 #print(f"[DEBUG] id_map sample values: {id_map[:5]}")
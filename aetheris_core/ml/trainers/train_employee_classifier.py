@@ -16,13 +16,14 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "aetheris_core.settings")
 django.setup()
 
 from vtagent.models import GeneratedTaxonomyLabel
+from vtagent.index_artifacts import artifact_paths
+from vtagent.record_store import read_ids
 import faiss
 
 # Inline FAISS loader
 def load_vector_index(index_path, id_map_path):
     index = faiss.read_index(index_path)
-    with open(id_map_path, "rb") as f:
-        id_map = pickle.load(f)
+    id_map = list(read_ids(id_map_path))
     vectors = []
     for i in range(index.ntotal):
         vec = index.reconstruct(i)
@@ -30,8 +31,9 @@ def load_vector_index(index_path, id_map_path):
     return vectors, id_map
 
 # File paths
-VECTOR_FILE = os.path.join(settings.BASE_DIR, "aetheris_core", "faiss", "employees", "index.index")
-ID_MAP_FILE = os.path.join(settings.BASE_DIR, "aetheris_core", "faiss", "employees", "id_map.pkl")
+FAISS_PATHS = artifact_paths("employees")
+VECTOR_FILE = FAISS_PATHS["index"]
+ID_MAP_FILE = FAISS_PATHS["id_map"]
 MODEL_OUT = os.path.join(settings.BASE_DIR, "aetheris_core", "ml", "models", "employee_rf.pkl")
 
 
@@ -14,16 +14,18 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "aetheris_core.settings")
 django.setup()
 
 from vtagent.models import GeneratedTaxonomyLabel
+from vtagent.index_artifacts import artifact_paths
+from vtagent.record_store import read_ids, read_texts
 
 # --- Paths ---
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
-FAISS_DIR = os.path.join(PROJECT_ROOT, "faiss", "logs")
 MODEL_DIR = os.path.join(PROJECT_ROOT, "ml", "models")
 LOG_TYPE = "firewall_logs"
-INDEX_PATH = os.path.join(FAISS_DIR, f"{LOG_TYPE}.index.index")
-ID_MAP_PATH = os.path.join(FAISS_DIR, f"{LOG_TYPE}.id_map.pkl")
-VECTORIZER_PATH = os.path.join(FAISS_DIR, f"{LOG_TYPE}.vectorizer.pkl")
-TEXTS_PATH = os.path.join(FAISS_DIR, f"{LOG_TYPE}.texts.pkl")
+FAISS_PATHS = artifact_paths(LOG_TYPE)
+INDEX_PATH = FAISS_PATHS["index"]
+ID_MAP_PATH = FAISS_PATHS["id_map"]
+VECTORIZER_PATH = FAISS_PATHS["vectorizer"]
+TEXTS_PATH = FAISS_PATHS["texts"]
 MODEL_PATH = os.path.join(MODEL_DIR, f"{LOG_TYPE}_rf.pkl")
 
 # --- Load FAISS Data ---
@@ -31,14 +33,12 @@ print(f"[DEBUG] INDEX_PATH: {INDEX_PATH}")
 print(f"[DEBUG] Exists? {os.path.exists(INDEX_PATH)}")
 index = faiss.read_index(INDEX_PATH)
 
-with open(ID_MAP_PATH, "rb") as f:
-    id_map = pickle.load(f)
+id_map = list(read_ids(ID_MAP_PATH))
 
 with open(VECTORIZER_PATH, "rb") as f:
     vectorizer = pickle.load(f)
 
-with open(TEXTS_PATH, "rb") as f:
-    all_texts = pickle.load(f)
+all_texts = read_texts(TEXTS_PATH)
 
 print(f"[DEBUG] id_map sample values: {id_map[:5]}")
 print(f"[DEBUG] id_map type: {type(id_map)}")
@@ -5,7 +5,7 @@ from datetime import datetime
 import logging
 import asyncio
 
-from vtagent.models import RawArticle  # Ensure this import is valid
+from vtagent.near_duplicates import ingest_article
 
 logger = logging.getLogger("generic_news_spider")
 
@@ -47,8 +47,9 @@ class GenericNewsSpider(scrapy.Spider):
             from vtagent.models import NewsSource
             source_obj = NewsSource.objects.get(id=self.source_id)
             
-            article_obj, created = await asyncio.to_thread(
-                RawArticle.objects.get_or_create,
+            # Dedupe on URL and, for new URLs, on near-duplicate text (syndicated copies)
+            article_obj, created, duplicate_of = await asyncio.to_thread(
+                ingest_article,
                 url=response.url,
                 defaults={
                     'title': article.title or response.url,
@@ -63,7 +64,9 @@ class GenericNewsSpider(scrapy.Spider):
                     'scraped_at': datetime.now()
                 }
             )
-            if created:
+            if created and duplicate_of:
+                logger.info(f"Near-duplicate of article {duplicate_of}, not processed again: {response.url}")
+            elif created:
                 self.articles_scraped += 1
                 logger.info(f"Saved new article: {article.title}")
         except Exception as e:
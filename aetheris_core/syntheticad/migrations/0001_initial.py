@@ -0,0 +1,78 @@
+# Generated by Django 5.2 on 2026-10-18 06:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('syntheticemployees', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Domain',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ADUser',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sAMAccountName', models.CharField(max_length=100, unique=True)),
+                ('display_name', models.CharField(max_length=255)),
+                ('mail', models.EmailField(max_length=254)),
+                ('department', models.CharField(max_length=100)),
+                ('country', models.CharField(max_length=100)),
+                ('employee', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to='syntheticemployees.employee')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ADGroup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('description', models.TextField(blank=True)),
+                ('scope', models.CharField(choices=[('global', 'Global'), ('domain-local', 'Domain Local'), ('universal', 'Universal')], max_length=50)),
+                ('members', models.ManyToManyField(related_name='groups', to='syntheticad.aduser')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DomainController',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hostname', models.CharField(max_length=255)),
+                ('location', models.CharField(max_length=100)),
+                ('domain', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='syntheticad.domain')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='OrganizationalUnit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('domain', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='syntheticad.domain')),
+                ('parent', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='syntheticad.organizationalunit')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='aduser',
+            name='ou',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='syntheticad.organizationalunit'),
+        ),
+        migrations.CreateModel(
+            name='ServiceAccount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('purpose', models.TextField()),
+                ('created_for', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='syntheticad.organizationalunit')),
+                ('domain', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='syntheticad.domain')),
+            ],
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2 on 2026-10-18 06:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('syntheticad', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConfigurationItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('asset_type', models.CharField(max_length=100)),
+                ('hostname', models.CharField(max_length=255)),
+                ('os', models.CharField(max_length=100)),
+                ('os_version', models.CharField(max_length=50)),
+                ('software', models.JSONField(blank=True, default=list)),
+                ('software_version', models.CharField(max_length=50)),
+                ('hardware_vendor', models.CharField(max_length=100)),
+                ('model', models.CharField(max_length=100)),
+                ('network_zone', models.CharField(max_length=100)),
+                ('connectivity', models.CharField(max_length=50)),
+                ('security_software', models.CharField(max_length=100)),
+                ('ip_address', models.GenericIPAddressField(blank=True, null=True)),
+                ('business_unit', models.CharField(max_length=100)),
+                ('department', models.CharField(max_length=100)),
+                ('employee_id', models.CharField(max_length=20)),
+                ('employee_email', models.EmailField(max_length=254)),
+                ('country', models.CharField(max_length=50)),
+                ('city', models.CharField(max_length=100)),
+                ('owner', models.CharField(max_length=100)),
+                ('security_posture', models.CharField(choices=[('compliant', 'Compliant'), ('non-compliant', 'Non-Compliant'), ('patch-needed', 'Needs Patching')], max_length=100)),
+                ('last_updated', models.DateTimeField(auto_now=True)),
+                ('ad_user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='syntheticad.aduser')),
+                ('domain', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='syntheticad.domain')),
+            ],
+        ),
+    ]
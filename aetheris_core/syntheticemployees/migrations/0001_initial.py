@@ -0,0 +1,27 @@
+# Generated by Django 5.2 on 2026-10-18 06:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Employee',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('employee_id', models.CharField(max_length=20, unique=True)),
+                ('name', models.CharField(max_length=100)),
+                ('email', models.EmailField(max_length=254, unique=True)),
+                ('department', models.CharField(max_length=100)),
+                ('business_unit', models.CharField(max_length=100)),
+                ('country', models.CharField(max_length=50)),
+                ('city', models.CharField(max_length=100)),
+            ],
+        ),
+    ]
@@ -12,6 +12,8 @@ django.setup()
 
 from llmintegration.contextual_query_pipeline import build_gemini_prompt_and_response
 from vtagent.models import RawArticle
+from vtagent.index_artifacts import artifact_paths
+from vtagent.record_store import read_ids
 import faiss
 import pickle
 import numpy as np
@@ -32,13 +34,13 @@ for article in webdav_articles:
     print(f"   - {article.title}")
 
 # Step 2: Check FAISS index
-INDEX_PATH = os.path.join("faiss", "articles", "index.index")
-ID_MAP_PATH = os.path.join("faiss", "articles", "id_map.pkl")
-VECTORIZER_PATH = os.path.join("faiss", "articles", "vectorizer.pkl")
+ARTICLE_PATHS = artifact_paths("articles")
+INDEX_PATH = ARTICLE_PATHS["index"]
+ID_MAP_PATH = ARTICLE_PATHS["id_map"]
+VECTORIZER_PATH = ARTICLE_PATHS["vectorizer"]
 
 faiss_index = faiss.read_index(INDEX_PATH)
-with open(ID_MAP_PATH, "rb") as f:
-    id_map = pickle.load(f)
+id_map = read_ids(ID_MAP_PATH)
 with open(VECTORIZER_PATH, "rb") as f:
     vectorizer = pickle.load(f)
 
@@ -10,7 +10,7 @@ from bs4 import BeautifulSoup
 from newspaper import Article
 from fake_useragent import UserAgent
 from datetime import datetime
-from vtagent.models import RawArticle
+from vtagent.near_duplicates import ingest_article
 
 logger = logging.getLogger(__name__)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -92,8 +92,8 @@ def run_bs4(source):
                     fallback_soup = BeautifulSoup(fallback_resp.text, "html.parser")
                     text = fallback_soup.get_text(strip=True, separator="\n")
                 if text and len(text) >= 300:
-                    # Use get_or_create to handle duplicates gracefully
-                    article_obj, created = RawArticle.objects.get_or_create(
+                    # Dedupe on URL and, for new URLs, on near-duplicate text (syndicated copies)
+                    article_obj, created, duplicate_of = ingest_article(
                         url=full_url,
                         defaults={
                             'source': source,
@@ -108,7 +108,9 @@ def run_bs4(source):
                             'scraped_at': datetime.now()
                         }
                     )
-                    if created:
+                    if created and duplicate_of:
+                        logger.info(f"Near-duplicate of article {duplicate_of}, not processed again: {full_url}")
+                    elif created:
                         count += 1
             except Exception as e:
                 logger.warning(f"Failed to extract article using newspaper3k: {e} on URL {full_url}")
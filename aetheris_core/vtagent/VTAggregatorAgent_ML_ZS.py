@@ -53,7 +53,7 @@ def main():
     classifier = pipeline("zero-shot-classification", model="MoritzLaurer/deberta-v3-large-zeroshot-v1")
 
     logging.info("Fetching RawArticles...")
-    raw_articles = RawArticle.objects.all()
+    raw_articles = RawArticle.canonical.all()
     to_classify = []
 
     for raw in raw_articles:
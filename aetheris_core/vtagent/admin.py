@@ -1,7 +1,7 @@
 # admin.py for vtagent
 from django.contrib import admin
 from django.urls import path, reverse
-from django.utils.html import format_html
+from django.utils.html import format_html, format_html_join
 from django.shortcuts import redirect
 from django.contrib import messages
 from django.conf import settings
@@ -12,6 +12,7 @@ import subprocess
 import os
 
 from .models import NewsSource, RawArticle, ClassifiedArticle, GeneratedTaxonomyLabel
+from llmintegration.models import RelatedArticles
 from .CrawlDispatcher import crawl_news_source
 
 import sys
@@ -108,31 +109,15 @@ class NewsSourceAdmin(ExportMixin, admin.ModelAdmin):
         return redirect(reverse('admin:vtagent_newssource_changelist'))
     
     def _auto_vectorize_articles(self):
-        """Auto-vectorize articles after crawling"""
-        import subprocess
-        import sys
-        from django.conf import settings
-        
-        # BASE_DIR points to /Users/sid/.../aetheris/, so we need aetheris_core/vtagent/
-        script_path = os.path.join(settings.BASE_DIR, "aetheris_core", "vtagent", "vectorize_articles.py")
-        
-        # Debug: Check if script exists
-        if not os.path.exists(script_path):
-            raise Exception(f"Vectorization script not found at: {script_path}")
-        
-        # Change to the correct working directory
-        old_cwd = os.getcwd()
-        try:
-            os.chdir(os.path.join(settings.BASE_DIR, "aetheris_core"))
-            result = subprocess.run([sys.executable, script_path], capture_output=True, text=True)
-        finally:
-            os.chdir(old_cwd)
-        
-        if result.returncode != 0:
-            raise Exception(f"Vectorization failed: {result.stderr}")
-        
+        """Auto-vectorize articles after crawling (only the new ones; see `manage.py vectorize articles --incremental`)"""
+        from io import StringIO
+        from django.core.management import call_command
+
+        output = StringIO()
+        call_command("vectorize", "articles", "--incremental", "--workers", "1", stdout=output, stderr=output)
+
         # Return success message
-        return f"Vectorized articles: {result.stdout.strip()}"
+        return f"Vectorized articles: {output.getvalue().strip()}"
     
     def _auto_classify_articles(self, article_count):
         """Auto-generate taxonomy labels for new articles"""
@@ -184,7 +169,9 @@ class NewsSourceAdmin(ExportMixin, admin.ModelAdmin):
 
 @admin.register(RawArticle)
 class RawArticleAdmin(ExportMixin, admin.ModelAdmin):
-    list_display = ['id', 'title', 'source', 'published']
+    list_display = ['id', 'title', 'source', 'published', 'duplicate_of', 'related_link']
+    raw_id_fields = ['duplicate_of']
+    readonly_fields = ['related_articles']
     change_list_template = "admin/rawarticle_changelist.html"
 
     def get_urls(self):
@@ -195,37 +182,39 @@ class RawArticleAdmin(ExportMixin, admin.ModelAdmin):
         return custom_urls + urls
 
     def vectorize_articles(self, request):
-        try:
-            import sys
-            from django.conf import settings
-
-            # Build absolute paths
-            venv_python = os.path.join(settings.BASE_DIR, "venv", "Scripts", "python.exe")
-            script_path = os.path.join(settings.BASE_DIR, "aetheris_core", "vtagent", "FAISS_Vectorizer.py")
-
-            # NEW: DEBUG PRINT TO CHECK PATHS
-            print(f"[DEBUG] Interpreter path: {venv_python}")
-            print(f"[DEBUG] Script path: {script_path}")
-
-            # NEW: Check if both paths exist before proceeding
-            if not os.path.isfile(venv_python):
-                raise FileNotFoundError(f"Python interpreter not found at: {venv_python}")
-            if not os.path.isfile(script_path):
-                raise FileNotFoundError(f"Script not found at: {script_path}")
-
-            # Run subprocess
-            result = subprocess.run([venv_python, script_path], capture_output=True, text=True)
-
-            if result.returncode == 0:
-                self.message_user(request, "Raw Articles vectorized successfully.", messages.SUCCESS)
-            else:
-                self.message_user(request, f"Vectorization failed: {result.stderr}", messages.ERROR)
+        from django.core.management import call_command
+        from django.core.management.base import CommandError
 
+        try:
+            call_command("vectorize", "classifier", "--workers", "1")
+            self.message_user(request, "Raw Articles vectorized successfully.", messages.SUCCESS)
+        except CommandError as e:
+            self.message_user(request, f"Vectorization failed: {e}", messages.ERROR)
         except Exception as e:
             self.message_user(request, f"Exception during vectorization: {e}", messages.ERROR)
 
         return HttpResponseRedirect("../")
 
+    def related_link(self, obj):
+        url = reverse("related_articles_api", args=[obj.id])
+        return format_html('<a href="{}" target="_blank">Related</a>', url)
+    related_link.short_description = "More like this"
+
+    def related_articles(self, obj):
+        # Precomputed by `manage.py related_articles`: one primary-key read
+        related = RelatedArticles.objects.filter(pk=obj.pk).first() if obj.pk else None
+        if related is None or not related.neighbours:
+            return "Not computed yet"
+        return format_html_join(
+            "",
+            '<div><a href="{}">{}</a> ({})</div>',
+            (
+                (reverse("admin:vtagent_rawarticle_change", args=[n["id"]]), n["title"], f"{n['similarity']:.3f}")
+                for n in related.neighbours
+            ),
+        )
+    related_articles.short_description = "Related articles"
+
 
 
 @admin.register(ClassifiedArticle)
@@ -0,0 +1,219 @@
+# embeddings.py
+
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from django.conf import settings
+
+
+def embedding_config():
+    config = {
+        "MODEL": "all-MiniLM-L6-v2",
+        "QUANTIZE": None,
+        "ONNX_FILE": None,
+        "BATCH_SIZE": 256,
+        "CACHE": None,
+        "QUERY_CACHE_SIZE": 1024,
+    }
+    config.update(getattr(settings, "EMBEDDINGS", {}))
+    return config
+
+
+# --- Model (loaded once per process) ---
+
+_models = {}
+_models_lock = threading.Lock()
+
+
+def _load_model(model_name, quantize, onnx_file):
+    from sentence_transformers import SentenceTransformer
+
+    if quantize == "onnx":
+        # Needs optimum[onnxruntime]; ONNX_FILE picks a pre-quantized export, e.g. "onnx/model_qint8_avx2.onnx"
+        model_kwargs = {"file_name": onnx_file} if onnx_file else None
+        return SentenceTransformer(model_name, device="cpu", backend="onnx", model_kwargs=model_kwargs)
+
+    model = SentenceTransformer(model_name, device="cpu")
+    if quantize == "int8":
+        import torch
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    elif quantize:
+        raise ValueError(f"Unknown embedding quantization {quantize!r}")
+    return model
+
+
+def get_model(model_name, quantize=None, onnx_file=None):
+    key = (model_name, quantize, onnx_file)
+    if key not in _models:
+        with _models_lock:
+            if key not in _models:
+                _models[key] = _load_model(model_name, quantize, onnx_file)
+    return _models[key]
+
+
+# --- Persistent embedding cache ---
+
+class EmbeddingCache:
+    """
+    SQLite file of float32 embeddings keyed by sha256(model version, text),
+    shared by every worker and vectorization run on the host. Unchanged
+    records are never re-encoded, whichever source they belong to.
+    """
+
+    LOOKUP_CHUNK = 500
+
+    def __init__(self, location):
+        self.location = str(location)
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(self.location) or ".", exist_ok=True)
+        with self._connection() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS embedding_cache (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.location, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get_many(self, keys):
+        found = {}
+        conn = self._connection()
+        for start in range(0, len(keys), self.LOOKUP_CHUNK):
+            chunk = keys[start:start + self.LOOKUP_CHUNK]
+            placeholders = ", ".join("?" * len(chunk))
+            for key, blob in conn.execute(f"SELECT key, vector FROM embedding_cache WHERE key IN ({placeholders})", chunk):
+                found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def set_many(self, items):
+        with self._connection() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embedding_cache (key, vector) VALUES (?, ?)",
+                ((key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in items),
+            )
+
+    def __len__(self):
+        return self._connection().execute("SELECT COUNT(*) FROM embedding_cache").fetchone()[0]
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_embedding_cache(location):
+    with _caches_lock:
+        if location not in _caches:
+            _caches[location] = EmbeddingCache(location)
+        return _caches[location]
+
+
+# --- Encoder ---
+
+_query_cache = OrderedDict()
+_query_lock = threading.Lock()
+
+
+class SentenceEmbedder:
+    """
+    Dense stand-in for a fitted TF-IDF vectorizer: transform() returns
+    L2-normalised float32 sentence embeddings (so L2 search ranks by cosine
+    similarity). Only the configuration is pickled with the index; the
+    model itself is the process-wide singleton from get_model().
+
+    Documents are encoded in batches of `batch_size` through the persistent
+    cache; queries go through encode_queries() and a per-process LRU.
+    """
+
+    def __init__(self, model_name=None, quantize=None, onnx_file=None, batch_size=None):
+        config = embedding_config()
+        self.model_name = model_name or config["MODEL"]
+        self.quantize = quantize if quantize is not None else config["QUANTIZE"]
+        self.onnx_file = onnx_file or config["ONNX_FILE"]
+        self.batch_size = batch_size or config["BATCH_SIZE"]
+
+    @property
+    def version(self):
+        """Identifies the vectors this model produces; part of every cache key."""
+        return f"{self.model_name}|{self.quantize or 'fp32'}|{self.onnx_file or ''}|normalized"
+
+    @property
+    def model(self):
+        return get_model(self.model_name, self.quantize, self.onnx_file)
+
+    def _encode(self, texts):
+        vectors = self.model.encode(
+            list(texts), batch_size=self.batch_size, convert_to_numpy=True,
+            normalize_embeddings=True, show_progress_bar=False,
+        )
+        return np.asarray(vectors, dtype=np.float32)
+
+    def cache_key(self, text):
+        return hashlib.sha256(f"{self.version}\x1f{text}".encode("utf-8")).hexdigest()
+
+    def transform(self, texts):
+        texts = list(texts)
+        location = embedding_config()["CACHE"]
+        cache = get_embedding_cache(location) if location else None
+        keys = [self.cache_key(text) for text in texts]
+        cached = cache.get_many(list(set(keys))) if cache is not None else {}
+
+        missing = list(dict.fromkeys(key for key in keys if key not in cached))
+        if missing:
+            text_of = dict(zip(keys, texts))
+            fresh = {}
+            for start in range(0, len(missing), self.batch_size * 16):
+                chunk = missing[start:start + self.batch_size * 16]
+                vectors = self._encode(text_of[key] for key in chunk)
+                fresh.update(zip(chunk, vectors))
+                if cache is not None:
+                    cache.set_many(zip(chunk, vectors))  # Persist as we go so an interrupted run resumes
+            cached.update(fresh)
+
+        if not texts:
+            return np.empty((0, self.dimension), dtype=np.float32)
+        return np.vstack([cached[key] for key in keys])
+
+    def fit_transform(self, texts):
+        # Nothing to fit: the model is pretrained
+        return self.transform(texts)
+
+    def fit(self, texts=None):
+        return self
+
+    @property
+    def dimension(self):
+        return self.model.get_sentence_embedding_dimension()
+
+    def encode_queries(self, texts):
+        """
+        Query embeddings, memoised per process for the last QUERY_CACHE_SIZE
+        distinct (model version, query) pairs across every index and reload.
+        """
+        size = embedding_config()["QUERY_CACHE_SIZE"]
+        keys = [(self.version, text) for text in texts]
+        vectors = [None] * len(texts)
+        with _query_lock:
+            for position, key in enumerate(keys):
+                if key in _query_cache:
+                    _query_cache.move_to_end(key)
+                    vectors[position] = _query_cache[key]
+        missing = [position for position, vector in enumerate(vectors) if vector is None]
+        if missing:
+            encoded = self._encode(texts[position] for position in missing)
+            with _query_lock:
+                for position, vector in zip(missing, encoded):
+                    vectors[position] = vector
+                    _query_cache[keys[position]] = vector
+                while len(_query_cache) > size:
+                    _query_cache.popitem(last=False)
+        return np.vstack(vectors)
+
+
+def is_embedder(vectorizer):
+    return isinstance(vectorizer, SentenceEmbedder)
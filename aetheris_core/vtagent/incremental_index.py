@@ -0,0 +1,213 @@
+# incremental_index.py
+
+import hashlib
+import os
+import pickle
+import shutil
+import time
+
+from django.db.models import Max
+
+from vtagent.index_artifacts import (
+    INDEX_FILES, add_to_index, artifact_paths, new_version, publish_version, read_index, record_watermark,
+    remove_from_index, supports_removal, write_index, write_index_artifacts, write_pickle,
+)
+from vtagent.models import RawArticle
+from vtagent.record_store import read_ids, read_texts, resolve_artifact, write_ids, write_texts
+
+
+STATE_FILE = "state.pkl"
+
+
+def content_hash(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def vocabulary_coverage(vectorizer, texts):
+    """(tokens, out-of-vocabulary tokens) of `texts` under a fitted TF-IDF vectorizer."""
+    if not hasattr(vectorizer, "vocabulary_"):
+        return 0, 0  # Sentence embeddings have no vocabulary to drift from
+    analyze = vectorizer.build_analyzer()
+    vocabulary = vectorizer.vocabulary_
+    tokens = oov = 0
+    for text in texts:
+        for token in analyze(text):
+            tokens += 1
+            oov += token not in vocabulary
+    return tokens, oov
+
+
+def _articles():
+    return RawArticle.canonical.exclude(content__isnull=True).exclude(content__exact="")
+
+
+class ArticleIndexUpdater:
+    """
+    Keeps the articles index in step with RawArticle without refitting it.
+
+    Every vector lives in a slot: its position in id_map/texts and its id in
+    the index (a FAISS IndexIDMap2, or the row of the sparse index). Slots
+    are never renumbered: removing an article frees its slot (id_map entry
+    becomes None) and new or changed articles are appended. A state file
+    records, per indexed article, the hash of its content, plus the
+    vocabulary statistics used to decide when a full rebuild is due.
+    Changes are found by hashing the current content, so an edit is picked
+    up whatever its length.
+
+    Both full and incremental runs publish a new version of `source` (see
+    vtagent.index_artifacts); an update starts from the published one and
+    never modifies its index files.
+    """
+
+    def __init__(self, source, backend, vectorizer_factory, drift_threshold=0.1, max_growth=0.5, index_config=None):
+        self.source = source
+        self.backend = backend
+        self.index_config = index_config
+        self.vectorizer_factory = vectorizer_factory
+        self.drift_threshold = drift_threshold
+        self.max_growth = max_growth
+
+    def current_paths(self):
+        """Artifacts of the published build, including its state file."""
+        paths = artifact_paths(self.source)
+        paths["state"] = os.path.join(os.path.dirname(paths["id_map"]), STATE_FILE)
+        return paths
+
+    def snapshot(self):
+        """(start time, newest scraped_at) of a run, taken before any article is read."""
+        latest = _articles().aggregate(latest=Max("scraped_at"))["latest"]
+        return time.time(), latest.isoformat() if latest else None
+
+    def publish(self, version, staging, ids, snapshot):
+        started, scraped_at = snapshot
+        watermark = dict(record_watermark(ids), scraped_at=scraped_at)
+        return publish_version(self.source, version, staging, self.backend, len(ids), started, watermark)
+
+    # --- Full build ---
+
+    def rebuild(self, reason="requested"):
+        snapshot = self.snapshot()
+        ids, texts, indexed = [], [], {}
+        for article_id, content in _articles().values_list("id", "content").iterator(chunk_size=2000):
+            text = content.strip()
+            ids.append(article_id)
+            texts.append(text)
+            indexed[article_id] = content_hash(text)
+
+        vectorizer = self.vectorizer_factory()
+        matrix = vectorizer.fit_transform(texts)
+        version, staging = new_version(self.source)
+        write_index_artifacts(
+            staging, matrix, ids, texts, vectorizer,
+            backend=self.backend, id_mapped=True, index_config=self.index_config,
+        )
+
+        tokens, oov = vocabulary_coverage(vectorizer, texts)
+        state = {
+            "indexed": indexed,
+            "fitted_docs": len(ids),
+            "baseline_oov": oov / tokens if tokens else 0.0,
+            "added_docs": 0,
+            "added_tokens": 0,
+            "added_oov": 0,
+        }
+        write_pickle(state, os.path.join(staging, STATE_FILE))
+        paths = self.publish(version, staging, ids, snapshot)
+        return {"mode": "full", "reason": reason, "indexed": len(ids), "added": len(ids), "removed": 0, "version": version, "paths": paths}
+
+    # --- Incremental update ---
+
+    def _load(self, paths):
+        with open(paths["state"], "rb") as f:
+            state = pickle.load(f)
+        id_map = list(read_ids(paths["id_map"]))
+        texts = list(read_texts(paths["texts"]))
+        with open(paths["vectorizer"], "rb") as f:
+            vectorizer = pickle.load(f)
+        return state, id_map, texts, vectorizer, read_index(paths["index"], self.backend, self.index_config)
+
+    def drift(self, state):
+        """How much worse the vocabulary covers articles added since the last fit than the fitted corpus."""
+        if not state["added_tokens"]:
+            return 0.0
+        return state["added_oov"] / state["added_tokens"] - state["baseline_oov"]
+
+    def update(self, full=False):
+        if full:
+            return self.rebuild()
+        paths = self.current_paths()
+        if not all(os.path.exists(resolve_artifact(path)) for path in paths.values()):
+            return self.rebuild("no incremental state")
+        if not paths["index"].endswith(INDEX_FILES[self.backend]):
+            return self.rebuild("backend changed")
+
+        snapshot = self.snapshot()
+        state, id_map, texts, vectorizer, index = self._load(paths)
+        indexed = state["indexed"]
+
+        # Every article is hashed as it streams past; only the texts of new or changed ones are kept
+        current, changed, fresh = set(), [], {}
+        for article_id, content in _articles().values_list("id", "content").iterator(chunk_size=2000):
+            current.add(article_id)
+            text = content.strip()
+            digest = content_hash(text)
+            if indexed.get(article_id) == digest:
+                continue  # Unchanged, or a whitespace-only edit
+            if article_id in indexed:
+                changed.append(article_id)
+            fresh[article_id] = (text, digest)
+        removed = [article_id for article_id in indexed if article_id not in current]
+
+        if not removed and not fresh:
+            # Nothing to publish; the published version, state file included, is left untouched
+            return {"mode": "incremental", "indexed": len(indexed), "added": 0, "removed": 0, "paths": paths}
+
+        # Decide whether the fitted vocabulary and idf weights still describe the corpus
+        tokens, oov = vocabulary_coverage(vectorizer, [text for text, _ in fresh.values()])
+        state["added_docs"] += len(fresh)
+        state["added_tokens"] += tokens
+        state["added_oov"] += oov
+        if self.drift(state) > self.drift_threshold:
+            return self.rebuild(f"vocabulary drift {self.drift(state):.2f}")
+        if state["added_docs"] > self.max_growth * max(state["fitted_docs"], 1):
+            return self.rebuild(f"{state['added_docs']} articles added since the last fit")
+
+        # Free the slots of deleted and changed articles
+        slot_of = {article_id: slot for slot, article_id in enumerate(id_map) if article_id is not None}
+        stale_slots = [slot_of[article_id] for article_id in removed + changed if article_id in slot_of]
+        if stale_slots and self.backend == "faiss" and not supports_removal(self.index_config):
+            return self.rebuild("index type cannot remove vectors")
+        if stale_slots:
+            remove_from_index(index, stale_slots, self.backend)
+            for slot in stale_slots:
+                id_map[slot] = None
+                texts[slot] = None
+        for article_id in removed:
+            del indexed[article_id]
+
+        # Append new and changed articles in fresh slots, encoded with the existing vectorizer
+        if fresh:
+            new_ids = list(fresh)
+            new_slots = list(range(len(id_map), len(id_map) + len(new_ids)))
+            add_to_index(index, vectorizer.transform([fresh[a][0] for a in new_ids]), new_slots, self.backend)
+            for article_id in new_ids:
+                text, digest = fresh[article_id]
+                id_map.append(article_id)
+                texts.append(text)
+                indexed[article_id] = digest
+
+        version, staging = new_version(self.source)
+        write_index(index, os.path.join(staging, INDEX_FILES[self.backend]), self.backend)
+        write_texts(texts, os.path.join(staging, "texts.bin"))
+        write_ids(id_map, os.path.join(staging, "ids.npy"))
+        shutil.copyfile(paths["vectorizer"], os.path.join(staging, "vectorizer.pkl"))
+        write_pickle(state, os.path.join(staging, STATE_FILE))
+        return {
+            "mode": "incremental",
+            "indexed": len(indexed),
+            "added": len(fresh) - len(changed),
+            "changed": len(changed),
+            "removed": len(removed),
+            "version": version,
+            "paths": self.publish(version, staging, id_map, snapshot),
+        }
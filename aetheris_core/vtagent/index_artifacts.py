@@ -0,0 +1,468 @@
+# index_artifacts.py
+
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import time
+from datetime import datetime, timezone
+
+import faiss
+import numpy as np
+import scipy.sparse as sp
+from django.conf import settings
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from vtagent.record_store import write_ids, write_texts
+from vtagent.sparse_index import SparseCosineIndex, read_sparse_index, write_sparse_index
+
+
+# File holding the searchable index for each retrieval backend
+INDEX_FILES = {
+    "faiss": "index.index",
+    "sparse": "matrix.npz",
+}
+
+# Artifact layout per data source: (directory under settings.FAISS_ROOT, file prefix)
+SOURCES = {
+    "articles": ("articles", ""),
+    "cmdb": ("cmdb", ""),
+    "ad": ("ad", ""),
+    "employees": ("employees", ""),
+    "siem_logs": ("logs", "siem_logs."),
+    "xdr_logs": ("logs", "xdr_logs."),
+    "ids_logs": ("logs", "ids_logs."),
+    "firewall_logs": ("logs", "firewall_logs."),
+    "edr_logs": ("logs", "edr_logs."),
+    "hids_logs": ("logs", "hids_logs."),
+    "application_logs": ("logs", "application_logs."),
+}
+
+
+def vector_backend(source):
+    """Retrieval backend configured for `source` ("faiss" or "sparse")."""
+    backends = getattr(settings, "VECTOR_BACKENDS", {})
+    backend = backends.get(source, backends.get("default", "faiss"))
+    if backend not in INDEX_FILES:
+        raise ValueError(f"Unknown vector backend {backend!r} for {source}")
+    return backend
+
+
+def source_location(source):
+    """(artifact directory, file prefix) of `source`."""
+    if source not in SOURCES:
+        raise ValueError(f"No vector index configured for {source}")
+    directory, prefix = SOURCES[source]
+    return os.path.join(settings.FAISS_ROOT, directory), prefix
+
+
+def _paths(directory, prefix, backend):
+    return {
+        "index": os.path.join(directory, f"{prefix}{INDEX_FILES[backend]}"),
+        "id_map": os.path.join(directory, f"{prefix}ids.npy"),
+        "texts": os.path.join(directory, f"{prefix}texts.bin"),
+        "vectorizer": os.path.join(directory, f"{prefix}vectorizer.pkl"),
+    }
+
+
+def artifact_paths(source, version=None):
+    """
+    Return the on-disk paths of every artifact belonging to `source`: those
+    of `version`, by default the published one, or of the unversioned
+    layout written before builds were versioned.
+    """
+    version = version or current_version(source)
+    if version is None:
+        base, prefix = source_location(source)
+        return _paths(base, prefix, vector_backend(source))
+    directory = version_dir(source, version)
+    paths = _paths(directory, "", read_manifest(directory)["backend"])
+    paths["manifest"] = os.path.join(directory, MANIFEST_FILE)
+    return paths
+
+
+# --- Versioned builds ---
+#
+# Every build is written to its own directory, FAISS_ROOT/<dir>/<prefix>versions/<version>/,
+# next to a manifest.json describing it, and published by atomically replacing the
+# <prefix>CURRENT pointer file with the version name. Readers resolve the pointer once and
+# then only read that directory, which is never modified afterwards, so an index can never be
+# paired with another build's id map. Old versions are removed by gc_versions().
+
+MANIFEST_FILE = "manifest.json"
+POINTER_FILE = "CURRENT"
+STAGING_SUFFIX = ".tmp"
+# Staging directories this old belong to builds that died before publishing
+STALE_STAGING_SECONDS = 24 * 3600
+
+
+def versions_root(source):
+    base, prefix = source_location(source)
+    return os.path.join(base, f"{prefix}versions")
+
+
+def version_dir(source, version):
+    return os.path.join(versions_root(source), version)
+
+
+def pointer_path(source):
+    base, prefix = source_location(source)
+    return os.path.join(base, f"{prefix}{POINTER_FILE}")
+
+
+def current_version(source):
+    """Name of the published version of `source`, or None if it has never been built with versions."""
+    try:
+        with open(pointer_path(source), "r") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def list_versions(source):
+    """Published versions of `source`, oldest first."""
+    root = versions_root(source)
+    if not os.path.isdir(root):
+        return []
+    return sorted(
+        name for name in os.listdir(root)
+        if not name.endswith(STAGING_SUFFIX) and os.path.exists(os.path.join(root, name, MANIFEST_FILE))
+    )
+
+
+def read_manifest(directory):
+    with open(os.path.join(directory, MANIFEST_FILE), "r") as f:
+        return json.load(f)
+
+
+def new_version(source):
+    """(version, staging directory) for a new build; write its artifacts there, then publish_version()."""
+    # UTC timestamps sort in build order
+    version = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    staging = version_dir(source, version) + STAGING_SUFFIX
+    os.makedirs(staging)
+    return version, staging
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def record_watermark(ids):
+    """
+    How far into its source a build got: the number of records and the
+    highest record id, per record type for "Type:N" ids.
+    """
+    watermark = {"records": 0}
+    highest = {}
+    for record_id in ids:
+        if record_id is None:
+            continue
+        watermark["records"] += 1
+        if isinstance(record_id, str):
+            kind, _, number = record_id.rpartition(":")
+            if number.isdigit():
+                highest[kind] = max(highest.get(kind, -1), int(number))
+        else:
+            highest[""] = max(highest.get("", -1), int(record_id))
+    if set(highest) == {""}:
+        watermark["max_id"] = highest[""]
+    elif highest:
+        watermark["max_ids"] = highest
+    return watermark
+
+
+def publish_version(source, version, staging, backend, rows, started, watermark=None, **extra):
+    """
+    Write the manifest of the build in `staging`, move it into place and
+    point CURRENT at it; returns the artifact paths of the published build.
+    `started` is the time.time() at which the build began.
+    """
+    manifest = {
+        "source": source,
+        "version": version,
+        "backend": backend,
+        "encoder": vector_encoder(source),
+        "index_config": faiss_index_config(source) if backend == "faiss" else None,
+        "rows": rows,
+        "vectorizer_sha256": file_sha256(os.path.join(staging, "vectorizer.pkl")),
+        "built_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "build_seconds": round(time.time() - started, 3),
+        "watermark": watermark or {},
+    }
+    manifest.update(extra)
+    with open(os.path.join(staging, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.rename(staging, version_dir(source, version))
+    activate_version(source, version)
+    gc_versions(source)
+    return artifact_paths(source, version)
+
+
+def activate_version(source, version):
+    """Atomically point CURRENT at a published version (also used to roll back)."""
+    if version not in list_versions(source):
+        raise ValueError(f"{source} has no published version {version}")
+
+    def write(tmp_path):
+        with open(tmp_path, "w") as f:
+            f.write(version)
+    replace_file(pointer_path(source), write)
+
+
+def gc_versions(source, keep=None):
+    """
+    Delete all but the `keep` (settings.INDEX_VERSIONS["KEEP"]) newest
+    versions, never the current one, plus abandoned staging directories.
+    Processes still holding a removed version keep their open files
+    and mappings. Returns the removed version names.
+    """
+    keep = settings.INDEX_VERSIONS["KEEP"] if keep is None else keep
+    current = current_version(source)
+    versions = list_versions(source)
+    removed = [version for version in versions[:max(len(versions) - keep, 0)] if version != current]
+    for version in removed:
+        shutil.rmtree(version_dir(source, version), ignore_errors=True)
+
+    root = versions_root(source)
+    for name in os.listdir(root) if os.path.isdir(root) else []:
+        path = os.path.join(root, name)
+        if name.endswith(STAGING_SUFFIX) and time.time() - os.path.getmtime(path) > STALE_STAGING_SECONDS:
+            shutil.rmtree(path, ignore_errors=True)
+    return removed
+
+
+# How record text becomes vectors: TF-IDF ("tfidf") or sentence embeddings ("sentence", see vtagent.embeddings)
+VECTOR_ENCODERS = ("tfidf", "sentence")
+
+
+def vector_encoder(source):
+    """Vector encoder configured for `source` ("tfidf" or "sentence")."""
+    encoders = getattr(settings, "VECTOR_ENCODERS", {})
+    encoder = encoders.get(source, encoders.get("default", "tfidf"))
+    if encoder not in VECTOR_ENCODERS:
+        raise ValueError(f"Unknown vector encoder {encoder!r} for {source}")
+    if encoder == "sentence" and vector_backend(source) == "sparse":
+        raise ValueError(f"Sentence embeddings are dense; {source} needs the faiss backend")
+    return encoder
+
+
+def make_vectorizer(source, max_features=None):
+    """Unfitted vectorizer for `source`: a TfidfVectorizer or a SentenceEmbedder."""
+    if vector_encoder(source) == "sentence":
+        from vtagent.embeddings import SentenceEmbedder
+        return SentenceEmbedder()
+    return TfidfVectorizer(max_features=max_features)
+
+
+def as_dense(matrix):
+    """float32 rows for FAISS from a sparse TF-IDF matrix or dense embeddings."""
+    rows = matrix.toarray() if sp.issparse(matrix) else np.asarray(matrix)
+    return rows.astype(np.float32, copy=False)
+
+
+def row_norms(matrix):
+    """L2 norm of every row of a sparse or dense matrix."""
+    if sp.issparse(matrix):
+        return np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    return np.linalg.norm(np.asarray(matrix), axis=1)
+
+
+# FAISS index structures; see settings.FAISS_INDEXES
+FAISS_INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw")
+
+
+def faiss_index_config(source):
+    """FAISS index structure configured for `source`, e.g. {"TYPE": "hnsw", "M": 32, ...}."""
+    configs = getattr(settings, "FAISS_INDEXES", {})
+    config = dict(configs.get(source, configs.get("default", {"TYPE": "flat"})))
+    if config.get("TYPE", "flat") not in FAISS_INDEX_TYPES:
+        raise ValueError(f"Unknown FAISS index type {config['TYPE']!r} for {source}")
+    return config
+
+
+def supports_removal(config):
+    # HNSW graphs cannot drop vectors; every other structure supports remove_ids
+    return (config or {}).get("TYPE", "flat") != "hnsw"
+
+
+# Rows IVF structures are trained on when config["TRAIN_SAMPLE"] is not set
+DEFAULT_TRAIN_SAMPLE = 50000
+# FAISS k-means wants ~39 training points per centroid
+POINTS_PER_CENTROID = 39
+
+
+def training_rows(config, n_rows):
+    """Rows an IVF structure over `n_rows` vectors is trained on."""
+    return min(n_rows, (config or {}).get("TRAIN_SAMPLE", DEFAULT_TRAIN_SAMPLE))
+
+
+def _ivf_lists(config, n_rows):
+    nlist = config.get("NLIST") or int(4 * np.sqrt(n_rows))
+    # The coarse quantizer's k-means only sees the training sample
+    return int(max(1, min(nlist, training_rows(config, n_rows) // POINTS_PER_CENTROID)))
+
+
+def _pq_shape(config, dimension, n_rows):
+    m = config.get("M", 16)
+    while dimension % m:
+        m -= 1  # Sub-quantizers must evenly split the vector
+    # Each sub-quantizer fits 2^nbits centroids on the training sample
+    trainable = np.floor(np.log2(max(training_rows(config, n_rows) / POINTS_PER_CENTROID, 2)))
+    nbits = int(min(config.get("NBITS", 8), max(1, trainable)))
+    return m, nbits
+
+
+def create_faiss_index(dimension, n_rows, config=None):
+    """Empty (possibly untrained) FAISS index of the configured structure."""
+    config = config or {"TYPE": "flat"}
+    index_type = config.get("TYPE", "flat")
+    if index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dimension, config.get("M", 32))
+        index.hnsw.efConstruction = config.get("EF_CONSTRUCTION", 80)
+        return index
+    if index_type in ("ivf_flat", "ivf_pq"):
+        quantizer = faiss.IndexFlatL2(dimension)
+        nlist = _ivf_lists(config, n_rows)
+        if index_type == "ivf_pq":
+            m, nbits = _pq_shape(config, dimension, n_rows)
+            return faiss.IndexIVFPQ(quantizer, dimension, nlist, m, nbits)
+        return faiss.IndexIVFFlat(quantizer, dimension, nlist)
+    return faiss.IndexFlatL2(dimension)
+
+
+def configure_search(index, config=None):
+    """Apply the query-time knobs (IVF nprobe, HNSW efSearch) of `config` to a built or loaded index."""
+    config = config or {}
+    inner = faiss.downcast_index(index.index) if isinstance(index, faiss.IndexIDMap) else index
+    if isinstance(inner, faiss.IndexIVF):
+        inner.nprobe = min(config.get("NPROBE", 8), inner.nlist)
+    elif isinstance(inner, faiss.IndexHNSW):
+        inner.hnsw.efSearch = config.get("EF_SEARCH", 64)
+    return index
+
+
+def build_index(matrix, backend, id_mapped=False, config=None):
+    """
+    Build a searchable index from a sparse TF-IDF matrix (or dense
+    embeddings, FAISS only). `config` selects
+    the FAISS structure (see faiss_index_config); IVF structures are trained
+    on a random sample of at most config["TRAIN_SAMPLE"] rows. With
+    id_mapped=True the FAISS index is an IndexIDMap2 whose ids are the row
+    positions, so rows can later be removed without renumbering the others.
+    """
+    if backend == "sparse":
+        return SparseCosineIndex(matrix)
+    vectors = as_dense(matrix)
+    index = create_faiss_index(vectors.shape[1], vectors.shape[0], config)
+    if not index.is_trained:
+        sample_size = training_rows(config, vectors.shape[0])
+        sample = np.random.default_rng(0).choice(vectors.shape[0], sample_size, replace=False)
+        index.train(vectors[np.sort(sample)])
+    configure_search(index, config)
+    if id_mapped:
+        index = faiss.IndexIDMap2(index)
+        index.add_with_ids(vectors, np.arange(vectors.shape[0], dtype=np.int64))
+    else:
+        index.add(vectors)
+    return index
+
+
+def add_to_index(index, matrix, positions, backend):
+    """Append rows for `positions` (always the next free ones) to an index from build_index(id_mapped=True)."""
+    if backend == "sparse":
+        index.add(matrix)
+    else:
+        index.add_with_ids(as_dense(matrix), np.asarray(positions, dtype=np.int64))
+
+
+def remove_from_index(index, positions, backend):
+    """Remove rows; the positions of the remaining rows are unchanged."""
+    positions = np.asarray(positions, dtype=np.int64)
+    if backend == "sparse":
+        index.remove_ids(positions)
+    else:
+        index.remove_ids(faiss.IDSelectorBatch(positions))
+
+
+def search_index(index, queries, k, backend, allowed=None):
+    """
+    Top-`k` search, optionally restricted to the `allowed` positions so that
+    the best k among matching documents are returned rather than filtering
+    a global top-k afterwards.
+    """
+    if allowed is None:
+        return index.search(queries, k)
+    allowed = np.asarray(allowed, dtype=np.int64)
+    if backend == "sparse":
+        return index.search(queries, k, allowed=allowed)
+    selector = faiss.IDSelectorBatch(allowed)
+    return index.search(queries, k, params=_search_parameters(index, selector))
+
+
+def _search_parameters(index, selector):
+    """
+    Search parameters carrying `selector`. IVF and HNSW indexes reject the
+    generic SearchParameters and fall back to their defaults for any knob
+    left unset, so the index's own nprobe / efSearch are passed along.
+    """
+    inner = faiss.downcast_index(index.index) if isinstance(index, faiss.IndexIDMap) else index
+    if isinstance(inner, faiss.IndexIVF):
+        return faiss.SearchParametersIVF(sel=selector, nprobe=inner.nprobe)
+    if isinstance(inner, faiss.IndexHNSW):
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=inner.hnsw.efSearch)
+    return faiss.SearchParameters(sel=selector)
+
+
+def write_index(index, path, backend):
+    if backend == "sparse":
+        write_sparse_index(index, path)
+    else:
+        faiss.write_index(index, path)
+
+
+def replace_file(path, write):
+    """Write `path` through a temporary file so readers never see a partial artifact."""
+    tmp_path = f"{path}.tmp{os.path.splitext(path)[1]}"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def write_pickle(obj, path):
+    def write(tmp_path):
+        with open(tmp_path, "wb") as f:
+            pickle.dump(obj, f)
+    replace_file(path, write)
+
+
+def read_index(path, backend, config=None):
+    if backend == "sparse":
+        return read_sparse_index(path)
+    return configure_search(faiss.read_index(path), config)
+
+
+def write_index_artifacts(output_dir, matrix, ids, texts, vectorizer, backend="faiss", prefix="", id_mapped=False, index_config=None):
+    """
+    Build the index for `matrix` and persist it next to its id map, texts
+    and vectorizer. Ids and texts use the memory-mapped formats of
+    vtagent.record_store; the id map is written last.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    paths = {
+        "index": os.path.join(output_dir, f"{prefix}{INDEX_FILES[backend]}"),
+        "id_map": os.path.join(output_dir, f"{prefix}ids.npy"),
+        "vectorizer": os.path.join(output_dir, f"{prefix}vectorizer.pkl"),
+        "texts": os.path.join(output_dir, f"{prefix}texts.bin"),
+    }
+
+    index = build_index(matrix, backend, id_mapped=id_mapped, config=index_config)
+    replace_file(paths["index"], lambda path: write_index(index, path, backend))
+    write_texts(texts, paths["texts"])
+    write_pickle(vectorizer, paths["vectorizer"])
+    write_ids(ids, paths["id_map"])
+    return paths
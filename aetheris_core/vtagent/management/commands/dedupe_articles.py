@@ -0,0 +1,21 @@
+# dedupe_articles.py
+
+from django.core.management.base import BaseCommand
+
+from vtagent.models import ArticleFingerprint, RawArticle
+from vtagent.near_duplicates import deduplicate_existing
+
+
+class Command(BaseCommand):
+    help = "Fingerprint articles crawled before near-duplicate detection and link syndicated copies to the earliest one"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500)
+        parser.add_argument("--reset", action="store_true", help="Drop every fingerprint and duplicate link first")
+
+    def handle(self, *args, **options):
+        if options["reset"]:
+            ArticleFingerprint.objects.all().delete()
+            RawArticle.objects.exclude(duplicate_of__isnull=True).update(duplicate_of=None)
+        fingerprinted, linked = deduplicate_existing(chunk_size=options["chunk_size"])
+        self.stdout.write(f"[✓] Fingerprinted {fingerprinted} articles, linked {linked} near-duplicates")
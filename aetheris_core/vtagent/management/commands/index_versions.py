@@ -0,0 +1,57 @@
+# index_versions.py
+
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from vtagent.index_artifacts import (
+    SOURCES, activate_version, current_version, gc_versions, list_versions, read_manifest, version_dir,
+)
+
+
+class Command(BaseCommand):
+    help = "List the published index versions of each source, garbage-collect old ones or roll back"
+
+    def add_arguments(self, parser):
+        parser.add_argument("sources", nargs="*", help=f"Sources (default: all). Choices: {', '.join(SOURCES)}")
+        parser.add_argument("--gc", action="store_true", help="Delete all but the newest --keep versions")
+        parser.add_argument("--keep", type=int, help="Versions to retain with --gc (default: INDEX_VERSIONS['KEEP'])")
+        parser.add_argument("--activate", metavar="VERSION", help="Point the (single) source at an older published version")
+
+    def handle(self, *args, **options):
+        sources = options["sources"] or list(SOURCES)
+        unknown = [source for source in sources if source not in SOURCES]
+        if unknown:
+            raise CommandError(f"Unknown sources: {', '.join(unknown)}")
+
+        if options["activate"]:
+            if len(sources) != 1:
+                raise CommandError("--activate needs exactly one source")
+            try:
+                activate_version(sources[0], options["activate"])
+            except ValueError as e:
+                raise CommandError(str(e))
+            self.stdout.write(f"[✓] {sources[0]} now serves version {options['activate']}")
+            return
+
+        for source in sources:
+            if options["gc"]:
+                removed = gc_versions(source, keep=options["keep"])
+                if removed:
+                    self.stdout.write(f"[✓] {source}: removed {len(removed)} old version(s)")
+
+            versions = list_versions(source)
+            if not versions:
+                self.stdout.write(f"[!] {source}: no published versions")
+                continue
+            current = current_version(source)
+            self.stdout.write(f"{source}:")
+            for version in reversed(versions):
+                manifest = read_manifest(version_dir(source, version))
+                marker = "*" if version == current else " "
+                size = sum(entry.stat().st_size for entry in os.scandir(version_dir(source, version)))
+                self.stdout.write(
+                    f"  {marker} {version}  {manifest['rows']} rows  {manifest['backend']}/{manifest['encoder']}  "
+                    f"built {manifest['built_at']} in {manifest['build_seconds']:.1f}s  {size / 1e6:.1f} MB  "
+                    f"watermark {manifest['watermark']}"
+                )
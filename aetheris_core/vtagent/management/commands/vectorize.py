@@ -0,0 +1,118 @@
+# vectorize.py
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from vtagent.index_artifacts import SOURCES
+from vtagent.vector_sources import VECTOR_SOURCES
+
+
+def _init_worker():
+    # Spawned workers start without Django; forked ones must not reuse the parent's connections
+    import django
+    django.setup()
+    connections.close_all()
+
+
+def _vectorize(name, options, score_anomalies=False):
+    started = time.perf_counter()
+    try:
+        result = VECTOR_SOURCES[name].vectorize(**options)
+        # Only sources published through index_artifacts have scores; the classifier matrix has none
+        if score_anomalies and result["indexed"] and name in SOURCES:
+            # Imported here: the scorer loads the llmintegration models and index registry
+            from llmintegration.anomaly_scores import score_source
+            result["anomalies"] = score_source(name)
+        if name == "articles" and result["indexed"] and settings.RELATED_ARTICLES["ON_VECTORIZE"]:
+            from llmintegration.related_articles import refresh_related_articles
+            result["related"] = refresh_related_articles()
+        if name == "articles" and result["indexed"] and settings.STORY_CLUSTERING["ON_VECTORIZE"]:
+            from llmintegration.story_clusters import refresh_story_clusters
+            result["stories"] = refresh_story_clusters()
+    finally:
+        connections.close_all()
+    return dict(result, seconds=time.perf_counter() - started)
+
+
+class Command(BaseCommand):
+    help = "Rebuild the vector index artifacts of one or more sources (or `all`), independent sources in parallel"
+
+    def add_arguments(self, parser):
+        parser.add_argument("sources", nargs="*", help="Source names or `all`; see --list")
+        parser.add_argument("--list", action="store_true", help="List the registered sources and exit")
+        parser.add_argument("--incremental", action="store_true", help="Articles only: encode just the articles added or changed since the last run")
+        parser.add_argument("--workers", type=int, default=settings.VECTORIZE["WORKERS"], help="Worker processes (1 runs in-process)")
+        parser.add_argument("--chunk-size", type=int, default=settings.VECTORIZE["CHUNK_SIZE"], help="Rows fetched per database round trip")
+        parser.add_argument("--score-anomalies", action="store_true", help="Refresh the cached anomaly scores of each indexed source once its new version is published")
+
+    def handle(self, *args, **options):
+        if options["list"]:
+            for name, source in VECTOR_SOURCES.items():
+                self.stdout.write(f"{name:<18} {type(source).__name__}")
+            return
+
+        names = list(VECTOR_SOURCES) if "all" in options["sources"] else options["sources"]
+        if not names:
+            raise CommandError("Name at least one source, or `all` (see --list)")
+        unknown = [name for name in names if name not in VECTOR_SOURCES]
+        if unknown:
+            raise CommandError(f"Unknown sources: {', '.join(unknown)} (see --list)")
+
+        job_options = {"chunk_size": options["chunk_size"], "incremental": options["incremental"]}
+        workers = max(1, min(options["workers"] or os.cpu_count() or 1, len(names)))
+        started = time.perf_counter()
+        failed = []
+
+        if workers == 1:
+            for name in names:
+                try:
+                    self.report(_vectorize(name, job_options, options["score_anomalies"]))
+                except Exception as e:
+                    failed.append(name)
+                    self.stderr.write(f"[✗] Failed to vectorize {name}: {e}")
+        else:
+            # Children must open their own database connections
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+                futures = {pool.submit(_vectorize, name, job_options, options["score_anomalies"]): name for name in names}
+                for future in as_completed(futures):
+                    try:
+                        self.report(future.result())
+                    except Exception as e:
+                        failed.append(futures[future])
+                        self.stderr.write(f"[✗] Failed to vectorize {futures[future]}: {e}")
+
+        self.stdout.write(f"[✓] {len(names) - len(failed)}/{len(names)} sources vectorized in {time.perf_counter() - started:.1f}s, {workers} worker process(es)")
+        if failed:
+            raise CommandError(f"Vectorization failed for: {', '.join(failed)}")
+
+    def report(self, result):
+        name, seconds = result["source"], result["seconds"]
+        if not result["indexed"]:
+            self.stdout.write(f"[!] {name}: {result.get('message', 'nothing indexed')}")
+            return
+        if result.get("mode") == "incremental":
+            self.stdout.write(
+                f"[✓] {name}: incremental update, +{result['added']} new, ~{result.get('changed', 0)} changed, "
+                f"-{result['removed']} removed ({result['indexed']} indexed) in {seconds:.1f}s"
+            )
+        else:
+            reason = f", {result['reason']}" if result.get("reason") else ""
+            self.stdout.write(f"[✓] {name}: vectorized {result['indexed']} records ({result['backend']} backend{reason}) in {seconds:.1f}s")
+        self.stdout.write(f"    Index stored at: {result['paths']['index']}")
+        if result.get("version"):
+            self.stdout.write(f"    Published version: {result['version']}")
+        if result.get("anomalies"):
+            anomalies = result["anomalies"]
+            self.stdout.write(f"    Anomaly scores: {anomalies['mode']}, {anomalies['scored']} scored, {anomalies['removed']} removed")
+        if result.get("related"):
+            related = result["related"]
+            self.stdout.write(f"    Related articles: {related['mode']}, {related['computed']} lists updated, {related['removed']} removed")
+        if result.get("stories"):
+            stories = result["stories"]
+            self.stdout.write(f"    Threat stories: {stories['mode']}, {stories['assigned']} articles assigned, {stories['clusters']} stories")
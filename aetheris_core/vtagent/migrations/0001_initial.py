@@ -0,0 +1,113 @@
+# Generated by Django 5.2 on 2026-10-18 06:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('syntheticad', '0001_initial'),
+        ('syntheticcmdb', '0001_initial'),
+        ('syntheticemployees', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClassifiedArticle',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField()),
+                ('title', models.TextField()),
+                ('source', models.CharField(max_length=255)),
+                ('published', models.CharField(blank=True, max_length=100)),
+                ('classification_source', models.CharField(choices=[('ml', 'Machine Learning'), ('gemini', 'Google Gemini'), ('openai', 'OpenAI')], max_length=10)),
+                ('VT_PrimaryType', models.JSONField(blank=True, default=list)),
+                ('VT_Subtype', models.JSONField(blank=True, default=list)),
+                ('Industry', models.JSONField(blank=True, default=list)),
+                ('Platform', models.JSONField(blank=True, default=list)),
+                ('Severity', models.JSONField(blank=True, default=list)),
+                ('Impact', models.JSONField(blank=True, default=list)),
+                ('Actor', models.JSONField(blank=True, default=list)),
+                ('Origin', models.JSONField(blank=True, default=list)),
+                ('Compliance', models.JSONField(blank=True, default=list)),
+                ('raw_content', models.TextField()),
+                ('processed_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='NewsSource',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('url', models.URLField(unique=True)),
+                ('category', models.CharField(choices=[('cybersecurity', 'Cybersecurity'), ('tech-news', 'Tech News'), ('gov', 'Government'), ('vendor', 'Vendor'), ('research', 'Research'), ('other', 'Other')], max_length=50)),
+                ('crawler_type', models.CharField(choices=[('scrapy', 'Scrapy'), ('bs4', 'BeautifulSoup')], default='scrapy', max_length=10)),
+                ('is_active', models.BooleanField(default=True)),
+                ('crawl_code', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RawArticle',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_type', models.CharField(choices=[('scrapy', 'Scrapy'), ('bs4', 'BeautifulSoup')], max_length=10)),
+                ('title', models.TextField()),
+                ('url', models.URLField(unique=True)),
+                ('published', models.CharField(blank=True, max_length=100)),
+                ('content', models.TextField()),
+                ('author', models.CharField(blank=True, max_length=255)),
+                ('tags', models.JSONField(blank=True, default=list)),
+                ('section', models.CharField(blank=True, max_length=255)),
+                ('scraped_at', models.DateTimeField(auto_now_add=True)),
+                ('errors', models.JSONField(blank=True, default=list)),
+                ('source', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='vtagent.newssource')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='GeneratedTaxonomyLabel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('record_id', models.CharField(blank=True, max_length=100, null=True)),
+                ('classification_source', models.CharField(blank=True, max_length=500)),
+                ('labels_generated_at', models.DateTimeField(auto_now_add=True)),
+                ('data_source', models.CharField(blank=True, max_length=500)),
+                ('data_origin', models.CharField(blank=True, max_length=500)),
+                ('platform', models.JSONField(blank=True, default=list, null=True)),
+                ('software', models.JSONField(blank=True, default=list, null=True)),
+                ('software_version', models.CharField(blank=True, max_length=500, null=True)),
+                ('hardware_vendor', models.CharField(blank=True, max_length=500, null=True)),
+                ('connectivity', models.CharField(blank=True, max_length=500, null=True)),
+                ('network_zone', models.CharField(blank=True, max_length=100, null=True)),
+                ('os', models.CharField(blank=True, max_length=500, null=True)),
+                ('os_version', models.CharField(blank=True, max_length=500, null=True)),
+                ('security_software', models.CharField(blank=True, max_length=500, null=True)),
+                ('ip_address', models.GenericIPAddressField(blank=True, null=True)),
+                ('country', models.CharField(blank=True, max_length=100, null=True)),
+                ('city', models.CharField(blank=True, max_length=100, null=True)),
+                ('business_unit', models.CharField(blank=True, max_length=100, null=True)),
+                ('department', models.CharField(blank=True, max_length=100, null=True)),
+                ('security_posture', models.CharField(blank=True, max_length=500, null=True)),
+                ('severity', models.JSONField(blank=True, default=list, null=True)),
+                ('impact', models.JSONField(blank=True, default=list, null=True)),
+                ('actor', models.JSONField(blank=True, default=list, null=True)),
+                ('origin', models.JSONField(blank=True, default=list, null=True)),
+                ('compliance', models.JSONField(blank=True, default=list, null=True)),
+                ('threat_stage', models.CharField(blank=True, max_length=500, null=True)),
+                ('initial_access_method', models.CharField(blank=True, max_length=500, null=True)),
+                ('payload_type', models.CharField(blank=True, max_length=500, null=True)),
+                ('mitre_tactics', models.JSONField(blank=True, default=list, null=True)),
+                ('impact_area', models.JSONField(blank=True, default=list, null=True)),
+                ('detection_vector', models.CharField(blank=True, max_length=500, null=True)),
+                ('reported_by', models.CharField(blank=True, max_length=500, null=True)),
+                ('response_action', models.TextField(blank=True, null=True)),
+                ('ad_user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='syntheticad.aduser')),
+                ('cmdb_item', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='syntheticcmdb.configurationitem')),
+                ('employee', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='syntheticemployees.employee')),
+                ('raw_article', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='vtagent.rawarticle')),
+            ],
+        ),
+    ]
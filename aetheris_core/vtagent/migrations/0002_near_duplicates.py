@@ -0,0 +1,35 @@
+# Generated by Django 5.2 on 2026-10-18 06:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vtagent', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rawarticle',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='vtagent.rawarticle'),
+        ),
+        migrations.CreateModel(
+            name='ArticleFingerprint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('signature', models.BinaryField()),
+                ('raw_article', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='fingerprint', to='vtagent.rawarticle')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArticleLSHBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.BigIntegerField(db_index=True)),
+                ('fingerprint', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='buckets', to='vtagent.articlefingerprint')),
+            ],
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2 on 2026-10-18 06:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('syntheticad', '0001_initial'),
+        ('syntheticcmdb', '0001_initial'),
+        ('syntheticemployees', '0001_initial'),
+        ('vtagent', '0002_near_duplicates'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='generatedtaxonomylabel',
+            index=models.Index(fields=['-labels_generated_at'], name='taxonomy_label_generated_at'),
+        ),
+    ]
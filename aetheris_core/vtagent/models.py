@@ -29,6 +29,13 @@ class NewsSource(models.Model):
         return self.name
 
 
+class CanonicalArticleManager(models.Manager):
+    """Articles that are not near-duplicates of an earlier one; what downstream processing should read."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(duplicate_of__isnull=True)
+
+
 class RawArticle(models.Model):
     SOURCE_TYPE_CHOICES = [
         ('scrapy', 'Scrapy'),
@@ -46,11 +53,28 @@ class RawArticle(models.Model):
     section = models.CharField(max_length=255, blank=True)
     scraped_at = models.DateTimeField(auto_now_add=True)
     errors = models.JSONField(default=list, blank=True)
+    # Set when the text is a near-duplicate (syndicated copy) of an earlier article
+    duplicate_of = models.ForeignKey('self', null=True, blank=True, on_delete=models.SET_NULL, related_name="duplicates")
+
+    objects = models.Manager()
+    canonical = CanonicalArticleManager()
 
     def __str__(self):
         return self.title[:80]
 
 
+class ArticleFingerprint(models.Model):
+    """MinHash signature of a canonical article's normalized text (see vtagent/near_duplicates.py)."""
+    raw_article = models.OneToOneField(RawArticle, on_delete=models.CASCADE, related_name="fingerprint")
+    signature = models.BinaryField()
+
+
+class ArticleLSHBucket(models.Model):
+    """One LSH band of a fingerprint; articles sharing any bucket key are near-duplicate candidates."""
+    key = models.BigIntegerField(db_index=True)
+    fingerprint = models.ForeignKey(ArticleFingerprint, on_delete=models.CASCADE, related_name="buckets")
+
+
 class ClassifiedArticle(models.Model):
     CLASSIFIER_CHOICES = [
         ('ml', 'Machine Learning'),
@@ -136,6 +160,12 @@ class GeneratedTaxonomyLabel(models.Model):
     ad_user = models.ForeignKey('syntheticad.ADUser', null=True, blank=True, on_delete=models.SET_NULL)
     employee = models.ForeignKey('syntheticemployees.Employee', null=True, blank=True, on_delete=models.SET_NULL)
 
+    class Meta:
+        indexes = [
+            # Most recent labels on the dashboard
+            models.Index(fields=["-labels_generated_at"], name="taxonomy_label_generated_at"),
+        ]
+
     def __str__(self):
         return f"TaxonomyLabel #{self.id}"
 
@@ -0,0 +1,140 @@
+# near_duplicates.py
+
+import hashlib
+import re
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+
+from vtagent.models import ArticleFingerprint, ArticleLSHBucket, RawArticle
+
+
+# MinHash over word shingles, banded for LSH. With BANDS x ROWS = NUM_PERM, two articles
+# become candidates at roughly Jaccard (1 / BANDS) ** (1 / ROWS) (~0.71 for 16 x 8);
+# candidates are then confirmed against settings.NEAR_DUPLICATES["THRESHOLD"].
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_WORDS = 5
+
+_PRIME = (1 << 31) - 1
+_rng = np.random.default_rng(20240601)  # Fixed: stored signatures must stay comparable across processes
+_A = _rng.integers(1, _PRIME, NUM_PERM, dtype=np.int64)
+_B = _rng.integers(0, _PRIME, NUM_PERM, dtype=np.int64)
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize_text(text):
+    """Lowercase word tokens; markup, punctuation and whitespace differences disappear."""
+    return WORD_RE.findall((text or "").lower())
+
+
+def _hash32(value):
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=4).digest(), "little") & _PRIME
+
+
+def shingles(text):
+    words = normalize_text(text)
+    if len(words) <= SHINGLE_WORDS:
+        return {_hash32(" ".join(words))} if words else set()
+    return {_hash32(" ".join(words[i:i + SHINGLE_WORDS])) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+def minhash(text):
+    """NUM_PERM-value MinHash signature (int64 array) of the text's word shingles; None for empty text."""
+    values = np.fromiter(shingles(text), dtype=np.int64)
+    if not len(values):
+        return None
+    # (a * x + b) mod p with x, a, b < 2**31 stays within int64
+    hashed = (_A[:, None] * values[None, :] + _B[:, None]) % _PRIME
+    return hashed.min(axis=1)
+
+
+def band_keys(signature):
+    """One signed 64-bit bucket key per LSH band."""
+    keys = []
+    for band in range(BANDS):
+        chunk = signature[band * ROWS:(band + 1) * ROWS].astype(np.int64).tobytes()
+        digest = hashlib.blake2b(band.to_bytes(2, "little") + chunk, digest_size=8).digest()
+        keys.append(int.from_bytes(digest, "little", signed=True))
+    return keys
+
+
+def similarity(signature, other):
+    """Estimated Jaccard similarity of two shingle sets from their signatures."""
+    return float(np.mean(signature == other))
+
+
+def find_canonical(signature, exclude_id=None):
+    """
+    (canonical article id, estimated similarity) of the closest fingerprinted
+    article at or above the configured threshold, or (None, 0.0).
+    """
+    threshold = settings.NEAR_DUPLICATES["THRESHOLD"]
+    candidates = (
+        ArticleFingerprint.objects.filter(buckets__key__in=band_keys(signature))
+        .exclude(raw_article_id=exclude_id)
+        .distinct()
+        .values_list("raw_article_id", "signature")
+    )
+    best_id, best = None, 0.0
+    for article_id, stored in candidates:
+        score = similarity(signature, np.frombuffer(bytes(stored), dtype=np.int64))
+        if score >= threshold and score > best:
+            best_id, best = article_id, score
+    return best_id, best
+
+
+def fingerprint_article(article, signature):
+    with transaction.atomic():
+        fingerprint, _ = ArticleFingerprint.objects.update_or_create(
+            raw_article=article, defaults={"signature": signature.astype(np.int64).tobytes()}
+        )
+        fingerprint.buckets.all().delete()
+        ArticleLSHBucket.objects.bulk_create(ArticleLSHBucket(key=key, fingerprint=fingerprint) for key in band_keys(signature))
+
+
+def ingest_article(url, defaults):
+    """
+    get_or_create() for crawled articles that also catches syndicated copies:
+    a new article whose text nearly matches an earlier one is stored with
+    duplicate_of pointing at it (so the URL is still remembered) and is
+    skipped by vectorization, classification and LLM labeling; otherwise it
+    is fingerprinted as a new canonical article.
+
+    Returns (article, created, duplicate) where `duplicate` is the canonical
+    article's id or None.
+    """
+    existing = RawArticle.objects.filter(url=url).first()
+    if existing is not None:
+        return existing, False, existing.duplicate_of_id
+
+    signature = minhash(defaults.get("content", ""))
+    canonical_id = find_canonical(signature)[0] if signature is not None else None
+    article, created = RawArticle.objects.get_or_create(url=url, defaults=dict(defaults, duplicate_of_id=canonical_id))
+    if created and signature is not None and canonical_id is None:
+        fingerprint_article(article, signature)
+    return article, created, article.duplicate_of_id
+
+
+def deduplicate_existing(chunk_size=500):
+    """
+    Fingerprint every article without a fingerprint, oldest first, linking
+    near-duplicates to the earliest copy. Returns (fingerprinted, linked).
+    """
+    fingerprinted = linked = 0
+    pending = RawArticle.canonical.filter(fingerprint__isnull=True).order_by("id").values_list("id", "content")
+    for article_id, content in pending.iterator(chunk_size=chunk_size):
+        signature = minhash(content)
+        if signature is None:
+            continue
+        canonical_id = find_canonical(signature, exclude_id=article_id)[0]
+        if canonical_id is not None and canonical_id < article_id:
+            RawArticle.objects.filter(id=article_id).update(duplicate_of_id=canonical_id)
+            linked += 1
+            continue
+        fingerprint_article(RawArticle(id=article_id), signature)
+        fingerprinted += 1
+    return fingerprinted, linked
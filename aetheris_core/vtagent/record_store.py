@@ -0,0 +1,162 @@
+# record_store.py
+
+import os
+import pickle
+
+import numpy as np
+
+
+# Pickled artifacts written before the memory-mapped format; still read if no newer file exists
+LEGACY_FILES = {
+    "ids.npy": "id_map.pkl",
+    "texts.bin": "texts.pkl",
+}
+
+# Attempts at opening a text blob whose offsets file is being replaced concurrently
+MAX_OPEN_ATTEMPTS = 3
+
+
+def legacy_path(path):
+    directory, name = os.path.split(path)
+    for current, legacy in LEGACY_FILES.items():
+        if name.endswith(current):
+            return os.path.join(directory, name[: -len(current)] + legacy)
+    return None
+
+
+def resolve_artifact(path):
+    """`path`, or the pickle it replaced when only that exists."""
+    if not os.path.exists(path):
+        legacy = legacy_path(path)
+        if legacy and os.path.exists(legacy):
+            return legacy
+    return path
+
+
+def offsets_path(texts_path):
+    return texts_path[: -len(".bin")] + ".offsets.npy"
+
+
+# --- Record ids ---
+
+class RecordIds:
+    """
+    Read-only sequence over a memory-mapped id array. Integer ids are stored
+    as int64 with -1 for a free slot, string ids (e.g. "ADUser:12") as
+    fixed-width unicode with "" for a free slot; both read back as None.
+    """
+
+    def __init__(self, array):
+        self.array = array
+        self._numeric = array.dtype.kind == "i"
+
+    def _value(self, value):
+        if self._numeric:
+            return int(value) if value >= 0 else None
+        return str(value) or None
+
+    def __len__(self):
+        return len(self.array)
+
+    def __getitem__(self, position):
+        return self._value(self.array[position])
+
+    def __iter__(self, chunk_size=65536):
+        for start in range(0, len(self.array), chunk_size):
+            for value in self.array[start:start + chunk_size].tolist():
+                yield self._value(value)
+
+    def tolist(self):
+        return list(self)
+
+
+def write_ids(ids, path):
+    """Atomically write `ids` (ints or strings, None for free slots) to `path`."""
+    if all(record_id is None or isinstance(record_id, (int, np.integer)) for record_id in ids):
+        array = np.array([-1 if record_id is None else record_id for record_id in ids], dtype=np.int64)
+    else:
+        array = np.array(["" if record_id is None else str(record_id) for record_id in ids], dtype=np.str_)
+        if not len(array):
+            array = array.astype("<U1")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+
+def read_ids(path):
+    """Lazy sequence of the record ids at `path` (or a plain list from a legacy pickle)."""
+    path = resolve_artifact(path)
+    if path.endswith(".pkl"):
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    return RecordIds(np.load(path, mmap_mode="r"))
+
+
+# --- Record texts ---
+
+class RecordTexts:
+    """
+    Read-only sequence over a memory-mapped UTF-8 blob: text i is
+    blob[offsets[i]:offsets[i + 1]], decoded on access; an empty span (a
+    free slot) reads back as None. Only the pages of texts actually read
+    become resident, and they are shared through the OS page cache.
+    """
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, position):
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError(position)
+        start, end = int(self.offsets[position]), int(self.offsets[position + 1])
+        return self.blob[start:end].tobytes().decode("utf-8") if end > start else None
+
+    def __iter__(self):
+        for position in range(len(self)):
+            yield self[position]
+
+    def tolist(self):
+        return list(self)
+
+
+def write_texts(texts, path):
+    """
+    Write `texts` to `path` (blob) and its offsets file, each replaced
+    atomically; None becomes an empty span.
+    """
+    offsets = np.empty(len(texts) + 1, dtype=np.int64)
+    offsets[0] = 0
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        for position, text in enumerate(texts):
+            data = text.encode("utf-8") if text else b""
+            f.write(data)
+            offsets[position + 1] = offsets[position] + len(data)
+    tmp_offsets = f"{offsets_path(path)}.tmp"
+    with open(tmp_offsets, "wb") as f:
+        np.save(f, offsets)
+    os.replace(tmp_path, path)
+    os.replace(tmp_offsets, offsets_path(path))
+
+
+def read_texts(path):
+    """Lazy sequence of the record texts at `path` (or a plain list from a legacy pickle)."""
+    path = resolve_artifact(path)
+    if path.endswith(".pkl"):
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    for _ in range(MAX_OPEN_ATTEMPTS):
+        offsets = np.load(offsets_path(path), mmap_mode="r")
+        # np.memmap cannot map an empty file
+        blob = np.memmap(path, dtype=np.uint8, mode="r") if offsets[-1] else np.empty(0, dtype=np.uint8)
+        # The pair is replaced one file after the other; a reader in between sees mismatched sizes
+        if len(blob) == offsets[-1]:
+            return RecordTexts(blob, offsets)
+    raise RuntimeError(f"Text offsets at {path} do not match the text blob")
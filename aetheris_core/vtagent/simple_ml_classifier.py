@@ -86,7 +86,7 @@ def simple_classify_article(content):
 def main():
     """Main classification function"""
     # Get unclassified articles
-    unclassified = RawArticle.objects.exclude(
+    unclassified = RawArticle.canonical.exclude(
         url__in=ClassifiedArticle.objects.values_list('url', flat=True)
     )
     
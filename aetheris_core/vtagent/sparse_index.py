@@ -0,0 +1,105 @@
+# sparse_index.py
+
+import numpy as np
+from scipy.sparse import csr_matrix, diags, issparse, load_npz, save_npz, vstack
+from sklearn.preprocessing import normalize
+
+
+class SparseCosineIndex:
+    """
+    Inverted-index retrieval over a sparse TF-IDF matrix.
+
+    Documents are kept as an L2-normalised CSR matrix; a column-major copy
+    acts as the posting lists. A query only touches the postings of its own
+    non-zero terms, so search cost follows the number of query terms and
+    their document frequency rather than corpus size times dimensions.
+
+    `search` mirrors `faiss.Index.search`: it returns (scores, positions)
+    arrays of shape (n_queries, k), padded with -1 positions. Scores are
+    cosine similarities, so higher is better. Passing `allowed` (an array of
+    positions) restricts the result to those documents, the counterpart of a
+    FAISS IDSelector.
+    """
+
+    metric = "cosine"
+
+    def __init__(self, matrix=None, dimension=None):
+        if matrix is None:
+            matrix = csr_matrix((0, dimension or 0), dtype=np.float32)
+        self._set_matrix(csr_matrix(matrix, dtype=np.float32))
+
+    def _set_matrix(self, matrix):
+        self.matrix = normalize(matrix, norm="l2", copy=False).tocsr()
+        self.postings = self.matrix.tocsc()
+
+    @property
+    def ntotal(self):
+        return self.matrix.shape[0]
+
+    @property
+    def d(self):
+        return self.matrix.shape[1]
+
+    def add(self, matrix):
+        self._set_matrix(vstack([self.matrix, csr_matrix(matrix, dtype=np.float32)]))
+
+    def remove_ids(self, positions):
+        """Empty the given rows; like an IndexIDMap2, the other rows keep their positions."""
+        keep = np.ones(self.ntotal, dtype=np.float32)
+        keep[np.asarray(positions, dtype=np.int64)] = 0
+        matrix = diags(keep) @ self.matrix
+        matrix.eliminate_zeros()
+        self._set_matrix(matrix)
+
+    def reconstruct(self, position):
+        return self.matrix[position].toarray().ravel()
+
+    def _score(self, terms, weights):
+        """Accumulate query-term weights over the posting lists of `terms`."""
+        indptr, rows, values = self.postings.indptr, self.postings.indices, self.postings.data
+        doc_ids, contributions = [], []
+        for term, weight in zip(terms, weights):
+            start, end = indptr[term], indptr[term + 1]
+            if start == end:
+                continue
+            doc_ids.append(rows[start:end])
+            contributions.append(values[start:end] * weight)
+        if not doc_ids:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        doc_ids = np.concatenate(doc_ids)
+        candidates, slots = np.unique(doc_ids, return_inverse=True)
+        return candidates, np.bincount(slots, weights=np.concatenate(contributions)).astype(np.float32)
+
+    def search(self, queries, k, allowed=None):
+        queries = csr_matrix(queries, dtype=np.float32) if not issparse(queries) else queries.tocsr()
+        queries = normalize(queries, norm="l2", copy=False)
+        scores = np.full((queries.shape[0], k), -np.inf, dtype=np.float32)
+        positions = np.full((queries.shape[0], k), -1, dtype=np.int64)
+
+        mask = None
+        if allowed is not None:
+            mask = np.zeros(self.ntotal, dtype=bool)
+            mask[np.asarray(allowed, dtype=np.int64)] = True
+
+        for row in range(queries.shape[0]):
+            start, end = queries.indptr[row], queries.indptr[row + 1]
+            candidates, candidate_scores = self._score(queries.indices[start:end], queries.data[start:end])
+            if mask is not None:
+                keep = mask[candidates]
+                candidates, candidate_scores = candidates[keep], candidate_scores[keep]
+            if not len(candidates):
+                continue
+            top = min(k, len(candidates))
+            best = np.argpartition(-candidate_scores, top - 1)[:top]
+            best = best[np.argsort(-candidate_scores[best])]
+            scores[row, :top] = candidate_scores[best]
+            positions[row, :top] = candidates[best]
+        return scores, positions
+
+
+def write_sparse_index(index, path):
+    save_npz(path, index.matrix)
+
+
+def read_sparse_index(path):
+    return SparseCosineIndex(load_npz(path))
@@ -79,7 +79,7 @@ def infer_compliance(content):
 
 def generate_taxonomy():
     existing_ids = set(GeneratedTaxonomyLabel.objects.values_list("raw_article_id", flat=True))
-    raw_articles = RawArticle.objects.exclude(id__in=existing_ids)
+    raw_articles = RawArticle.canonical.exclude(id__in=existing_ids)
 
     if not raw_articles:
         print("[✓] All articles are already labeled.")
@@ -1,3 +1,217 @@
-from django.test import TestCase
+import io
+import os
+import shutil
+import tempfile
+import time
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from llmintegration.index_registry import load_index
+from llmintegration.models import AnomalyScore
+from vtagent.incremental_index import STATE_FILE
+from vtagent.index_artifacts import (
+    FAISS_INDEX_TYPES, activate_version, artifact_paths, build_index, current_version, gc_versions, list_versions,
+    new_version, publish_version, read_manifest, search_index, versions_root, write_index_artifacts,
+)
+from vtagent.models import NewsSource, RawArticle
+from vtagent.near_duplicates import deduplicate_existing, ingest_article
+from vtagent.record_store import read_texts
+from vtagent.vector_sources import VECTOR_SOURCES
+
+
+ARTICLE_TEXTS = [
+    "Critical PAN-OS GlobalProtect flaw exploited to run commands on Palo Alto firewalls",
+    "Ransomware gang leaks patient records stolen from a hospital network",
+    "Phishing campaign abuses OAuth consent screens to take over Microsoft 365 mailboxes",
+    "Botnet of routers floods gaming servers with record DDoS traffic",
+    "Supply chain attack slips a backdoor into a popular compression library",
+    "Stealer malware spreads through fake browser updates on compromised sites",
+    "State hackers target telecom operators with custom Linux implants",
+    "Cloud misconfiguration exposes millions of customer support tickets",
+]
+
+
+class FilteredSearchTests(SimpleTestCase):
+    """Searches restricted to `allowed` positions work on every FAISS index structure."""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        vectors = rng.random((2000, 32), dtype=np.float32)
+        self.vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        self.allowed = np.arange(0, 2000, 7)
+
+    def test_filtered_search_per_index_type(self):
+        for index_type in FAISS_INDEX_TYPES:
+            for id_mapped in (False, True):
+                with self.subTest(index_type=index_type, id_mapped=id_mapped):
+                    config = {"TYPE": index_type, "NLIST": 16, "NPROBE": 16, "M": 8}
+                    index = build_index(self.vectors, "faiss", id_mapped=id_mapped, config=config)
+                    _, positions = search_index(index, self.vectors[:5], 10, "faiss", allowed=self.allowed)
+                    found = positions[positions >= 0]
+                    self.assertTrue(len(found))
+                    self.assertTrue(np.isin(found, self.allowed).all())
+                    # An allowed query vector is its own nearest neighbour
+                    self.assertEqual(positions[0][0], 0)
+
+
+@override_settings(
+    RELATED_ARTICLES={"K": 10, "ON_VECTORIZE": False},
+    STORY_CLUSTERING={"CLUSTERS": None, "ON_VECTORIZE": False},
+)
+class VectorizeCommandTests(TestCase):
+    """`vectorize --score-anomalies` scores the indexed sources and skips the classifier matrix."""
+
+    def setUp(self):
+        self.faiss_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.faiss_root)
+        source = NewsSource.objects.create(name="Test", url="https://news.example.org", category="cybersecurity")
+        for i, text in enumerate(ARTICLE_TEXTS):
+            RawArticle.objects.create(source=source, source_type="bs4", title=text[:40], url=f"https://news.example.org/{i}", content=text)
+
+    def test_score_anomalies_skips_classifier(self):
+        classifier = VECTOR_SOURCES["classifier"]
+        # Keep the classifier's historical artifacts out of the repository
+        paths = {key: os.path.join(self.faiss_root, os.path.basename(path)) for key, path in classifier.paths().items()}
+        out = io.StringIO()
+        with override_settings(FAISS_ROOT=self.faiss_root), mock.patch.object(classifier, "paths", return_value=paths):
+            call_command("vectorize", "articles", "classifier", "--score-anomalies", "--workers", "1", stdout=out)
+        self.assertIn("2/2 sources vectorized", out.getvalue())
+        self.assertTrue(os.path.exists(paths["index"]))
+        self.assertEqual(set(AnomalyScore.objects.values_list("source", flat=True)), {"articles"})
+        self.assertEqual(AnomalyScore.objects.count(), len(ARTICLE_TEXTS))
+
+
+class IncrementalIndexTests(TestCase):
+    """`vectorize articles --incremental` re-encodes edited articles and never touches a published version."""
+
+    def setUp(self):
+        self.faiss_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.faiss_root)
+        settings_override = override_settings(FAISS_ROOT=self.faiss_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        source = NewsSource.objects.create(name="Test", url="https://news.example.org", category="cybersecurity")
+        self.ids = [
+            RawArticle.objects.create(source=source, source_type="bs4", title=text[:40], url=f"https://news.example.org/{i}", content=text).id
+            for i, text in enumerate(ARTICLE_TEXTS)
+        ]
+        self.articles = VECTOR_SOURCES["articles"]
+        self.assertEqual(self.articles.vectorize()["mode"], "full")
+
+    def test_same_length_edit_reindexed(self):
+        edited = ARTICLE_TEXTS[1].replace("patient", "servers")
+        self.assertEqual(len(edited), len(ARTICLE_TEXTS[1]))
+        RawArticle.objects.filter(id=self.ids[1]).update(content=edited)
+        result = self.articles.vectorize(incremental=True)
+        self.assertEqual((result["mode"], result["changed"], result["added"], result["removed"]), ("incremental", 1, 0, 0))
+        texts = read_texts(artifact_paths("articles")["texts"])
+        self.assertIn(edited, list(texts))
+
+    def test_no_change_leaves_published_version_alone(self):
+        version = current_version("articles")
+        state = os.path.join(os.path.dirname(artifact_paths("articles")["id_map"]), STATE_FILE)
+        before = os.stat(state).st_mtime_ns
+        result = self.articles.vectorize(incremental=True)
+        self.assertNotIn("version", result)
+        self.assertEqual(current_version("articles"), version)
+        self.assertEqual(os.stat(state).st_mtime_ns, before)
+
+
+STORY = (
+    "Palo Alto Networks warned that attackers are exploiting a critical command injection flaw in the "
+    "GlobalProtect feature of PAN-OS. The vulnerability lets an unauthenticated attacker run arbitrary code "
+    "with root privileges on the firewall. Patches are rolling out for affected releases and customers are "
+    "urged to apply threat prevention signatures until they can upgrade."
+)
+
+
+class NearDuplicateTests(TestCase):
+    """Syndicated copies are linked to the first article at ingest and by the backfill."""
+
+    def setUp(self):
+        self.source = NewsSource.objects.create(name="Test", url="https://news.example.org", category="cybersecurity")
+
+    def defaults(self, content):
+        return {"source": self.source, "source_type": "bs4", "title": content[:40], "content": content}
+
+    def test_copy_linked_at_ingest(self):
+        original, created, duplicate = ingest_article("https://news.example.org/a", self.defaults(STORY))
+        self.assertTrue(created)
+        self.assertIsNone(duplicate)
+        # Syndicated with a different byline and markup
+        copy, created, duplicate = ingest_article("https://mirror.example.org/a", self.defaults(f"<p>By Staff.</p> {STORY.upper()} Read more."))
+        self.assertTrue(created)
+        self.assertEqual(duplicate, original.id)
+        unrelated, _, duplicate = ingest_article("https://news.example.org/b", self.defaults(ARTICLE_TEXTS[1] * 3))
+        self.assertIsNone(duplicate)
+        self.assertEqual(list(RawArticle.canonical.order_by("id").values_list("id", flat=True)), [original.id, unrelated.id])
+
+    def test_known_url_returned_as_is(self):
+        original, _, _ = ingest_article("https://news.example.org/a", self.defaults(STORY))
+        again, created, duplicate = ingest_article("https://news.example.org/a", self.defaults(ARTICLE_TEXTS[0]))
+        self.assertEqual((again.id, created, duplicate), (original.id, False, None))
+        self.assertEqual(again.content, STORY)
+
+    def test_backfill_links_later_copies(self):
+        first = RawArticle.objects.create(url="https://news.example.org/a", **self.defaults(STORY))
+        copy = RawArticle.objects.create(url="https://mirror.example.org/a", **self.defaults(STORY + " Updated."))
+        other = RawArticle.objects.create(url="https://news.example.org/b", **self.defaults(ARTICLE_TEXTS[2]))
+        self.assertEqual(deduplicate_existing(), (2, 1))
+        copy.refresh_from_db()
+        self.assertEqual(copy.duplicate_of_id, first.id)
+        self.assertEqual(deduplicate_existing(), (0, 0))
+        self.assertTrue(hasattr(RawArticle.objects.get(id=other.id), "fingerprint"))
+
+
+@override_settings(INDEX_VERSIONS={"KEEP": 2})
+class VersionedPublishTests(SimpleTestCase):
+    """Every build is published as an immutable version behind an atomically swapped CURRENT pointer."""
+
+    def setUp(self):
+        self.faiss_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.faiss_root)
+        settings_override = override_settings(FAISS_ROOT=self.faiss_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def publish(self, texts):
+        started = time.time()
+        version, staging = new_version("cmdb")
+        vectorizer = TfidfVectorizer()
+        ids = list(range(len(texts)))
+        write_index_artifacts(staging, vectorizer.fit_transform(texts), ids, texts, vectorizer)
+        publish_version("cmdb", version, staging, "faiss", len(ids), started, {"records": len(ids)})
+        return version
+
+    def test_publish_points_current_at_new_version(self):
+        first = self.publish(ARTICLE_TEXTS[:4])
+        second = self.publish(ARTICLE_TEXTS)
+        self.assertEqual(current_version("cmdb"), second)
+        manifest = read_manifest(os.path.dirname(artifact_paths("cmdb")["index"]))
+        self.assertEqual((manifest["version"], manifest["rows"]), (second, len(ARTICLE_TEXTS)))
+        loaded = load_index("cmdb")
+        self.assertEqual((loaded.version, len(loaded.id_map)), (second, len(ARTICLE_TEXTS)))
+        self.assertTrue(os.path.exists(artifact_paths("cmdb", first)["index"]))
+
+    def test_rollback_and_gc(self):
+        versions = [self.publish(ARTICLE_TEXTS[:n]) for n in (2, 3, 4)]
+        self.assertEqual(list_versions("cmdb"), versions[1:])
+        activate_version("cmdb", versions[1])
+        self.assertEqual(load_index("cmdb").version, versions[1])
+        # The current version survives collection even when it is not among the newest
+        self.assertEqual(gc_versions("cmdb", keep=0), [versions[2]])
+        self.assertEqual(list_versions("cmdb"), [versions[1]])
+        with self.assertRaises(ValueError):
+            activate_version("cmdb", versions[0])
+
+    def test_abandoned_staging_removed(self):
+        self.publish(ARTICLE_TEXTS)
+        _, stale = new_version("cmdb")
+        _, active = new_version("cmdb")
+        os.utime(stale, (0, 0))
+        gc_versions("cmdb")
+        self.assertEqual(sorted(os.listdir(versions_root("cmdb"))), sorted([current_version("cmdb"), os.path.basename(active)]))
@@ -0,0 +1,279 @@
+# vector_sources.py
+
+import json
+import os
+import time
+
+import faiss
+from django.conf import settings
+from scipy.sparse import save_npz
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from vtagent.index_artifacts import (
+    build_index, faiss_index_config, make_vectorizer, new_version, publish_version, record_watermark,
+    replace_file, vector_backend, write_index_artifacts, write_pickle,
+)
+
+
+class VectorSource:
+    """
+    One vectorizable corpus. `records(chunk_size)` yields (record id, text)
+    pairs, streaming from the database; vectorize() fits a TF-IDF vectorizer
+    on them and publishes the index artifacts as a new version of the source.
+    """
+
+    def __init__(self, name, records, max_features=None):
+        self.name = name
+        self.records = records
+        self.max_features = max_features
+
+    def make_vectorizer(self):
+        return make_vectorizer(self.name, self.max_features)
+
+    def vectorize(self, chunk_size=2000, **options):
+        started = time.time()
+        ids, texts = [], []
+        for record_id, text in self.records(chunk_size):
+            ids.append(record_id)
+            texts.append(text)
+        if not texts:
+            return {"source": self.name, "indexed": 0, "message": "no records"}
+
+        vectorizer = self.make_vectorizer()
+        matrix = vectorizer.fit_transform(texts)  # TF-IDF stays sparse; only a FAISS build densifies
+        backend = vector_backend(self.name)
+        version, staging = new_version(self.name)
+        write_index_artifacts(
+            staging, matrix, ids, texts, vectorizer,
+            backend=backend, index_config=faiss_index_config(self.name),
+        )
+        paths = publish_version(self.name, version, staging, backend, len(ids), started, record_watermark(ids))
+        return {"source": self.name, "indexed": len(ids), "backend": backend, "version": version, "paths": paths}
+
+
+# Registered sources by name; see `python manage.py vectorize --list`
+VECTOR_SOURCES = {}
+
+
+def register_source(name, max_features=None):
+    """Decorator registering a record generator as the vector source `name`."""
+    def decorator(records):
+        VECTOR_SOURCES[name] = VectorSource(name, records, max_features=max_features)
+        return records
+    return decorator
+
+
+# --- CMDB ---
+
+def serialize_cmdb(item):
+    return f"""
+    Hostname: {item.hostname}
+    Asset Type: {item.asset_type}
+    OS: {item.os} {item.os_version}
+    Software: {", ".join(item.software)}
+    Software Version: {item.software_version}
+    Hardware: {item.hardware_vendor} {item.model}
+    Network Zone: {item.network_zone}
+    Connectivity: {item.connectivity}
+    Security Software: {item.security_software}
+    Business Unit: {item.business_unit}
+    Department: {item.department}
+    Employee ID: {item.employee_id}
+    Email: {item.employee_email}
+    Country: {item.country}, City: {item.city}
+    Owner: {item.owner}
+    Security Posture: {item.security_posture}
+    """
+
+
+@register_source("cmdb", max_features=2048)
+def cmdb_records(chunk_size):
+    from syntheticcmdb.models import ConfigurationItem
+
+    for item in ConfigurationItem.objects.order_by("id").iterator(chunk_size=chunk_size):
+        yield item.id, serialize_cmdb(item)
+
+
+# --- Active Directory ---
+
+def ou_paths():
+    """Full "Root > ... > OU" path of every organizational unit, from one query."""
+    from syntheticad.models import OrganizationalUnit
+
+    units = {ou_id: (name, parent_id) for ou_id, name, parent_id in OrganizationalUnit.objects.values_list("id", "name", "parent_id")}
+    paths = {}
+
+    def path(ou_id):
+        if ou_id not in paths:
+            name, parent_id = units[ou_id]
+            paths[ou_id] = f"{path(parent_id)} > {name}" if parent_id in units else name
+        return paths[ou_id]
+
+    for ou_id in units:
+        path(ou_id)
+    return paths
+
+
+def build_text_representation(chunk_size=2000):
+    """(id, text) for every AD object, e.g. ("ADUser:12", "ADUser: Jane Doe (jdoe) - Dept: ...")."""
+    from syntheticad.models import ADUser, ADGroup, OrganizationalUnit, Domain, DomainController, ServiceAccount
+
+    for obj in ADUser.objects.select_related("ou").order_by("id").iterator(chunk_size=chunk_size):
+        text = f"ADUser: {obj.display_name} ({obj.sAMAccountName}) - Dept: {obj.department}, Country: {obj.country}, Email: {obj.mail}"
+        if obj.ou:
+            text += f", OU: {obj.ou.name}"
+        yield f"ADUser:{obj.id}", text
+
+    for obj in ADGroup.objects.order_by("id").iterator(chunk_size=chunk_size):
+        yield f"ADGroup:{obj.id}", f"ADGroup: {obj.name} - Desc: {obj.description}"
+
+    paths = ou_paths()
+    for ou_id, name in OrganizationalUnit.objects.order_by("id").values_list("id", "name").iterator(chunk_size=chunk_size):
+        yield f"OrganizationalUnit:{ou_id}", f"OrganizationalUnit: {name} - Path: {paths[ou_id]}"
+
+    for obj in Domain.objects.order_by("id").iterator(chunk_size=chunk_size):
+        yield f"Domain:{obj.id}", f"Domain: {obj.name}"
+
+    for obj in DomainController.objects.select_related("domain").order_by("id").iterator(chunk_size=chunk_size):
+        yield f"DomainController:{obj.id}", f"DomainController: {obj.hostname} ({obj.location}) in Domain {obj.domain.name}"
+
+    for obj in ServiceAccount.objects.select_related("domain", "created_for").order_by("id").iterator(chunk_size=chunk_size):
+        text = f"ServiceAccount: {obj.name} - Purpose: {obj.purpose}, Domain: {obj.domain.name}"
+        if obj.created_for:
+            text += f", Created for OU: {obj.created_for.name}"
+        yield f"ServiceAccount:{obj.id}", text
+
+
+register_source("ad")(build_text_representation)
+
+
+# --- Employees ---
+
+def serialize_employee(emp):
+    return f"""
+    Employee Name: {emp.name}
+    Email: {emp.email}
+    Department: {emp.department}
+    Country: {emp.country}
+    City: {emp.city}
+    """.strip()
+
+
+@register_source("employees")
+def employee_records(chunk_size):
+    from syntheticemployees.models import Employee
+
+    for emp in Employee.objects.order_by("id").iterator(chunk_size=chunk_size):
+        yield emp.id, serialize_employee(emp)
+
+
+# --- Logs (JSON exports under settings.SYNTHETIC_DATA_DIR) ---
+
+LOG_TYPES = (
+    "siem_logs",
+    "xdr_logs",
+    "ids_logs",
+    "firewall_logs",
+    "edr_logs",
+    "hids_logs",
+    "application_logs",
+)
+
+
+def flatten_log(log: dict) -> str:
+    """Flatten a log dictionary into a single string for vectorization."""
+    parts = []
+    for key, value in log.items():
+        if isinstance(value, (dict, list)):
+            parts.append(f"{key}: {' | '.join(map(str, value))}")
+        else:
+            parts.append(f"{key}: {value}")
+    return " | ".join(parts)
+
+
+def log_records(log_type):
+    def records(chunk_size):
+        with open(os.path.join(settings.SYNTHETIC_DATA_DIR, f"{log_type}.json"), "r") as f:
+            logs = json.load(f)
+        for i, log in enumerate(logs):
+            yield f"{log_type.upper()}:{i}", flatten_log(log)
+    return records
+
+
+for _log_type in LOG_TYPES:
+    register_source(_log_type, max_features=2048)(log_records(_log_type))
+
+
+# --- Articles ---
+
+class ArticleSource(VectorSource):
+    """RawArticle content; maintained incrementally by ArticleIndexUpdater."""
+
+    def __init__(self):
+        super().__init__("articles", records=None, max_features=2048)
+
+    def vectorize(self, chunk_size=2000, incremental=False, **options):
+        from vtagent.incremental_index import ArticleIndexUpdater
+
+        updater = ArticleIndexUpdater(
+            self.name,
+            vector_backend(self.name),
+            vectorizer_factory=self.make_vectorizer,
+            drift_threshold=settings.INCREMENTAL_INDEX["DRIFT_THRESHOLD"],
+            max_growth=settings.INCREMENTAL_INDEX["MAX_GROWTH"],
+            index_config=faiss_index_config(self.name),
+        )
+        result = updater.update(full=not incremental)
+        return dict(result, source=self.name, backend=updater.backend)
+
+
+class ClassifierSource(VectorSource):
+    """
+    The TF-IDF matrix over every RawArticle used by the multilabel classifier
+    scripts (train_multilabel_models.py, predict_with_trained_models.py) and
+    FAISS_Validator.py, kept at their historical paths.
+    """
+
+    def __init__(self):
+        super().__init__("classifier", records=None, max_features=5000)
+
+    def make_vectorizer(self):
+        # The multilabel classifiers are trained on TF-IDF features
+        return TfidfVectorizer(max_features=self.max_features)
+
+    def paths(self):
+        base = os.path.join(settings.BASE_DIR, "aetheris_core")
+        return {
+            "index": os.path.join(base, "faiss_index_classified_articles.index"),
+            "id_map": os.path.join(base, "faiss_id_map.pkl"),
+            "vectorizer": os.path.join(base, "faiss_vectorizer.pkl"),
+            "matrix": os.path.join(base, "faiss_vectorized_articles.npz"),
+            "vectors": os.path.join(settings.FAISS_ROOT, "article_vectors.pkl"),
+        }
+
+    def vectorize(self, chunk_size=2000, **options):
+        from vtagent.models import RawArticle
+
+        ids, contents = [], []
+        for article_id, content in RawArticle.canonical.order_by("id").values_list("id", "content").iterator(chunk_size=chunk_size):
+            ids.append(article_id)
+            contents.append(content or "")
+        if not contents:
+            return {"source": self.name, "indexed": 0, "message": "no records"}
+
+        vectorizer = self.make_vectorizer()
+        matrix = vectorizer.fit_transform(contents)
+        index = build_index(matrix, "faiss")
+
+        paths = self.paths()
+        os.makedirs(os.path.dirname(paths["vectors"]), exist_ok=True)
+        replace_file(paths["index"], lambda path: faiss.write_index(index, path))
+        replace_file(paths["matrix"], lambda path: save_npz(path, matrix))
+        write_pickle(vectorizer, paths["vectorizer"])
+        write_pickle(matrix, paths["vectors"])
+        write_pickle(ids, paths["id_map"])
+        return {"source": self.name, "indexed": len(ids), "backend": "faiss", "paths": paths}
+
+
+VECTOR_SOURCES["articles"] = ArticleSource()
+VECTOR_SOURCES["classifier"] = ClassifierSource()